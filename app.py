@@ -1,283 +1,423 @@
-from flask import Flask, render_template, jsonify, request
-import random
-from collections import deque
-import heapq
+from flask import Flask, Response, render_template, jsonify, request, abort, g
+import base64
+import json
+import os
 import time
+import maze_generator
+from maze_grid import Grid
+from maze_solvers import (
+    iter_astar,
+    iter_dfs,
+    iter_dijkstra,
+    iter_greedy,
+    iter_bidirectional,
+    astar_with_exploration,
+    dfs_with_exploration,
+    dijkstra_with_exploration,
+    cost_field,
+    greedy_best_first,
+    bidirectional_bfs,
+    iter_jps,
+    jump_point_search,
+    HEAP_SOLVERS,
+)
+from maze_wavefront import wavefront_bfs, iter_wavefront_bfs, distance_field
+from maze_cache import SolveCache, maze_key, solve_key
+from maze_graph import CorridorGraph
+from maze_tree import MazeTree
+from maze_incremental import DStarLite, PlannerSessions
+from maze_registry import MazeRegistry
+from maze_parallel import solve_many
+from maze_store import StoreDirectory
+from maze_metrics import MetricsRegistry, SlowRequestProfiler, COUNT_BUCKETS
+import maze_codec
 
 
 app = Flask(__name__)
 
-# Maze dimensions
-ROWS, COLS = 25, 35
+# Default and maximum maze dimensions; each request passes its own size down
+DEFAULT_ROWS, DEFAULT_COLS = 25, 35
+MAX_DIMENSION = int(os.environ.get("MAZE_MAX_DIMENSION", 2001))
 WALL, PATH = 1, 0
 
+# Solve results keyed by (maze bytes, start, end, algo); bounded by entries and bytes
+solve_cache = SolveCache(
+    max_entries=int(os.environ.get("MAZE_SOLVE_CACHE_ENTRIES", 256)),
+    max_bytes=int(os.environ.get("MAZE_SOLVE_CACHE_BYTES", 64 * 2**20)),
+)
+
+# Per-maze indexes (corridor graphs, ...) for mazes that are not in the
+# registry or carry edits; registry mazes keep theirs on the entry itself
+index_cache = SolveCache(
+    max_entries=int(os.environ.get("MAZE_INDEX_CACHE_ENTRIES", 32)),
+    max_bytes=int(os.environ.get("MAZE_INDEX_CACHE_BYTES", 256 * 2**20)),
+)
+
+# Incremental D* Lite planners behind the /plan session API
+planner_sessions = PlannerSessions(
+    ttl=int(os.environ.get("MAZE_PLANNER_TTL", 600)),
+    max_entries=int(os.environ.get("MAZE_PLANNER_SESSIONS", 256)),
+)
+
+
+def rebuild_maze(maze_id):
+    # seeded maze ids are recipes; regenerate instead of failing after eviction
+    recipe = maze_generator.parse_recipe_id(maze_id)
+    if recipe is None:
+        return None
+    rows, cols, algo, seed, terrain = recipe
+    # ids come from clients: same size limit as /generate
+    if not (rows <= MAX_DIMENSION and cols <= MAX_DIMENSION):
+        return None
+    meta = {"algo": algo, "seed": seed, "terrain": terrain}
+    return maze_generator.generate(rows, cols, algo, seed, terrain), meta
+
+
+# Generated mazes, so clients can send a maze_id instead of the whole grid
+maze_registry = MazeRegistry(
+    ttl=int(os.environ.get("MAZE_REGISTRY_TTL", 1800)),
+    max_entries=int(os.environ.get("MAZE_REGISTRY_ENTRIES", 1024)),
+    max_bytes=int(os.environ.get("MAZE_REGISTRY_BYTES", 1024 * 2**20)),
+    spill_dir=os.environ.get("MAZE_REGISTRY_SPILL_DIR") or None,
+    rebuild=rebuild_maze,
+)
+
+# Memory-mapped mazes too large to generate per request (maze_store.py
+# files), served as viewport tiles; off unless MAZE_STORE_DIR is set
+maze_stores = StoreDirectory(os.environ["MAZE_STORE_DIR"]) if os.environ.get("MAZE_STORE_DIR") else None
+MAX_TILE = int(os.environ.get("MAZE_MAX_TILE", 512))
+
+
+# ----------- Metrics -----------
+# Exported at /metrics in the Prometheus text format
+metrics = MetricsRegistry()
+request_total = metrics.counter(
+    "maze_http_requests_total", "HTTP requests by endpoint and status.", ("endpoint", "status"))
+request_seconds = metrics.histogram(
+    "maze_http_request_seconds", "Time to build the response, per endpoint.", ("endpoint",))
+request_bytes = metrics.counter(
+    "maze_http_request_bytes_total", "Request body bytes received.", ("endpoint",))
+response_bytes = metrics.counter(
+    "maze_http_response_bytes_total", "Response body bytes sent (streamed responses excluded).", ("endpoint",))
+encode_seconds = metrics.histogram(
+    "maze_response_encode_seconds",
+    "Time to build response bodies: format=pairs is the [r, c] lists, json the JSON text, "
+    "binary the maze_codec payload.",
+    ("endpoint", "format"))
+solve_seconds = metrics.histogram(
+    "maze_solve_seconds", "Search time of uncached solves.", ("algo",))
+solve_expanded = metrics.histogram(
+    "maze_solve_expanded_nodes", "Cells expanded by uncached solves.", ("algo",), COUNT_BUCKETS)
+heap_pushes = metrics.counter(
+    "maze_solve_heap_pushes_total", "Heap pushes by the heap-based solvers.", ("algo",))
+heap_pops = metrics.counter(
+    "maze_solve_heap_pops_total", "Heap pops by the heap-based solvers.", ("algo",))
+generate_seconds = metrics.histogram(
+    "maze_generate_seconds", "Maze generation time.", ("algo",))
+
+CACHES = {"solve": solve_cache, "index": index_cache}
+for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                    ("entries", "gauge"), ("bytes", "gauge")):
+    metrics.callback(
+        f"maze_cache_{field}" + ("_total" if kind == "counter" else ""), f"Cache {field}.", kind, ("cache",),
+        lambda field=field: {(name, ): cache.stats()[field] for name, cache in CACHES.items()})
+metrics.callback("maze_registry_entries", "Mazes held in the registry.", "gauge", (),
+                 lambda: {(): len(maze_registry)})
+metrics.callback("maze_registry_bytes", "Bytes of registry grids and their derived indexes.", "gauge", (),
+                 lambda: {(): maze_registry.bytes})
+metrics.callback("maze_planner_sessions", "Live D* Lite planner sessions.", "gauge", (),
+                 lambda: {(): len(planner_sessions)})
+metrics.callback("maze_stores_open", "Memory-mapped maze stores in use.", "gauge", (),
+                 lambda: {(): len(maze_stores) if maze_stores is not None else 0})
+
+# Folded stacks of requests slower than MAZE_PROFILE_SLOW_MS, if MAZE_PROFILE_DIR is set
+profiler = SlowRequestProfiler(
+    os.environ["MAZE_PROFILE_DIR"],
+    threshold=float(os.environ.get("MAZE_PROFILE_SLOW_MS", 500)) / 1000,
+    interval=float(os.environ.get("MAZE_PROFILE_INTERVAL_MS", 5)) / 1000,
+) if os.environ.get("MAZE_PROFILE_DIR") else None
+
+
+# Dictionary of all algorithms
+ALGORITHMS = {
+    "bfs": wavefront_bfs,
+    "dfs": dfs_with_exploration,
+    "dijkstra": dijkstra_with_exploration,
+    "greedy": greedy_best_first,
+    "bidirectional": bidirectional_bfs,
+    "astar": astar_with_exploration,
+    "jps": jump_point_search
+}
+
+# Step generators behind each algorithm, for streaming
+STEP_ALGORITHMS = {
+    "bfs": iter_wavefront_bfs,
+    "dfs": iter_dfs,
+    "dijkstra": iter_dijkstra,
+    "greedy": iter_greedy,
+    "bidirectional": iter_bidirectional,
+    "astar": iter_astar,
+    "jps": iter_jps
+}
+
 
 # ----------- Maze Generation -----------
-def generate_maze():
-    maze = [[WALL for _ in range(COLS)] for _ in range(ROWS)]
-
-    def carve_from(r, c):
-        maze[r][c] = PATH
-        directions = [(0, 2), (0, -2), (2, 0), (-2, 0)]
-        random.shuffle(directions)
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < ROWS and 0 <= nc < COLS and maze[nr][nc] == WALL:
-                maze[r + dr // 2][c + dc // 2] = PATH
-                carve_from(nr, nc)
-
-    carve_from(0, 0)
-    maze[0][0] = PATH
-    maze[ROWS - 1][COLS - 1] = PATH
-    return maze
-
-
-# ----------- BFS -----------
-def bfs_with_exploration(maze, start, end):
-    ROWS, COLS = len(maze), len(maze[0])
-    q = deque([start])
-    parent = {start: None}
-    explored = []
-    found = False
-
-    while q:
-        node = q.popleft()
-        explored.append(node)
-        if node == end:
-            found = True
-            break
-        r, c = node
-        for dr, dc in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-            nr, nc = r + dr, c + dc
-            n = (nr, nc)
-            if 0 <= nr < ROWS and 0 <= nc < COLS and maze[nr][nc] == PATH and n not in parent:
-                parent[n] = node
-                q.append(n)
-
-    path = []
-    if found:
-        cur = end
-        while cur is not None:
-            path.append(cur)
-            cur = parent[cur]
-        path.reverse()
-    return explored, path
-
-
-# ----------- A* -----------
-def manhattan(a, b):
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-
-def astar_with_exploration(maze, start, end):
-    ROWS, COLS = len(maze), len(maze[0])
-    gscore = {start: 0}
-    fscore = {start: manhattan(start, end)}
-    parent = {}
-    open_heap = [(fscore[start], start)]
-    open_set = {start}
-    closed = set()
-    explored = []
-
-    while open_heap:
-        _, current = heapq.heappop(open_heap)
-        if current in closed:
-            continue
-        open_set.discard(current)
-        closed.add(current)
-        explored.append(current)
-
-        if current == end:
-            break
-
-        r, c = current
-        for dr, dc in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-            nr, nc = r + dr, c + dc
-            neighbor = (nr, nc)
-            if not (0 <= nr < ROWS and 0 <= nc < COLS):
-                continue
-            if maze[nr][nc] == WALL:
-                continue
-            tentative_g = gscore[current] + 1
-            if tentative_g < gscore.get(neighbor, float("inf")):
-                parent[neighbor] = current
-                gscore[neighbor] = tentative_g
-                fscore[neighbor] = tentative_g + manhattan(neighbor, end)
-                if neighbor not in open_set and neighbor not in closed:
-                    heapq.heappush(open_heap, (fscore[neighbor], neighbor))
-                    open_set.add(neighbor)
-
-    path = []
-    if end in parent or start == end:
-        cur = end
-        while cur is not None:
-            path.append(cur)
-            cur = parent.get(cur, None)
-        path.reverse()
-    return explored, path
-
-# ----------- DFS -----------
-def dfs_with_exploration(maze, start, end):
-    stack = [start]
-    visited = set([start])
-    parent = {}
-    explored = []
-
-    while stack:
-        node = stack.pop()
-        explored.append(node)
-        if node == end:
-            break
-        r, c = node
-        for dr, dc in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-            nr, nc = r + dr, c + dc
-            n = (nr, nc)
-            if 0 <= nr < len(maze) and 0 <= nc < len(maze[0]) and maze[nr][nc] == PATH and n not in visited:
-                visited.add(n)
-                parent[n] = node
-                stack.append(n)
-
-    path = []
-    if end in parent or start == end:
-        cur = end
-        while cur in parent or cur == start:
-            path.append(cur)
-            if cur == start: break
-            cur = parent[cur]
-        path.reverse()
-    return explored, path
-
-# ----------- Dijkstra -----------
-def dijkstra_with_exploration(maze, start, end):
-    ROWS, COLS = len(maze), len(maze[0])
-    pq = [(0, start)]
-    dist = {start: 0}
-    parent = {}
-    explored = []
-
-    while pq:
-        cost, node = heapq.heappop(pq)
-        explored.append(node)
-        if node == end:
-            break
-
-        r, c = node
-        for dr, dc in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-            nr, nc = r + dr, c + dc
-            n = (nr, nc)
-            if not (0 <= nr < ROWS and 0 <= nc < COLS): continue
-            if maze[nr][nc] == WALL: continue
-            new_cost = cost + 1
-            if new_cost < dist.get(n, float("inf")):
-                dist[n] = new_cost
-                parent[n] = node
-                heapq.heappush(pq, (new_cost, n))
-
-    path = []
-    if end in parent or start == end:
-        cur = end
-        while cur in parent or cur == start:
-            path.append(cur)
-            if cur == start: break
-            cur = parent[cur]
-        path.reverse()
-    return explored, path
-
-# ----------- Greedy Best-First Search -----------
-def greedy_best_first(maze, start, end):
-    ROWS, COLS = len(maze), len(maze[0])
-    open_heap = [(manhattan(start, end), start)]
-    parent = {}
-    visited = set()
-    explored = []
-
-    while open_heap:
-        _, node = heapq.heappop(open_heap)
-        if node in visited:
-            continue
-        visited.add(node)
-        explored.append(node)
-        if node == end:
-            break
-
-        r, c = node
-        for dr, dc in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-            nr, nc = r + dr, c + dc
-            n = (nr, nc)
-            if not (0 <= nr < ROWS and 0 <= nc < COLS): continue
-            if maze[nr][nc] == WALL or n in visited: continue
-            parent[n] = node
-            heapq.heappush(open_heap, (manhattan(n, end), n))
-
-    path = []
-    if end in parent or start == end:
-        cur = end
-        while cur in parent or cur == start:
-            path.append(cur)
-            if cur == start: break
-            cur = parent[cur]
-        path.reverse()
-    return explored, path
-
-# ----------- Bidirectional BFS -----------
-def bidirectional_bfs(maze, start, end):
-    from collections import deque
-    ROWS, COLS = len(maze), len(maze[0])
-    q1, q2 = deque([start]), deque([end])
-    visited1, visited2 = {start: None}, {end: None}
-    explored = []
-
-    meet_point = None
-
-    while q1 and q2:
-        # Expand forward search
-        for _ in range(len(q1)):
-            node = q1.popleft()
-            explored.append(node)
-            if node in visited2:
-                meet_point = node
-                break
-            r, c = node
-            for dr, dc in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                nr, nc = r + dr, c + dc
-                n = (nr, nc)
-                if 0 <= nr < ROWS and 0 <= nc < COLS and maze[nr][nc] == PATH and n not in visited1:
-                    visited1[n] = node
-                    q1.append(n)
-
-        if meet_point: break
-
-        # Expand backward search
-        for _ in range(len(q2)):
-            node = q2.popleft()
-            explored.append(node)
-            if node in visited1:
-                meet_point = node
-                break
-            r, c = node
-            for dr, dc in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                nr, nc = r + dr, c + dc
-                n = (nr, nc)
-                if 0 <= nr < ROWS and 0 <= nc < COLS and maze[nr][nc] == PATH and n not in visited2:
-                    visited2[n] = node
-                    q2.append(n)
-
-        if meet_point: break
-
-    path = []
-    if meet_point:
-        # reconstruct from both sides
-        node = meet_point
-        while node is not None:
-            path.append(node)
-            node = visited1[node]
-        path.reverse()
-        node = visited2[meet_point]
-        while node is not None:
-            path.append(node)
-            node = visited2[node]
-    return explored, path
+def generate_maze(rows=DEFAULT_ROWS, cols=DEFAULT_COLS, algo="backtracker", seed=None, terrain=False):
+    # pure function of its arguments; no module state, so safe from any thread
+    return maze_generator.generate(rows, cols, algo, seed, terrain)
+
+
+def goal_field(grid):
+    # (cost, steps) from every cell to the goal (bottom-right cell) along the
+    # cheapest walk: one reverse BFS field for both on plain mazes, reverse
+    # Dijkstra on terrain mazes, where the cheapest walk may take more steps
+    if grid.costs is not None:
+        return cost_field(grid, [len(grid) - 1])
+    field = distance_field(grid, [len(grid) - 1])
+    return field, field
+
+
+# ----------- Request helpers -----------
+def load_grid(data):
+    # {"maze_id": ..., "edits": [[r, c, value], ...]} or the full {"maze": [[...]]},
+    # optionally with base64 uint8 terrain "costs"
+    if "maze_id" in data:
+        grid = maze_registry.get_grid(data["maze_id"])
+        if grid is None:
+            abort(404, description="unknown or expired maze_id")
+        edits = edit_args(grid, data.get("edits") or [])
+        if edits:
+            grid = grid.copy()
+            for cell, value in edits:
+                grid.cells[cell] = WALL if value == WALL else PATH
+        return grid
+    try:
+        grid = Grid.from_lists(data.get("maze"))
+    except (KeyError, TypeError, ValueError):
+        abort(400, description="maze must be a list of equal-length rows of 0/1 cells")
+    if data.get("costs"):
+        try:
+            costs = bytearray(base64.b64decode(data["costs"], validate=True))
+        except ValueError:
+            abort(400, description="costs must be base64")
+        if len(costs) != len(grid) or 0 in costs:
+            abort(400, description="costs must hold one value of at least 1 per cell")
+        grid.costs = costs
+    return grid
+
+
+def cell_arg(grid, value, name):
+    # [r, c] from a JSON body or "r,c" from a query string -> cell index;
+    # 400 instead of an IndexError/ValueError (a 500) for anything else
+    try:
+        if isinstance(value, str):
+            value = value.split(",")
+        r, c = (int(x) for x in value)
+        return grid.index(r, c)
+    except (IndexError, TypeError, ValueError):
+        abort(400, description=f"{name} must be a [row, col] cell inside the maze")
+
+
+def edit_args(grid, edits):
+    # [[r, c, value], ...] -> [(cell index, value), ...]
+    if not isinstance(edits, list) or not all(isinstance(e, list) and len(e) == 3 for e in edits):
+        abort(400, description="edits must be a list of [row, col, value]")
+    return [(cell_arg(grid, edit[:2], "edit"), edit[2]) for edit in edits]
+
+
+def registry_index(data, grid, name, build):
+    # build(grid) once per registry maze and keep it on the entry; None when
+    # grid is not the registry's own (edited mazes are copies, posted ones new)
+    if "maze_id" not in data:
+        return None
+    return maze_registry.derive(data["maze_id"], grid, name, build)
+
+
+def maze_index(data, grid, name, build):
+    # like registry_index, with a content-hash LRU for every other maze
+    index = registry_index(data, grid, name, build)
+    if index is not None:
+        return index
+    key = maze_key(grid, name)
+    index = index_cache.get(key)
+    if index is None:
+        index = build(grid)
+        index_cache.put(key, index)
+    return index
+
+
+def timing(seconds):
+    # "time" stays in seconds for older clients; "time_ms" is what the UI charts
+    return {"time": round(seconds, 6), "time_ms": round(seconds * 1000, 3)}
+
+
+def int_arg(args, name, default=None):
+    try:
+        return int(args[name])
+    except (KeyError, TypeError, ValueError):
+        return default
+
+
+def respond(result):
+    # handlers return bytes for the binary format and a dict for JSON
+    if isinstance(result, bytes):
+        return Response(result, mimetype=maze_codec.CONTENT_TYPE)
+    start_time = time.perf_counter()
+    response = jsonify(result)
+    encode_seconds.observe(time.perf_counter() - start_time, endpoint=request.endpoint, format="json")
+    return response
+
+
+# ----------- Handlers -----------
+# The bodies of /generate and /solve as plain functions of their inputs, so
+# the ASGI front end (asgi.py) can run them in its worker pool. They abort()
+# with an HTTP error exactly like the routes did.
+def handle_generate(args, binary=False):
+    rows = int_arg(args, "rows", DEFAULT_ROWS)
+    cols = int_arg(args, "cols", DEFAULT_COLS)
+    if not (0 < rows <= MAX_DIMENSION and 0 < cols <= MAX_DIMENSION):
+        abort(400, description=f"rows and cols must be between 1 and {MAX_DIMENSION}")
+    algo = args.get("algo", "backtracker")
+    # same seed, size and algo -> same maze; pick one if the client didn't
+    seed = int_arg(args, "seed")
+    if seed is None:
+        seed = maze_generator.new_seed()
+    elif not 0 <= seed < maze_generator.SEED_LIMIT:
+        # the maze_id must parse back into this seed to be rebuilt after eviction
+        abort(400, description=f"seed must be between 0 and {maze_generator.SEED_LIMIT - 1}")
+    # terrain=1: braided maze with per-cell movement costs
+    terrain = bool(int_arg(args, "terrain", 0))
+
+    # default to the recursive backtracker if invalid key
+    if algo not in maze_generator.GENERATORS:
+        algo = "backtracker"
+
+    start_time = time.perf_counter()
+    maze = generate_maze(rows, cols, algo, seed, terrain)
+    generate_seconds.observe(time.perf_counter() - start_time, algo=algo)
+    maze_id = maze_registry.add(maze, maze_generator.recipe_id(rows, cols, algo, seed, terrain),
+                                algo=algo, seed=seed, terrain=terrain)
+    # the goal is fixed per maze: one reverse search now answers every later
+    # hint, score and "getting closer" check with a lookup
+    cost, steps = maze_index({"maze_id": maze_id}, maze, "goal_field", goal_field)
+    # cells on the cheapest path, which on terrain is not always the shortest
+    best_path_length = steps[0] + 1 if steps[0] >= 0 else 0
+    start_time = time.perf_counter()
+    if binary:
+        result = maze_codec.encode(maze.rows, maze.cols, cells=maze.cells, costs=maze.costs,
+                                   meta={"maze_id": maze_id, "seed": seed, "terrain": terrain,
+                                         "best_path_length": best_path_length, "best_path_cost": cost[0]})
+        encode_seconds.observe(time.perf_counter() - start_time, endpoint="generate", format="binary")
+        return result
+    result = {
+        "maze_id": maze_id,
+        "seed": seed,
+        "algo": algo,
+        "best_path_length": best_path_length,
+        "best_path_cost": cost[0],
+        "rows": maze.rows,
+        "cols": maze.cols,
+        "maze": maze.to_lists()
+    }
+    if terrain:
+        result["terrain"] = True
+        result["costs"] = base64.b64encode(maze.costs).decode()
+    encode_seconds.observe(time.perf_counter() - start_time, endpoint="generate", format="pairs")
+    return result
+
+
+def handle_solve(data, binary=False):
+    # the list-of-lists maze only exists at the HTTP boundary
+    grid = load_grid(data)
+    start = cell_arg(grid, data.get("start", (0, 0)), "start")
+    end = cell_arg(grid, data.get("end", (grid.rows - 1, grid.cols - 1)), "end")
+    algo = data.get("algo", "astar")
+
+    # search the contracted corridor graph instead of single cells; its
+    # edges count steps, so terrain mazes always search the cells
+    contract = bool(data.get("contract")) and grid.costs is None
+
+    # default to A* if invalid key
+    if algo not in ALGORITHMS:
+        algo = "astar"
+
+    label = algo + ("/contract" if contract else "")
+    key = solve_key(grid, start, end, label)
+    cached = solve_cache.get(key)
+    if cached is None:
+        # Measure execution time (perf_counter: time.time() is too coarse for small mazes)
+        search_stats = {}
+        start_time = time.perf_counter()
+        if contract:
+            graph = maze_index(data, grid, "corridor_graph", CorridorGraph)
+            explored, path = graph.solve(start, end, algo)
+        elif algo in HEAP_SOLVERS:
+            explored, path = ALGORITHMS[algo](grid, start, end, stats=search_stats)
+        else:
+            explored, path = ALGORITHMS[algo](grid, start, end)
+        exec_time = time.perf_counter() - start_time
+        solve_cache.put(key, (explored, path, exec_time))
+        solve_seconds.observe(exec_time, algo=label)
+        solve_expanded.observe(len(explored), algo=label)
+        if search_stats:
+            heap_pushes.inc(search_stats["heap_pushes"], algo=label)
+            heap_pops.inc(search_stats["heap_pops"], algo=label)
+    else:
+        # a hit reports the time of the original search, not of the lookup
+        explored, path, exec_time = cached
+
+    stats = {
+        **timing(exec_time),
+        "steps": len(explored),
+        "path_length": len(path),
+        "path_cost": grid.path_cost(path),
+        "cached": cached is not None
+    }
+    start_time = time.perf_counter()
+    if binary:
+        # packed linear indices instead of millions of [r, c] pairs
+        encoding = data.get("encoding", "varint")
+        if encoding not in maze_codec.ENCODINGS:
+            encoding = "varint"
+        result = maze_codec.encode(grid.rows, grid.cols, explored=explored, path=path,
+                                   meta=stats, encoding=encoding)
+        encode_seconds.observe(time.perf_counter() - start_time, endpoint="solve", format="binary")
+        return result
+
+    # Return more info for comparison
+    result = {
+        "explored": grid.to_pairs(explored),
+        "path": grid.to_pairs(path),
+        **stats
+    }
+    encode_seconds.observe(time.perf_counter() - start_time, endpoint="solve", format="pairs")
+    return result
+
+
+# ----------- Request metrics -----------
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    if profiler is not None:
+        g.profile = profiler.start(request.endpoint or "unmatched")
+
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or "unmatched"
+    request_seconds.observe(time.perf_counter() - g.request_started, endpoint=endpoint)
+    request_total.inc(endpoint=endpoint, status=response.status_code)
+    request_bytes.inc(request.content_length or 0, endpoint=endpoint)
+    if not response.is_streamed:
+        response_bytes.inc(response.content_length or 0, endpoint=endpoint)
+    return response
+
 
+@app.teardown_request
+def stop_request_profile(exc):
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profiler.stop(profile)
 
 
 # ----------- Routes -----------
@@ -295,14 +435,7 @@ def index():
 @app.route("/generate")
 def generate():
     # Get optional difficulty parameters from the request
-    rows = int(request.args.get("rows", 25))
-    cols = int(request.args.get("cols", 35))
-    
-    global ROWS, COLS
-    ROWS, COLS = rows, cols
-
-    maze = generate_maze()
-    return jsonify(maze)
+    return respond(handle_generate(request.args, maze_codec.wants_binary(request)))
 
 
 
@@ -354,44 +487,280 @@ def generate():
 # these for compariosn 
 @app.route("/solve", methods=["POST"])
 def solve():
-    import time  # make sure this is at the top of your file too
-
     data = request.json
-    maze = data.get("maze")
-    start = tuple(data.get("start", (0, 0)))
-    end = tuple(data.get("end", (len(maze) - 1, len(maze[0]) - 1)))
-    algo = data.get("algo", "astar")
+    return respond(handle_solve(data, maze_codec.wants_binary(request, data)))
 
-    # Dictionary of all algorithms
-    algorithms = {
-        "bfs": bfs_with_exploration,
-        "dfs": dfs_with_exploration,
-        "dijkstra": dijkstra_with_exploration,
-        "greedy": greedy_best_first,
-        "bidirectional": bidirectional_bfs,
-        "astar": astar_with_exploration
-    }
+
+# Server-Sent Events: explored cells are pushed in batches while the search runs,
+# so the client can start drawing before it ends. GET so EventSource can use it.
+@app.route("/solve/stream")
+def solve_stream():
+    args = request.args
+    grid = load_grid({"maze_id": args.get("maze_id")})
+    start = cell_arg(grid, args.get("start", "0,0"), "start")
+    end = cell_arg(grid, args.get("end", (grid.rows - 1, grid.cols - 1)), "end")
+    algo = args.get("algo", "astar")
+    batch_size = min(max(int_arg(args, "batch", 256), 1), 65536)
 
     # default to A* if invalid key
-    if algo not in algorithms:
+    if algo not in STEP_ALGORITHMS:
         algo = "astar"
 
-    # Measure execution time
-    start_time = time.time()
-    explored, path = algorithms[algo](maze, start, end)
-    end_time = time.time()
+    def events():
+        steps = STEP_ALGORITHMS[algo](grid, start, end, batch_size)
+        count = 0
+        start_time = time.perf_counter()
+        while True:
+            try:
+                batch = next(steps)
+            except StopIteration as stop:
+                path = stop.value
+                break
+            count += len(batch)
+            yield f"event: explored\ndata: {json.dumps(grid.to_pairs(batch))}\n\n"
+        exec_time = time.perf_counter() - start_time
+        yield "event: path\ndata: " + json.dumps({
+            "path": grid.to_pairs(path),
+            **timing(exec_time),
+            "steps": count,
+            "path_length": len(path),
+            "path_cost": grid.path_cost(path)
+        }) + "\n\n"
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# all algorithms in one request, run in parallel worker processes
+@app.route("/compare", methods=["POST"])
+def compare():
+    data = request.json
+    grid = load_grid(data)
+    start = cell_arg(grid, data.get("start", (0, 0)), "start")
+    end = cell_arg(grid, data.get("end", (grid.rows - 1, grid.cols - 1)), "end")
+    algos = data.get("algos", list(ALGORITHMS))
+    if not isinstance(algos, list) or not all(isinstance(a, str) and a in ALGORITHMS for a in algos):
+        abort(400, description="algos must be a list of: " + ", ".join(ALGORITHMS))
+
+    start_time = time.perf_counter()
+    results, pending = {}, {}
+    for algo in algos:
+        key = solve_key(grid, start, end, algo)
+        cached = solve_cache.get(key)
+        if cached is None:
+            pending[algo] = ALGORITHMS[algo]
+        else:
+            results[algo] = cached + (True,)
+    for algo, result in solve_many(grid, start, end, pending).items():
+        solve_cache.put(solve_key(grid, start, end, algo), result)
+        results[algo] = result + (False,)
+    total_time = time.perf_counter() - start_time
 
-    exec_time = round(end_time - start_time, 4)  # seconds rounded to 4 decimals
+    return jsonify({
+        "results": [
+            {
+                "algo": algo,
+                **timing(results[algo][2]),
+                "steps": len(results[algo][0]),
+                "path_length": len(results[algo][1]),
+                "path_cost": grid.path_cost(results[algo][1]),
+                "cached": results[algo][3]
+            }
+            for algo in algos
+        ],
+        "total_time_ms": round(total_time * 1000, 3)
+    })
+
+
+# Shortest path between two cells. Unedited generated mazes are trees, so the
+# answer comes from a per-maze LCA index without any search; anything else
+# (edited, braided or posted mazes) falls back to A*.
+@app.route("/path", methods=["POST"])
+def path_route():
+    data = request.json
+    grid = load_grid(data)
+    start = cell_arg(grid, data.get("start", (0, 0)), "start")
+    end = cell_arg(grid, data.get("end", (grid.rows - 1, grid.cols - 1)), "end")
+
+    start_time = time.perf_counter()
+    tree = None
+    if grid.cells[start] == PATH and grid.cells[end] == PATH:
+        tree = registry_index(data, grid, "tree", MazeTree)
+    if tree is not None and tree.perfect:
+        path, method = tree.path(start, end), "tree"
+    else:
+        path, method = ALGORITHMS["astar"](grid, start, end)[1], "search"
+    exec_time = time.perf_counter() - start_time
 
-    # Return more info for comparison
     return jsonify({
-        "explored": [[r, c] for r, c in explored],
-        "path": [[r, c] for r, c in path],
-        "time": float(exec_time),
+        "path": grid.to_pairs(path),
+        "distance": len(path) - 1 if path else -1,
+        "path_length": len(path),
+        "path_cost": grid.path_cost(path),
+        "method": method,
+        **timing(exec_time)
+    })
+
+
+# Next k steps towards the goal from (r, c), read off the goal distance field:
+# O(k) per request, no search. GET /hint?maze_id=...&r=..&c=..&k=..&prev=r,c
+@app.route("/hint")
+def hint():
+    args = request.args
+    grid = load_grid({"maze_id": args.get("maze_id")})
+    cost, steps = maze_index({"maze_id": args.get("maze_id")}, grid, "goal_field", goal_field)
+    cell = cell_arg(grid, (int_arg(args, "r", 0), int_arg(args, "c", 0)), "r, c")
+    k = min(max(int_arg(args, "k", 10), 0), len(grid))
+    costs = grid.costs
+
+    # follow the cheapest walk: each step pays the cost of the cell it enters
+    hints = []
+    node = cell
+    while len(hints) < k and steps[node] > 0:
+        node = next(n for n in grid.neighbors(node) if steps[n] == steps[node] - 1
+                    and cost[n] + (costs[n] if costs else 1) == cost[node])
+        hints.append(node)
+
+    closer = None
+    if args.get("prev"):
+        prev = cell_arg(grid, args["prev"], "prev")
+        if cost[prev] >= 0 and cost[cell] >= 0:
+            closer = cost[cell] < cost[prev]
+    return jsonify({
+        "distance": steps[cell],
+        "remaining_length": steps[cell] + 1 if steps[cell] >= 0 else 0,
+        "remaining_cost": cost[cell],
+        "next": grid.to_pairs(hints),
+        "closer": closer
+    })
+
+
+# Stateful re-planning: POST /plan starts a D* Lite session on a maze, then
+# POST /plan/<id> with {"start": [r, c]} and/or {"edits": [[r, c, value], ...]}
+# repairs the previous search instead of solving from scratch.
+def plan_response(session_id, planner, explored, path, exec_time):
+    grid = planner.grid
+    return jsonify({
+        "session_id": session_id,
+        "explored": grid.to_pairs(explored),
+        "path": grid.to_pairs(path),
+        **timing(exec_time),
         "steps": len(explored),
-        "path_length": len(path)
+        "path_length": len(path),
+        "path_cost": grid.path_cost(path)
+    })
+
+
+@app.route("/plan", methods=["POST"])
+def plan_create():
+    data = request.json
+    grid = load_grid(data)
+    start = cell_arg(grid, data.get("start", (0, 0)), "start")
+    end = cell_arg(grid, data.get("end", (grid.rows - 1, grid.cols - 1)), "end")
+
+    start_time = time.perf_counter()
+    planner = DStarLite(grid, start, end)
+    explored, path = planner.plan()
+    exec_time = time.perf_counter() - start_time
+    return plan_response(planner_sessions.add(planner), planner, explored, path, exec_time)
+
+
+@app.route("/plan/<session_id>", methods=["POST"])
+def plan_update(session_id):
+    data = request.json
+    session = planner_sessions.get(session_id)
+    if session is None:
+        abort(404, description="unknown or expired planner session")
+    with session.lock:
+        planner = session.planner
+        grid = planner.grid
+        # validate everything before touching the planner
+        edits = edit_args(grid, data.get("edits") or [])
+        start = cell_arg(grid, data["start"], "start") if "start" in data else None
+        start_time = time.perf_counter()
+        for cell, value in edits:
+            planner.set_cell(cell, value)
+        if start is not None:
+            planner.move_start(start)
+        explored, path = planner.plan()
+        exec_time = time.perf_counter() - start_time
+    return plan_response(session_id, planner, explored, path, exec_time)
+
+
+@app.route("/plan/<session_id>", methods=["DELETE"])
+def plan_delete(session_id):
+    if not planner_sessions.discard(session_id):
+        abort(404, description="unknown or expired planner session")
+    return "", 204
+
+
+@app.route("/cache-stats")
+def cache_stats():
+    return jsonify(solve_cache.stats())
+
+
+@app.route("/metrics")
+def metrics_route():
+    return Response(metrics.render(), content_type=MetricsRegistry.CONTENT_TYPE)
+
+
+# Stored mazes: GET /stores/<name> describes one, and
+# GET /stores/<name>/tile?r=..&c=..&rows=..&cols=.. returns the window
+# starting at (r, c), clipped to the maze. JSON tiles carry the stored
+# distance layer too; binary tiles (format=binary) are walls only.
+def get_store(name):
+    store = maze_stores.get(name) if maze_stores is not None else None
+    if store is None:
+        abort(404, description="unknown maze store")
+    return store
+
+
+@app.route("/stores/<name>")
+def store_info(name):
+    store = get_store(name)
+    return jsonify({"name": name, "rows": store.rows, "cols": store.cols,
+                    "distance": store.has_distance, "meta": store.meta})
+
+
+@app.route("/stores/<name>/tile")
+def store_tile(name):
+    store = get_store(name)
+    args = request.args
+    r, c = int_arg(args, "r", 0), int_arg(args, "c", 0)
+    rows = min(max(int_arg(args, "rows", 256), 1), MAX_TILE)
+    cols = min(max(int_arg(args, "cols", 256), 1), MAX_TILE)
+    try:
+        tile, distances = store.tile(r, c, rows, cols)
+    except IndexError:
+        abort(400, description="tile is outside the maze")
+
+    meta = {"r": r, "c": c, "maze_rows": store.rows, "maze_cols": store.cols}
+    if maze_codec.wants_binary(request):
+        return respond(maze_codec.encode(tile.rows, tile.cols, cells=tile.cells, meta=meta))
+    result = {**meta, "rows": tile.rows, "cols": tile.cols, "maze": tile.to_lists()}
+    if distances is not None:
+        result["distances"] = distances
+    return respond(result)
+
+
+@app.route("/distance-field", methods=["POST"])
+def distance_field_route():
+    data = request.json
+    grid = load_grid(data)
+    sources = data.get("sources", [(0, 0)])
+    if not isinstance(sources, list):
+        abort(400, description="sources must be a list of [row, col]")
+    sources = [cell_arg(grid, source, "source") for source in sources]
+
+    dist = distance_field(grid, sources)
+    cols = grid.cols
+    return jsonify({
+        "distances": [dist[r * cols:(r + 1) * cols].tolist() for r in range(grid.rows)],
+        "max_distance": max(dist),
+        "reachable": len(dist) - dist.count(-1),
     })
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # generation and solving keep no per-request module state, so threads are safe
+    app.run(debug=True, threaded=True)
@@ -0,0 +1,228 @@
+"""
+asgi.py
+Asynchronous serving mode for the maze app.
+
+/generate and /solve are answered by a small ASGI application that hands the
+CPU work (handle_generate / handle_solve from app.py) to a bounded thread
+pool, so the event loop keeps accepting and answering requests while long
+solves run. Every other path (the page, static files, /compare, the SSE
+stream, ...) falls through to the Flask app via asgiref's WsgiToAsgi.
+
+- backpressure: at most MAZE_ASGI_QUEUE_LIMIT generate/solve jobs may be
+  queued or running; beyond that requests get 503 with Retry-After
+- timeouts: a job that takes longer than MAZE_ASGI_TIMEOUT seconds is
+  answered with 504; its worker still finishes and keeps its queue slot
+  until it does, so timeouts can't be used to overfill the pool
+- MAZE_ASGI_WORKERS sets the pool size (default: CPU count)
+- metrics: these two routes record the same request metrics as the Flask
+  routes, so /metrics (served by Flask) covers both front ends
+
+The pool holds threads rather than processes because the maze registry and
+solve cache live in this process; /compare keeps using its process pool.
+
+Run: uvicorn asgi:application   (or python asgi.py --port 8000)
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from werkzeug.exceptions import HTTPException
+
+import maze_codec
+from app import (app, handle_generate, handle_solve, encode_seconds, request_seconds,
+                 request_total, request_bytes, response_bytes)
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # pragma: no cover - asgiref is optional
+    WsgiToAsgi = None
+
+WORKERS = int(os.environ.get("MAZE_ASGI_WORKERS", 0)) or os.cpu_count() or 1
+QUEUE_LIMIT = int(os.environ.get("MAZE_ASGI_QUEUE_LIMIT", 64))
+TIMEOUT = float(os.environ.get("MAZE_ASGI_TIMEOUT", 30))
+MAX_BODY = int(os.environ.get("MAZE_ASGI_MAX_BODY", 64 * 2**20))
+
+executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="maze")
+flask_app = WsgiToAsgi(app) if WsgiToAsgi is not None else None
+
+# generate/solve jobs queued or running; only touched from the event loop
+in_flight = 0
+
+
+# ----------- Request / response helpers -----------
+async def send_response(send, status, body, content_type="application/json", headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                    *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_json(send, status, payload, headers=()):
+    await send_response(send, status, json.dumps(payload).encode(), headers=headers)
+
+
+async def send_error(send, status, message, headers=()):
+    await send_json(send, status, {"error": message}, headers)
+
+
+def header(scope, name):
+    for key, value in scope.get("headers", ()):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return ""
+
+
+async def read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY:
+            raise ValueError("request body too large")
+        if not message.get("more_body"):
+            return bytes(body)
+
+
+# ----------- Jobs -----------
+def _release(future):
+    global in_flight
+    in_flight -= 1
+    if not future.cancelled():
+        future.exception()  # retrieved, even if nobody waited for it
+
+
+async def run_job(send, endpoint, handler, *args):
+    global in_flight
+    if in_flight >= QUEUE_LIMIT:
+        await send_error(send, 503, "server busy, try again", [(b"retry-after", b"1")])
+        return
+    in_flight += 1
+    future = asyncio.get_running_loop().run_in_executor(executor, handler, *args)
+    # the slot is freed when the worker really finishes, not when we stop waiting
+    future.add_done_callback(_release)
+    try:
+        result = await asyncio.wait_for(asyncio.shield(future), TIMEOUT)
+    except asyncio.TimeoutError:
+        await send_error(send, 504, f"timed out after {TIMEOUT:g} s")
+        return
+    except HTTPException as e:
+        await send_error(send, e.code, e.description)
+        return
+    except (IndexError, ValueError, TypeError) as e:
+        await send_error(send, 400, str(e))
+        return
+
+    if isinstance(result, bytes):
+        await send_response(send, 200, result, maze_codec.CONTENT_TYPE)
+    else:
+        start_time = time.perf_counter()
+        body = json.dumps(result).encode()
+        encode_seconds.observe(time.perf_counter() - start_time, endpoint=endpoint, format="json")
+        await send_response(send, 200, body)
+
+
+async def generate(scope, receive, send):
+    args = dict(parse_qsl(scope.get("query_string", b"").decode()))
+    binary = maze_codec.binary_requested(args.get("format"), header(scope, b"accept"))
+    await run_job(send, "generate", handle_generate, args, binary)
+
+
+async def solve(scope, receive, send):
+    try:
+        body = await read_body(receive)
+    except ValueError as e:
+        await send_error(send, 413, str(e))
+        return
+    if body is None:
+        return
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        await send_error(send, 400, "request body must be a JSON object")
+        return
+    args = dict(parse_qsl(scope.get("query_string", b"").decode()))
+    binary = maze_codec.binary_requested(data.get("format") or args.get("format"),
+                                         header(scope, b"accept"))
+    await run_job(send, "solve", handle_solve, data, binary)
+
+
+ROUTES = {
+    ("GET", "/generate"): generate,
+    ("POST", "/solve"): solve,
+}
+
+
+async def instrumented(route, scope, receive, send):
+    endpoint = route.__name__
+    start_time = time.perf_counter()
+    status, received = 500, 0
+
+    async def counting_receive():
+        nonlocal received
+        message = await receive()
+        received += len(message.get("body", b""))
+        return message
+
+    async def counting_send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            response_bytes.inc(len(message.get("body", b"")), endpoint=endpoint)
+        await send(message)
+
+    try:
+        await route(scope, counting_receive, counting_send)
+    finally:
+        request_seconds.observe(time.perf_counter() - start_time, endpoint=endpoint)
+        request_total.inc(endpoint=endpoint, status=status)
+        request_bytes.inc(received, endpoint=endpoint)
+
+
+# ----------- Application -----------
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            executor.shutdown(wait=False, cancel_futures=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    route = ROUTES.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+    if route is not None:
+        await instrumented(route, scope, receive, send)
+    elif flask_app is not None:
+        await flask_app(scope, receive, send)
+    else:
+        await send_error(send, 501, "install asgiref to serve the rest of the app over ASGI")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the maze app over ASGI.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(application, host=args.host, port=args.port)
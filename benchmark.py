@@ -0,0 +1,196 @@
+"""
+benchmark.py
+Benchmark harness for the maze generators and solvers.
+
+Runs every generator and every solver across seeded mazes of several sizes
+and topologies (perfect maze, braided maze, open field) and records:
+- ns/op (best of --repeat runs, perf_counter_ns) and ns per expanded node
+- expanded-node count and path length
+- path validity and optimality against the BFS distance
+- peak memory via tracemalloc (a separate run, since tracing slows things down)
+
+Results go to a JSON report; pass --baseline old.json to print the ratio of
+each timing against a previous report.
+
+Run: python benchmark.py --sizes 101x101,301x301 --out report.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import maze_generator
+from maze_solvers import SOLVERS
+from maze_wavefront import wavefront_bfs, distance_field
+
+TOPOLOGIES = ("perfect", "braided", "open")
+
+
+def all_solvers():
+    solvers = dict(SOLVERS)
+    solvers["wavefront"] = wavefront_bfs
+    return solvers
+
+
+def build_maze(topology, rows, cols, seed):
+    if topology == "perfect":
+        return maze_generator.generate(rows, cols, seed=seed)
+    if topology == "braided":
+        return maze_generator.braid(maze_generator.generate(rows, cols, seed=seed), 0.5, random.Random(seed))
+    if topology == "open":
+        return maze_generator.open_field(rows, cols, 0.25, random.Random(seed))
+    raise ValueError(f"unknown topology: {topology}")
+
+
+def best_time(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        result = func()
+        elapsed = time.perf_counter_ns() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def path_is_valid(grid, path, start, end):
+    if not path:
+        return True
+    if path[0] != start or path[-1] != end:
+        return False
+    return all(grid.cells[b] == maze_generator.PATH and b in grid.neighbors(a)
+               for a, b in zip(path, path[1:]))
+
+
+def bench_generators(sizes, algos, repeat, seed, memory):
+    rows_out = []
+    for rows, cols in sizes:
+        for algo in algos:
+            def run():
+                return maze_generator.generate(rows, cols, algo, seed)
+            ns, _ = best_time(run, repeat)
+            rows_out.append({
+                "generator": algo,
+                "rows": rows,
+                "cols": cols,
+                "ns_per_op": ns,
+                "ns_per_cell": ns / (rows * cols),
+                "peak_bytes": peak_memory(run) if memory else None,
+            })
+            print(f"gen   {algo:14s} {rows}x{cols:<6d} {ns / 1e6:10.2f} ms")
+    return rows_out
+
+
+def bench_solvers(sizes, topologies, solvers, repeat, seed, memory):
+    rows_out = []
+    for rows, cols in sizes:
+        for topology in topologies:
+            grid = build_maze(topology, rows, cols, seed)
+            start, end = 0, len(grid) - 1
+            optimal = distance_field(grid, [start])[end]
+            optimal_length = optimal + 1 if optimal >= 0 else 0
+            for name, solver in solvers.items():
+                ns, (explored, path) = best_time(lambda: solver(grid, start, end), repeat)
+                rows_out.append({
+                    "solver": name,
+                    "topology": topology,
+                    "rows": rows,
+                    "cols": cols,
+                    "seed": seed,
+                    "ns_per_op": ns,
+                    "ns_per_expanded": ns / len(explored) if explored else None,
+                    "expanded": len(explored),
+                    "path_length": len(path),
+                    "optimal_length": optimal_length,
+                    "optimal": len(path) == optimal_length,
+                    "valid": path_is_valid(grid, path, start, end),
+                    "peak_bytes": peak_memory(lambda: solver(grid, start, end)) if memory else None,
+                })
+                print(f"solve {name:14s} {topology:8s} {rows}x{cols:<6d} {ns / 1e6:10.2f} ms  "
+                      f"expanded {len(explored):>9,d}  path {len(path):>7,d}"
+                      f"{'' if len(path) == optimal_length else '  (suboptimal)'}")
+    return rows_out
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    # ratio new/old of ns_per_op for every matching benchmark row
+    def key(row):
+        return tuple(row.get(k) for k in ("generator", "solver", "topology", "rows", "cols"))
+
+    old = {key(row): row for row in baseline.get("generators", []) + baseline.get("solvers", [])}
+    print("\nagainst baseline", baseline.get("meta", {}).get("revision"))
+    for row in report["generators"] + report["solvers"]:
+        prev = old.get(key(row))
+        if prev:
+            name = row.get("generator") or row.get("solver")
+            label = f"{name} {row.get('topology', '')} {row['rows']}x{row['cols']}"
+            print(f"  {label:40s} x{row['ns_per_op'] / prev['ns_per_op']:6.2f}")
+
+
+def parse_sizes(text):
+    return [tuple(int(x) for x in size.lower().split("x")) for size in text.split(",")]
+
+
+def main(argv=None):
+    solvers = all_solvers()
+    parser = argparse.ArgumentParser(description="Benchmark maze generators and solvers.")
+    parser.add_argument("--sizes", default="51x51,101x101,301x301")
+    parser.add_argument("--topologies", default=",".join(TOPOLOGIES))
+    parser.add_argument("--generators", default=",".join(maze_generator.GENERATORS))
+    parser.add_argument("--solvers", default=",".join(solvers))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    parser.add_argument("--out", default="benchmark_report.json")
+    parser.add_argument("--baseline", help="earlier report to compare timings against")
+    args = parser.parse_args(argv)
+
+    sizes = parse_sizes(args.sizes)
+    memory = not args.no_memory
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "generators": bench_generators(sizes, args.generators.split(","), args.repeat, args.seed, memory),
+        "solvers": bench_solvers(sizes, args.topologies.split(","),
+                                 {name: solvers[name] for name in args.solvers.split(",")},
+                                 args.repeat, args.seed, memory),
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nreport written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
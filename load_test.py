@@ -0,0 +1,147 @@
+"""
+load_test.py
+Latency under concurrent load for the Flask server vs the ASGI mode.
+
+Starts each server in a subprocess (Flask's threaded dev server and
+uvicorn running asgi:application), then runs --clients concurrent clients
+against it. Every client loops for --duration seconds; each iteration is a
+heavy /solve on a large maze with probability --heavy, otherwise a small
+/generate. Reports requests/s and p50/p99 latency per request kind, plus
+how many requests were shed with 503 or timed out with 504.
+
+Run: python load_test.py --clients 100 --duration 20
+     python load_test.py --url http://127.0.0.1:8000   (an already running server)
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+SERVERS = {
+    "flask": [sys.executable, "-c", "from app import app; app.run(port={port}, threaded=True)"],
+    "asgi": [sys.executable, "-m", "uvicorn", "asgi:application", "--port", "{port}",
+             "--log-level", "warning", "--backlog", "1024"],
+}
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def request(conn, method, path, body=None):
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    res = conn.getresponse()
+    data = res.read()
+    return res.status, data
+
+
+def wait_ready(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            if request(conn, "GET", "/cache-stats")[0] == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def run_load(host, port, clients, duration, heavy, heavy_size, seed):
+    # one big seeded maze for the heavy solves; the cache is bypassed by varying the end cell
+    conn = http.client.HTTPConnection(host, port, timeout=120)
+    status, body = request(conn, "GET", f"/generate?rows={heavy_size}&cols={heavy_size}&seed={seed}")
+    if status != 200:
+        raise RuntimeError(f"could not generate the heavy maze: HTTP {status}")
+    maze_id = json.loads(body)["maze_id"]
+
+    samples = {"generate": [], "solve": []}
+    statuses = {}
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def client(n):
+        rng = random.Random(seed + n)
+        conn = http.client.HTTPConnection(host, port, timeout=120)
+        while time.monotonic() < stop:
+            if rng.random() < heavy:
+                kind = "solve"
+                end = [heavy_size - 1 - 2 * rng.randrange(heavy_size // 4), heavy_size - 1]
+                args = ("POST", "/solve", {"maze_id": maze_id, "algo": "astar", "end": end, "format": "binary"})
+            else:
+                kind = "generate"
+                args = ("GET", f"/generate?rows=25&cols=35&seed={rng.randrange(2**32)}")
+            t0 = time.perf_counter()
+            try:
+                status, _ = request(conn, *args)
+            except OSError:
+                status = "error"
+                conn = http.client.HTTPConnection(host, port, timeout=120)
+            elapsed = time.perf_counter() - t0
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    samples[kind].append(elapsed)
+            if status == 503:
+                time.sleep(0.1)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, statuses, time.perf_counter() - t0
+
+
+def report(name, samples, statuses, elapsed):
+    done = sum(len(v) for v in samples.values())
+    print(f"\n{name}: {done / elapsed:8.1f} ok req/s   statuses {dict(sorted(statuses.items(), key=str))}")
+    for kind, values in samples.items():
+        print(f"  {kind:9s} n={len(values):6d}  p50 {percentile(values, 0.5) * 1000:9.1f} ms"
+              f"  p99 {percentile(values, 0.99) * 1000:9.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="p50/p99 latency under concurrent clients.")
+    parser.add_argument("--servers", default="flask,asgi")
+    parser.add_argument("--url", help="test an already running server instead of starting one")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--heavy", type=float, default=0.05, help="share of requests that are big solves")
+    parser.add_argument("--heavy-size", type=int, default=501)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    load = (args.clients, args.duration, args.heavy, args.heavy_size, args.seed)
+
+    if args.url:
+        url = urlsplit(args.url)
+        report(args.url, *run_load(url.hostname, url.port or 80, *load))
+        return
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in args.servers.split(","):
+        cmd = [part.format(port=args.port) for part in SERVERS[name]]
+        server = subprocess.Popen(cmd, cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_ready("127.0.0.1", args.port)
+            report(name, *run_load("127.0.0.1", args.port, *load))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
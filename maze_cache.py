@@ -0,0 +1,102 @@
+"""
+maze_cache.py
+LRU cache for solver results, keyed by a hash of the maze contents.
+
+Repeated hints and algorithm comparisons post the same maze over and over;
+with the cache those cost a dictionary lookup instead of a search. The
+cache is bounded both by entry count and by the bytes held in the cached
+explored/path arrays, and is safe to share between request threads.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+ENTRY_OVERHEAD = 256  # rough per-entry bookkeeping cost in bytes
+
+
+def maze_key(grid, *extra):
+    # blake2b over the dimensions, the raw cell (and terrain cost) bytes and any extra fields
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{grid.rows}x{grid.cols}:".encode())
+    h.update(grid.cells)
+    if grid.costs is not None:
+        h.update(b"|costs:")
+        h.update(grid.costs)
+    for value in extra:
+        h.update(f"|{value}".encode())
+    return h.digest()
+
+
+def solve_key(grid, start, end, algo):
+    return maze_key(grid, start, end, algo)
+
+
+def result_size(value):
+    # bytes held by the array payloads of a cached value (or its own nbytes)
+    if hasattr(value, "nbytes"):
+        return ENTRY_OVERHEAD + value.nbytes
+    if hasattr(value, "itemsize"):
+        return ENTRY_OVERHEAD + len(value) * value.itemsize
+    return ENTRY_OVERHEAD + sum(
+        len(item) * item.itemsize for item in value if hasattr(item, "itemsize")
+    )
+
+
+class SolveCache:
+    def __init__(self, max_entries=256, max_bytes=64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = result_size(value)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._data[key] = (value, size)
+            self.bytes += size
+            while len(self._data) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
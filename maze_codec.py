@@ -0,0 +1,226 @@
+"""
+maze_codec.py
+Compact binary encoding for mazes and solver traces.
+
+Layout (little-endian, every section 4-byte aligned so the browser can map
+uint32 payloads straight onto a Uint32Array):
+
+    header   magic "MZB1" | u8 version | u8 encoding | 2 pad | u32 rows | u32 cols
+    section  u8 tag | 3 pad | u32 byte length | payload | pad to 4 bytes
+
+    tag 1  maze     bitset, row-major, LSB first, 1 = wall
+    tag 2  explored linear cell indices
+    tag 3  path     linear cell indices
+    tag 4  meta     UTF-8 JSON object (maze_id, time, steps, ...)
+    tag 5  costs    uint8 per cell, row-major: terrain movement costs
+
+Index sequences are either packed uint32 (encoding 0) or zigzag varint
+deltas (encoding 1); consecutive cells in a trace are usually +-1 or
++-cols apart, so the varint form needs 1-2 bytes per cell. The matching
+decoder is decodeMazeBinary() in static/script.js.
+
+Sizes and timings: python maze_codec.py --size 1000x1000
+"""
+
+import json
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+MAGIC = b"MZB1"
+VERSION = 1
+HEADER = struct.Struct("<4sBBxxII")
+SECTION = struct.Struct("<BxxxI")
+
+ENCODING_U32, ENCODING_VARINT = 0, 1
+ENCODINGS = {"u32": ENCODING_U32, "varint": ENCODING_VARINT}
+TAG_MAZE, TAG_EXPLORED, TAG_PATH, TAG_META, TAG_COSTS = 1, 2, 3, 4, 5
+
+CONTENT_TYPE = "application/x-maze-binary"
+
+
+# ----------- Bitset -----------
+def pack_bits(cells):
+    if np is not None:
+        return np.packbits(np.frombuffer(cells, dtype=np.uint8), bitorder="little").tobytes()
+    out = bytearray((len(cells) + 7) // 8)
+    for i, v in enumerate(cells):
+        if v:
+            out[i >> 3] |= 1 << (i & 7)
+    return bytes(out)
+
+
+def unpack_bits(data, count):
+    if np is not None:
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count, bitorder="little")
+        return bytearray(bits.tobytes())
+    return bytearray((data[i >> 3] >> (i & 7)) & 1 for i in range(count))
+
+
+# ----------- Index sequences -----------
+def pack_u32(indices):
+    # cell indices are never negative, so int32 arrays share the uint32 bytes
+    if not (isinstance(indices, array) and indices.itemsize == 4):
+        indices = array("I", indices)
+    if sys.byteorder == "big":
+        indices = array(indices.typecode, indices)
+        indices.byteswap()
+    return indices.tobytes()
+
+
+def unpack_u32(data):
+    values = array("I")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def pack_varint_deltas(indices):
+    if np is not None:
+        values = np.asarray(indices, dtype=np.int64)
+        if values.size == 0:
+            return b""
+        deltas = np.diff(values, prepend=0)
+        zz = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+        nbytes = np.ones(zz.size, dtype=np.int64)
+        for shift in (7, 14, 21, 28, 35):
+            nbytes += zz >= (1 << shift)
+        ends = np.cumsum(nbytes)
+        out = np.empty(int(ends[-1]), dtype=np.uint8)
+        starts = ends - nbytes
+        for k in range(int(nbytes.max())):
+            mask = nbytes > k
+            byte = (zz[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+            more = (nbytes[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+            out[starts[mask] + k] = (byte | more).astype(np.uint8)
+        return out.tobytes()
+    out = bytearray()
+    prev = 0
+    for i in indices:
+        delta = i - prev
+        prev = i
+        v = (delta << 1) ^ (delta >> 63)
+        while v >= 0x80:
+            out.append((v & 0x7F) | 0x80)
+            v >>= 7
+        out.append(v)
+    return bytes(out)
+
+
+def unpack_varint_deltas(data):
+    values = array("i")
+    prev = shift = v = 0
+    for byte in data:
+        v |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        prev += (v >> 1) ^ -(v & 1)
+        values.append(prev)
+        shift = v = 0
+    return values
+
+
+# ----------- Containers -----------
+def _section(tag, payload):
+    pad = -len(payload) % 4
+    return SECTION.pack(tag, len(payload)) + payload + b"\0" * pad
+
+
+def encode(rows, cols, cells=None, explored=None, path=None, meta=None, encoding="varint", costs=None):
+    code = ENCODINGS[encoding]
+    pack = pack_u32 if code == ENCODING_U32 else pack_varint_deltas
+    parts = [HEADER.pack(MAGIC, VERSION, code, rows, cols)]
+    if cells is not None:
+        parts.append(_section(TAG_MAZE, pack_bits(cells)))
+    if costs is not None:
+        parts.append(_section(TAG_COSTS, bytes(costs)))
+    if explored is not None:
+        parts.append(_section(TAG_EXPLORED, pack(explored)))
+    if path is not None:
+        parts.append(_section(TAG_PATH, pack(path)))
+    if meta is not None:
+        parts.append(_section(TAG_META, json.dumps(meta).encode()))
+    return b"".join(parts)
+
+
+def decode(data):
+    magic, version, code, rows, cols = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a maze binary payload")
+    unpack = unpack_u32 if code == ENCODING_U32 else unpack_varint_deltas
+    result = {"rows": rows, "cols": cols}
+    offset = HEADER.size
+    while offset < len(data):
+        tag, length = SECTION.unpack_from(data, offset)
+        offset += SECTION.size
+        payload = bytes(data[offset:offset + length])
+        offset += length + (-length % 4)
+        if tag == TAG_MAZE:
+            result["cells"] = unpack_bits(payload, rows * cols)
+        elif tag == TAG_EXPLORED:
+            result["explored"] = unpack(payload)
+        elif tag == TAG_PATH:
+            result["path"] = unpack(payload)
+        elif tag == TAG_META:
+            result["meta"] = json.loads(payload)
+        elif tag == TAG_COSTS:
+            result["costs"] = bytearray(payload)
+    return result
+
+
+def wants_binary(req, data=None):
+    # format=binary in the JSON body or query string, or an Accept header asking for it
+    fmt = (data or {}).get("format") or req.args.get("format")
+    return binary_requested(fmt, req.headers.get("Accept", ""))
+
+
+def binary_requested(fmt, accept):
+    if fmt:
+        return fmt == "binary"
+    return CONTENT_TYPE in accept
+
+
+# ----------- Sizes and timings -----------
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import maze_generator
+    from maze_solvers import bfs_with_exploration
+
+    parser = argparse.ArgumentParser(description="Compare JSON and binary /solve payloads.")
+    parser.add_argument("--size", default="1000x1000")
+    args = parser.parse_args()
+
+    rows, cols = (int(x) for x in args.size.lower().split("x"))
+    grid = maze_generator.generate(rows, cols)
+    explored, path = bfs_with_exploration(grid, 0, len(grid) - 1)
+
+    t0 = time.perf_counter()
+    body = json.dumps({"explored": grid.to_pairs(explored), "path": grid.to_pairs(path)}).encode()
+    json_encode = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    json.loads(body)
+    json_decode = time.perf_counter() - t0
+    print(f"json      {len(body):>12,d} bytes  encode {json_encode * 1000:8.1f} ms  decode {json_decode * 1000:8.1f} ms")
+
+    for encoding in ENCODINGS:
+        t0 = time.perf_counter()
+        payload = encode(rows, cols, explored=explored, path=path, encoding=encoding)
+        enc = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        decoded = decode(payload)
+        dec = time.perf_counter() - t0
+        assert list(decoded["path"]) == list(path)
+        print(f"{encoding:9s} {len(payload):>12,d} bytes  encode {enc * 1000:8.1f} ms  decode {dec * 1000:8.1f} ms")
+
+    maze_json = json.dumps(grid.to_lists()).encode()
+    maze_bin = encode(rows, cols, cells=grid.cells)
+    print(f"maze json {len(maze_json):>12,d} bytes  bitset {len(maze_bin):,d} bytes")
@@ -0,0 +1,233 @@
+"""
+maze_dataset.py
+Generate and solve seeded mazes in bulk, offline, on every core.
+
+Maze i of a run uses the (size, algo) pair i % len(pairs) and seed
+--seed + i, so any maze can be rebuilt later from its recipe id. Work is
+split into shards of --shard-size mazes; each worker process generates,
+solves and writes a whole shard, so only a few numbers per shard travel back
+to the parent and nothing but the shard in progress is held in memory.
+
+Shards are .npz files (a zip of .npy columns, like np.savez_compressed),
+written without needing numpy. Per maze:
+    index, seed, rows, cols       int64 / int32
+    algo                          uint8 code into algo_names
+    walls, walls_offset           bit-packed cells (LSB first, 1 = wall),
+                                  bytes [walls_offset[k], walls_offset[k+1])
+    costs, cells_offset           terrain costs, one uint8 per cell (--terrain)
+    <solver>_seconds              float64 solve time
+    <solver>_expanded             int32 cells explored
+    <solver>_path_length          int32 cells on the path (0 if none)
+    <solver>_path_cost            int64 terrain cost of the path (steps without terrain)
+    <solver>_path, _path_offset   int32 linear cell indices, like walls
+    <solver>_explored, _offset    exploration order (--explored only)
+A manifest.json next to the shards records the run's settings.
+
+Run: python maze_dataset.py --count 10000 --sizes 21x21,51x51 --solvers bfs,astar --out dataset
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zipfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import maze_generator
+from maze_codec import pack_bits
+from maze_solvers import SOLVERS
+
+# array typecode -> .npy dtype
+NPY_DESCR = {"B": "|u1", "i": "<i4", "q": "<i8", "d": "<f8"}
+
+
+# ----------- .npy / .npz writing -----------
+def _npy_header(descr, shape):
+    header = repr({"descr": descr, "fortran_order": False, "shape": shape})
+    # magic + version + u16 length + dict, padded with spaces to 64 bytes
+    pad = -(10 + len(header) + 1) % 64
+    header = (header + " " * pad + "\n").encode("latin1")
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header
+
+
+def write_array(zf, name, values):
+    # values: array (typecodes in NPY_DESCR) or bytearray/bytes for uint8
+    typecode = getattr(values, "typecode", "B")
+    if typecode != "B" and sys.byteorder == "big":
+        values = array(typecode, values)
+        values.byteswap()
+    with zf.open(name + ".npy", "w", force_zip64=True) as f:
+        f.write(_npy_header(NPY_DESCR[typecode], (len(values),)))
+        f.write(values)
+
+
+def write_strings(zf, name, strings):
+    width = max(1, max(len(s) for s in strings))
+    with zf.open(name + ".npy", "w") as f:
+        f.write(_npy_header(f"<U{width}", (len(strings),)))
+        for s in strings:
+            f.write(s.ljust(width, "\0").encode("utf-32-le"))
+
+
+class Ragged:
+    # variable-length rows as one flat column plus an offsets column
+    def __init__(self, typecode):
+        self.values = array(typecode) if typecode != "B" else bytearray()
+        self.offsets = array("q", [0])
+
+    def append(self, row):
+        self.values.extend(row)
+        self.offsets.append(len(self.values))
+
+    def write(self, zf, name, offsets_name):
+        write_array(zf, name, self.values)
+        write_array(zf, offsets_name, self.offsets)
+
+
+# ----------- Shards -----------
+def maze_plan(first, count, pairs, seed):
+    # (index, rows, cols, algo, seed) for mazes first .. first + count - 1
+    for i in range(first, first + count):
+        (rows, cols), algo = pairs[i % len(pairs)]
+        yield i, rows, cols, algo, seed + i
+
+
+def build_shard(filename, first, count, pairs, algos, solvers, seed, terrain, explored):
+    # worker side: generate, solve and write one shard -> its timings
+    started = time.perf_counter()
+    gen_time = solve_time = 0.0
+    columns = {name: array(code) for name, code in
+               (("index", "q"), ("seed", "q"), ("rows", "i"), ("cols", "i"))}
+    algo_codes = bytearray()
+    walls, costs = Ragged("B"), Ragged("B")
+    per_solver = {
+        name: {"seconds": array("d"), "expanded": array("i"), "path_length": array("i"),
+               "path_cost": array("q"), "path": Ragged("i"), "explored": Ragged("i")}
+        for name in solvers
+    }
+
+    for index, rows, cols, algo, maze_seed in maze_plan(first, count, pairs, seed):
+        t0 = time.perf_counter()
+        grid = maze_generator.generate(rows, cols, algo, maze_seed, terrain)
+        gen_time += time.perf_counter() - t0
+        for name, value in (("index", index), ("seed", maze_seed), ("rows", rows), ("cols", cols)):
+            columns[name].append(value)
+        algo_codes.append(algos.index(algo))
+        walls.append(pack_bits(grid.cells))
+        if terrain:
+            costs.append(grid.costs)
+
+        end = len(grid) - 1
+        for name in solvers:
+            t0 = time.perf_counter()
+            trace, path = SOLVERS[name](grid, 0, end)
+            elapsed = time.perf_counter() - t0
+            solve_time += elapsed
+            out = per_solver[name]
+            out["seconds"].append(elapsed)
+            out["expanded"].append(len(trace))
+            out["path_length"].append(len(path))
+            out["path_cost"].append(grid.path_cost(path))
+            out["path"].append(path)
+            if explored:
+                out["explored"].append(trace)
+
+    t0 = time.perf_counter()
+    tmp = filename + ".tmp"
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, values in columns.items():
+            write_array(zf, name, values)
+        write_array(zf, "algo", algo_codes)
+        write_strings(zf, "algo_names", algos)
+        walls.write(zf, "walls", "walls_offset")
+        if terrain:
+            costs.write(zf, "costs", "cells_offset")
+        for name, out in per_solver.items():
+            for field in ("seconds", "expanded", "path_length", "path_cost"):
+                write_array(zf, f"{name}_{field}", out[field])
+            out["path"].write(zf, f"{name}_path", f"{name}_path_offset")
+            if explored:
+                out["explored"].write(zf, f"{name}_explored", f"{name}_explored_offset")
+    os.replace(tmp, filename)  # a shard file is either complete or absent
+    write_time = time.perf_counter() - t0
+
+    return {"file": os.path.basename(filename), "first": first, "count": count,
+            "bytes": os.path.getsize(filename), "busy": time.perf_counter() - started,
+            "generate": gen_time, "solve": solve_time, "write": write_time}
+
+
+# ----------- CLI -----------
+def parse_sizes(text):
+    return [tuple(int(x) for x in size.lower().split("x")) for size in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and solve a dataset of seeded mazes.")
+    parser.add_argument("--count", type=int, default=1000, help="number of mazes")
+    parser.add_argument("--sizes", default="21x21", help="comma-separated RxC sizes, cycled")
+    parser.add_argument("--algos", default="backtracker", help="comma-separated generators, cycled")
+    parser.add_argument("--solvers", default="bfs,astar", help="comma-separated solvers run on every maze")
+    parser.add_argument("--terrain", action="store_true", help="braided mazes with per-cell costs")
+    parser.add_argument("--explored", action="store_true", help="also store every solver's exploration order")
+    parser.add_argument("--seed", type=int, default=0, help="maze i gets seed + i")
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default="dataset")
+    args = parser.parse_args(argv)
+
+    sizes = parse_sizes(args.sizes)
+    algos = args.algos.split(",")
+    solvers = [s for s in args.solvers.split(",") if s]
+    for algo in algos:
+        if algo not in maze_generator.GENERATORS:
+            parser.error(f"unknown generator: {algo}")
+    for name in solvers:
+        if name not in SOLVERS:
+            parser.error(f"unknown solver: {name}")
+    if args.count < 1 or args.shard_size < 1 or args.workers < 1:
+        parser.error("--count, --shard-size and --workers must be positive")
+    pairs = list(product(sizes, algos))
+
+    os.makedirs(args.out, exist_ok=True)
+    shards = [(first, min(args.shard_size, args.count - first))
+              for first in range(0, args.count, args.shard_size)]
+    width = len(str(len(shards) - 1))
+    done = []
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(build_shard, os.path.join(args.out, f"shard-{k:0{width}d}.npz"), first, count,
+                        pairs, algos, solvers, args.seed, args.terrain, args.explored)
+            for k, (first, count) in enumerate(shards)
+        ]
+        for future in as_completed(futures):
+            shard = future.result()
+            done.append(shard)
+            print(f"{shard['file']}  {shard['count']:>7,d} mazes  {shard['busy']:8.2f} s  "
+                  f"{shard['count'] / shard['busy']:9,.1f} mazes/s  {shard['bytes'] / 2**20:8.1f} MiB")
+    elapsed = time.perf_counter() - t0
+    done.sort(key=lambda shard: shard["first"])
+
+    manifest = {
+        "count": args.count, "seed": args.seed, "sizes": [list(s) for s in sizes], "algos": algos,
+        "solvers": solvers, "terrain": args.terrain, "explored": args.explored,
+        "shards": [{key: shard[key] for key in ("file", "first", "count", "bytes")} for shard in done],
+    }
+    with open(os.path.join(args.out, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    busy = sum(shard["busy"] for shard in done)
+    workers = min(args.workers, len(shards))
+    totals = {key: sum(shard[key] for shard in done) for key in ("generate", "solve", "write")}
+    print(f"{args.count:,d} mazes in {elapsed:.2f} s on {workers} workers: "
+          f"{args.count / elapsed:,.1f} mazes/s, {args.count / busy:,.1f} mazes/s per core "
+          f"({busy / (elapsed * workers):.0%} busy)")
+    print("worker time: " + ", ".join(f"{key} {value:.2f} s" for key, value in totals.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
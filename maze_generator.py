@@ -0,0 +1,364 @@
+"""
+maze_generator.py
+Maze generation engine shared by the Flask app and the Tkinter solver.
+- Recursive backtracker (iterative, explicit stack)
+- Wilson's algorithm (loop-erased random walks, unbiased)
+- Eller's algorithm (row by row, O(cols) working memory)
+- Randomized Kruskal (union-find over shuffled walls)
+
+Every generator draws from the random.Random instance it is given, so a
+maze is fully determined by (rows, cols, algorithm, seed).
+
+Terrain mazes add a per-cell movement cost layer (ground, grass, mud,
+water) laid out in patches, and are braided so that there is more than one
+route and the cheapest one is worth searching for.
+
+Mazes are carved into the flat cell buffer of a maze_grid.Grid.
+Passage cells sit on even coordinates and walls are knocked out between them,
+exactly like the original recursive carver, so nothing here touches the
+recursion limit.
+
+Timings: python maze_generator.py --sizes 100x100,1000x1000,2000x2000
+"""
+
+import random
+from array import array
+
+from maze_grid import Grid, WALL, PATH
+
+
+# ----------- Helpers -----------
+def connect_corner(cells, rows, cols):
+    # With an even number of rows/cols the bottom-right corner is not on the
+    # cell lattice; dig back to the nearest cell so the exit stays reachable.
+    r, c = rows - 1, cols - 1
+    cells[r * cols + c] = PATH
+    while r % 2 or c % 2:
+        if r % 2:
+            r -= 1
+        else:
+            c -= 1
+        cells[r * cols + c] = PATH
+
+
+# ----------- Recursive Backtracker (explicit stack) -----------
+def backtracker(rows, cols, rng=None):
+    grid = Grid(rows, cols)
+    cells = grid.cells
+    crows, ccols = (rows + 1) // 2, (cols + 1) // 2
+    visited = bytearray(crows * ccols)
+    stack = array("i", [0])
+    visited[0] = 1
+    cells[0] = PATH
+    choice = (rng or random.Random()).choice
+
+    while stack:
+        cell = stack[-1]
+        cr, cc = divmod(cell, ccols)
+        options = []
+        if cc + 1 < ccols and not visited[cell + 1]:
+            options.append(cell + 1)
+        if cc > 0 and not visited[cell - 1]:
+            options.append(cell - 1)
+        if cr + 1 < crows and not visited[cell + ccols]:
+            options.append(cell + ccols)
+        if cr > 0 and not visited[cell - ccols]:
+            options.append(cell - ccols)
+        if not options:
+            stack.pop()
+            continue
+        nxt = choice(options)
+        visited[nxt] = 1
+        nr, nc = divmod(nxt, ccols)
+        cells[(cr + nr) * cols + (cc + nc)] = PATH  # wall between (2cr, 2cc) and (2nr, 2nc)
+        cells[2 * nr * cols + 2 * nc] = PATH
+        stack.append(nxt)
+
+    connect_corner(cells, rows, cols)
+    return grid
+
+
+# ----------- Wilson's Algorithm -----------
+def wilson(rows, cols, rng=None):
+    grid = Grid(rows, cols)
+    cells = grid.cells
+    crows, ccols = (rows + 1) // 2, (cols + 1) // 2
+    total = crows * ccols
+    in_tree = bytearray(total)
+    # where the walk last went from each cell; overwriting it erases loops
+    step = array("i", [0]) * total
+    randrange = (rng or random.Random()).randrange
+
+    root = randrange(total)
+    in_tree[root] = 1
+    cells[2 * (root // ccols) * cols + 2 * (root % ccols)] = PATH
+
+    for origin in range(total):
+        if in_tree[origin]:
+            continue
+        cell = origin
+        while not in_tree[cell]:
+            cr, cc = divmod(cell, ccols)
+            while True:
+                d = randrange(4)
+                if d == 0 and cc + 1 < ccols:
+                    nxt = cell + 1
+                elif d == 1 and cc > 0:
+                    nxt = cell - 1
+                elif d == 2 and cr + 1 < crows:
+                    nxt = cell + ccols
+                elif d == 3 and cr > 0:
+                    nxt = cell - ccols
+                else:
+                    continue
+                break
+            step[cell] = nxt
+            cell = nxt
+
+        cell = origin
+        while not in_tree[cell]:
+            in_tree[cell] = 1
+            nxt = step[cell]
+            cr, cc = divmod(cell, ccols)
+            nr, nc = divmod(nxt, ccols)
+            cells[2 * cr * cols + 2 * cc] = PATH
+            cells[(cr + nr) * cols + (cc + nc)] = PATH
+            cell = nxt
+
+    connect_corner(cells, rows, cols)
+    return grid
+
+
+# ----------- Eller's Algorithm -----------
+def iter_eller_rows(rows, cols, rng=None):
+    # Yields the maze one row at a time (as bytearrays of length cols) while
+    # only keeping set labels for the current row of cells.
+    crows, ccols = (rows + 1) // 2, (cols + 1) // 2
+    rng = rng or random.Random()
+    random_ = rng.random
+    labels = [0] * ccols
+    members = {}
+    next_label = 1
+
+    for cr in range(crows):
+        last = cr == crows - 1
+        for cc in range(ccols):
+            if not labels[cc]:
+                labels[cc] = next_label
+                members[next_label] = [cc]
+                next_label += 1
+
+        row = bytearray([WALL]) * cols
+        for cc in range(ccols):
+            row[2 * cc] = PATH
+        for cc in range(ccols - 1):
+            a, b = labels[cc], labels[cc + 1]
+            if a != b and (last or random_() < 0.5):
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                moved = members.pop(b)
+                for m in moved:
+                    labels[m] = a
+                members[a].extend(moved)
+                row[2 * cc + 1] = PATH
+        if last:
+            row[cols - 1] = PATH
+            yield row
+            break
+
+        below = bytearray([WALL]) * cols
+        next_labels = [0] * ccols
+        next_members = {}
+        for label, group in members.items():
+            down = [cc for cc in group if random_() < 0.5]
+            if not down:
+                down = [rng.choice(group)]
+            next_members[label] = down
+            for cc in down:
+                next_labels[cc] = label
+                below[2 * cc] = PATH
+        labels, members = next_labels, next_members
+        yield row
+        yield below
+
+    if rows % 2 == 0:
+        # trailing wall row; its corner is dug up to the last cell row
+        row = bytearray([WALL]) * cols
+        row[cols - 1] = PATH
+        yield row
+
+
+def eller(rows, cols, rng=None):
+    grid = Grid(rows, cols)
+    cells = grid.cells
+    for r, row in enumerate(iter_eller_rows(rows, cols, rng)):
+        cells[r * cols:(r + 1) * cols] = row
+    connect_corner(cells, rows, cols)
+    return grid
+
+
+# ----------- Randomized Kruskal -----------
+def kruskal(rows, cols, rng=None):
+    grid = Grid(rows, cols)
+    cells = grid.cells
+    crows, ccols = (rows + 1) // 2, (cols + 1) // 2
+    total = crows * ccols
+    parent = array("i", range(total))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    # edge = cell * 2 + (0: wall to the right, 1: wall below)
+    edges = [cell * 2 for cell in range(total) if cell % ccols + 1 < ccols]
+    edges += [cell * 2 + 1 for cell in range(total - ccols)]
+    (rng or random.Random()).shuffle(edges)
+
+    for cell in range(total):
+        cells[2 * (cell // ccols) * cols + 2 * (cell % ccols)] = PATH
+
+    remaining = total - 1
+    for edge in edges:
+        if not remaining:
+            break
+        cell, down = edge >> 1, edge & 1
+        other = cell + ccols if down else cell + 1
+        a, b = find(cell), find(other)
+        if a == b:
+            continue
+        parent[a] = b
+        cr, cc = divmod(cell, ccols)
+        if down:
+            cells[(2 * cr + 1) * cols + 2 * cc] = PATH
+        else:
+            cells[2 * cr * cols + 2 * cc + 1] = PATH
+        remaining -= 1
+
+    connect_corner(cells, rows, cols)
+    return grid
+
+
+# ----------- Topology variants -----------
+def braid(grid, p=1.0, rng=None):
+    # Knock one wall out of each dead end with probability p, creating loops
+    rng = rng or random.Random()
+    rows, cols, cells = grid.rows, grid.cols, grid.cells
+    for r in range(0, rows, 2):
+        for c in range(0, cols, 2):
+            i = r * cols + c
+            if cells[i] != PATH or len(list(grid.neighbors(i))) != 1 or rng.random() >= p:
+                continue
+            walls = [(dr, dc) for dr, dc in ((0, 2), (0, -2), (2, 0), (-2, 0))
+                     if 0 <= r + dr < rows and 0 <= c + dc < cols
+                     and cells[(r + dr // 2) * cols + c + dc // 2] == WALL]
+            if walls:
+                dr, dc = rng.choice(walls)
+                cells[(r + dr // 2) * cols + c + dc // 2] = PATH
+    return grid
+
+
+def open_field(rows, cols, density=0.2, rng=None):
+    # empty grid with randomly scattered single-cell obstacles
+    random_ = (rng or random.Random()).random
+    grid = Grid(rows, cols, bytearray(rows * cols))
+    cells = grid.cells
+    for i in range(len(cells)):
+        if random_() < density:
+            cells[i] = WALL
+    cells[0] = cells[-1] = PATH
+    return grid
+
+
+GENERATORS = {
+    "backtracker": backtracker,
+    "wilson": wilson,
+    "eller": eller,
+    "kruskal": kruskal,
+}
+
+
+# ----------- Terrain -----------
+# (name, cost of entering a cell, share of the patches)
+TERRAIN = (
+    ("ground", 1, 0.55),
+    ("grass", 2, 0.2),
+    ("mud", 4, 0.15),
+    ("water", 9, 0.1),
+)
+TERRAIN_PATCH = 6  # patch side in cells
+
+
+def terrain_costs(rows, cols, rng=None, patch=TERRAIN_PATCH):
+    # uint8 costs, one random terrain per patch x patch square
+    rng = rng or random.Random()
+    costs = [cost for _, cost, _ in TERRAIN]
+    weights = [share for _, _, share in TERRAIN]
+    out = bytearray()
+    for r in range(0, rows, patch):
+        picks = rng.choices(costs, weights, k=-(-cols // patch))
+        row = bytes(cost for cost in picks for _ in range(patch))[:cols]
+        out += row * min(patch, rows - r)
+    return out
+
+
+def generate(rows, cols, algo="backtracker", seed=None, terrain=False):
+    # The same (rows, cols, algo, seed, terrain) always gives the same maze;
+    # each call gets its own Random instance, so concurrent calls share no
+    # RNG state.
+    if algo not in GENERATORS:
+        raise ValueError(f"unknown maze algorithm: {algo}")
+    rng = random.Random(seed)
+    grid = GENERATORS[algo](rows, cols, rng)
+    if terrain:
+        braid(grid, 0.5, rng)
+        grid.costs = terrain_costs(rows, cols, rng)
+    return grid
+
+
+def new_seed():
+    return random.SystemRandom().randrange(2**32)
+
+
+# ----------- Recipe ids -----------
+# "<algo>-<rows>x<cols>-<seed>[-terrain]" names a maze completely, so it can
+# be rebuilt instead of stored. Seeds must lie in [0, SEED_LIMIT): a minus
+# sign would split the id.
+SEED_LIMIT = 2**63
+
+def recipe_id(rows, cols, algo, seed, terrain=False):
+    return f"{algo}-{rows}x{cols}-{seed}" + ("-terrain" if terrain else "")
+
+
+def parse_recipe_id(maze_id):
+    # -> (rows, cols, algo, seed, terrain) or None
+    try:
+        algo, size, seed, *flags = maze_id.split("-")
+        rows, cols = (int(x) for x in size.split("x"))
+        seed = int(seed)
+    except (AttributeError, ValueError):
+        return None
+    if (algo not in GENERATORS or rows < 1 or cols < 1 or not 0 <= seed < SEED_LIMIT
+            or flags not in ([], ["terrain"])):
+        return None
+    return rows, cols, algo, seed, bool(flags)
+
+
+# ----------- Timings -----------
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Time the maze generators.")
+    parser.add_argument("--sizes", default="100x100,1000x1000,2000x2000")
+    parser.add_argument("--algos", default=",".join(GENERATORS))
+    args = parser.parse_args()
+
+    for size in args.sizes.split(","):
+        rows, cols = (int(x) for x in size.lower().split("x"))
+        for algo in args.algos.split(","):
+            t0 = time.perf_counter()
+            generate(rows, cols, algo, seed=1)
+            elapsed = time.perf_counter() - t0
+            print(f"{algo:12s} {rows}x{cols:<6d} {elapsed:8.3f} s  {rows * cols / elapsed:12,.0f} cells/s")
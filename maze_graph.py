@@ -0,0 +1,284 @@
+"""
+maze_graph.py
+Corridor contraction: a maze as a weighted graph of junctions and dead ends.
+
+Generated mazes are mostly corridors of degree-2 cells. CorridorGraph keeps
+only the cells whose degree is not 2 as nodes and replaces every corridor
+between two of them with a single edge, weighted by its length in steps
+and storing its interior cells. A loop of degree-2 cells with no junction
+on it gets one of its cells promoted to a node so it is not lost.
+
+Searches run on the graph and the result is expanded back into cells, so
+graph.solve(start, end, algo) returns the same (explored, path) pair as the
+solvers in maze_solvers.py; explored holds the cells of the expanded graph
+nodes. Start and end may sit in the middle of a corridor: they are attached
+to the two ends of their corridor for the duration of the query.
+
+The graph is built once per maze (O(cells)) and reused for every query.
+
+Benchmark: python maze_graph.py --size 1001x1001
+"""
+
+import heapq
+from array import array
+
+from maze_grid import PATH
+
+# The graph is weighted, so the unweighted searches run as Dijkstra there to
+# keep paths shortest in cells; jps is an A* variant.
+GRAPH_MODES = {
+    "bfs": "dijkstra",
+    "bidirectional": "dijkstra",
+    "dijkstra": "dijkstra",
+    "astar": "astar",
+    "jps": "astar",
+    "greedy": "greedy",
+    "dfs": "dfs",
+}
+
+
+class CorridorGraph:
+    __slots__ = ("rows", "cols", "nodes", "node_of", "edge_a", "edge_b", "edge_cells",
+                 "edge_of", "edge_pos", "adjacency")
+
+    def __init__(self, grid):
+        rows, cols, cells = grid.rows, grid.cols, grid.cells
+        size = len(cells)
+        self.rows, self.cols = rows, cols
+        self.nodes = array("i")  # node id -> cell
+        self.node_of = array("i", [-1]) * size  # cell -> node id
+        self.edge_a = array("i")
+        self.edge_b = array("i")
+        self.edge_cells = []  # edge id -> interior cells, ordered from a to b
+        self.edge_of = array("i", [-1]) * size  # interior cell -> edge id
+        self.edge_pos = array("i", [-1]) * size  # interior cell -> position in its edge
+        self.adjacency = []  # node id -> [(neighbour node, edge id), ...]
+
+        def open_neighbors(i):
+            r, c = divmod(i, cols)
+            return [n for n, ok in ((i + cols, r + 1 < rows), (i - cols, r > 0),
+                                    (i + 1, c + 1 < cols), (i - 1, c > 0)) if ok and cells[n] == PATH]
+
+        for i in range(size):
+            if cells[i] == PATH and len(open_neighbors(i)) != 2:
+                self._add_node(i)
+        for node in range(len(self.nodes)):
+            self._walk_corridors(node, open_neighbors)
+
+        # whatever is left are loops made only of degree-2 cells
+        for i in range(size):
+            if cells[i] == PATH and self.node_of[i] == -1 and self.edge_of[i] == -1:
+                self._walk_corridors(self._add_node(i), open_neighbors)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_a)
+
+    @property
+    def nbytes(self):
+        arrays = (self.nodes, self.node_of, self.edge_a, self.edge_b, self.edge_of, self.edge_pos)
+        return (sum(len(a) * a.itemsize for a in arrays)
+                + sum(len(cells) * 4 for cells in self.edge_cells)
+                + 64 * self.edge_count)
+
+    # ----------- Construction -----------
+    def _add_node(self, cell):
+        self.node_of[cell] = len(self.nodes)
+        self.nodes.append(cell)
+        self.adjacency.append([])
+        return len(self.nodes) - 1
+
+    def _walk_corridors(self, node, open_neighbors):
+        start = self.nodes[node]
+        for first in open_neighbors(start):
+            if self.edge_of[first] != -1:
+                continue  # corridor already walked from its other end
+            if self.node_of[first] != -1:
+                # two adjacent nodes; add the edge once, from the lower cell
+                if start < first:
+                    self._add_edge(node, self.node_of[first], array("i"))
+                continue
+            interior = array("i")
+            prev, cur = start, first
+            while self.node_of[cur] == -1:
+                interior.append(cur)
+                a, b = open_neighbors(cur)
+                prev, cur = cur, (b if a == prev else a)
+            self._add_edge(node, self.node_of[cur], interior)
+
+    def _add_edge(self, a, b, interior):
+        edge = len(self.edge_a)
+        self.edge_a.append(a)
+        self.edge_b.append(b)
+        self.edge_cells.append(interior)
+        for pos, cell in enumerate(interior):
+            self.edge_of[cell] = edge
+            self.edge_pos[cell] = pos
+        self.adjacency[a].append((b, edge))
+        if b != a:
+            self.adjacency[b].append((a, edge))
+
+    # ----------- Queries -----------
+    def _corridor(self, edge, from_node):
+        # interior cells of an edge in walking order from from_node
+        cells = self.edge_cells[edge]
+        return cells if self.edge_a[edge] == from_node else cells[::-1]
+
+    def _attach(self, cell):
+        # [(node, steps, cells after `cell` up to and including the node's cell)]
+        node = self.node_of[cell]
+        if node != -1:
+            return [(node, 0, array("i"))]
+        edge, pos = self.edge_of[cell], self.edge_pos[cell]
+        interior = self.edge_cells[edge]
+        a, b = self.edge_a[edge], self.edge_b[edge]
+        to_a = interior[pos - 1::-1] if pos else array("i")
+        to_b = interior[pos + 1:]
+        to_a.append(self.nodes[a])
+        to_b.append(self.nodes[b])
+        return [(a, pos + 1, to_a), (b, len(interior) - pos, to_b)]
+
+    def solve(self, start, end, algo="astar"):
+        mode = GRAPH_MODES.get(algo, "astar")
+        cols = self.cols
+        if any(self.node_of[c] == -1 and self.edge_of[c] == -1 for c in (start, end)):
+            return array("i"), array("i")  # start or end is a wall
+        count = len(self.nodes)
+        # virtual ids for start/end cells that are not nodes themselves
+        source = self.node_of[start] if self.node_of[start] != -1 else count
+        target = self.node_of[end] if self.node_of[end] != -1 else count + 1
+        total = count + 2
+        cell_of = lambda n: start if n == count else end if n == count + 1 else self.nodes[n]
+
+        # hops to and from the virtual ids: {from: [(to, steps, cells), ...]}
+        extra = {}
+        if source == count:
+            extra[count] = self._attach(start)
+        if target == count + 1:
+            for node, steps, cells in self._attach(end):
+                back = array("i", reversed(cells[:-1]))
+                back.append(end)
+                extra.setdefault(node, []).append((target, steps, back))
+        if (source == count and target == count + 1
+                and self.edge_of[start] == self.edge_of[end]):
+            # both on one corridor: it can also be walked directly
+            interior = self.edge_cells[self.edge_of[start]]
+            ps, pe = self.edge_pos[start], self.edge_pos[end]
+            direct = interior[ps + 1:pe + 1] if ps < pe else interior[pe:ps][::-1]
+            extra[count].append((target, abs(ps - pe), direct))
+
+        er, ec = divmod(end, cols)
+
+        def heuristic(n):
+            r, c = divmod(cell_of(n), cols)
+            return abs(r - er) + abs(c - ec)
+
+        gscore = array("i", [-1]) * total
+        parent = array("i", [-1]) * total
+        parent_edge = array("i", [-1]) * total  # -1: a virtual hop, cells in parent_cells
+        parent_cells = {}
+        closed = bytearray(total)
+        gscore[source] = 0
+        parent[source] = source
+        frontier = [source] if mode == "dfs" else [(0, source)]
+        explored = array("i")
+
+        while frontier:
+            if mode == "dfs":
+                node = frontier.pop()
+            else:
+                node = heapq.heappop(frontier)[1]
+            if closed[node]:
+                continue
+            closed[node] = 1
+            explored.append(cell_of(node))
+            if node == target:
+                break
+
+            hops = [(m, len(self.edge_cells[edge]) + 1, edge) for m, edge in self.adjacency[node]] \
+                if node < count else []
+            hops += extra.get(node, ())
+            for m, steps, via in hops:
+                if closed[m]:
+                    continue
+                g = gscore[node] + steps
+                if mode == "dfs":
+                    if gscore[m] != -1:
+                        continue
+                elif gscore[m] != -1 and g >= gscore[m]:
+                    continue
+                gscore[m] = g
+                parent[m] = node
+                if isinstance(via, int):
+                    parent_edge[m] = via
+                else:
+                    parent_edge[m] = -1
+                    parent_cells[m] = via
+                if mode == "dfs":
+                    frontier.append(m)
+                else:
+                    priority = g if mode == "dijkstra" else g + heuristic(m) if mode == "astar" else heuristic(m)
+                    heapq.heappush(frontier, (priority, m))
+
+        if parent[target] == -1:
+            return explored, array("i")
+
+        # graph path -> cell path, one corridor at a time
+        hops = []
+        node = target
+        while node != source:
+            hops.append(node)
+            node = parent[node]
+        path = array("i", [start])
+        prev = source
+        for node in reversed(hops):
+            edge = parent_edge[node]
+            if edge == -1:
+                path.extend(parent_cells[node])
+            else:
+                path.extend(self._corridor(edge, prev))
+                path.append(self.nodes[node])
+            prev = node
+        return explored, path
+
+
+# ----------- Benchmark -----------
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import maze_generator
+    from maze_solvers import SOLVERS
+
+    parser = argparse.ArgumentParser(description="Corridor graph size and query times.")
+    parser.add_argument("--size", default="1001x1001")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rows, cols = (int(x) for x in args.size.lower().split("x"))
+    grid = maze_generator.generate(rows, cols, seed=args.seed)
+    t0 = time.perf_counter()
+    graph = CorridorGraph(grid)
+    build = time.perf_counter() - t0
+    open_cells = len(grid) - sum(grid.cells)
+    print(f"{open_cells:,d} open cells -> {len(graph):,d} nodes, {graph.edge_count:,d} edges "
+          f"({open_cells / max(len(graph), 1):.1f}x fewer), built in {build * 1000:.0f} ms")
+
+    import random
+    rng = random.Random(args.seed)
+    opens = [i for i in range(len(grid)) if grid.cells[i] == PATH]
+    pairs = [(rng.choice(opens), rng.choice(opens)) for _ in range(args.queries)]
+    for algo in ("astar", "dijkstra"):
+        t0 = time.perf_counter()
+        cell_lengths = [len(SOLVERS[algo](grid, s, e)[1]) for s, e in pairs]
+        cell_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        graph_lengths = [len(graph.solve(s, e, algo)[1]) for s, e in pairs]
+        graph_time = time.perf_counter() - t0
+        assert cell_lengths == graph_lengths
+        print(f"{algo:9s} cells {cell_time / len(pairs) * 1000:8.1f} ms/query   "
+              f"graph {graph_time / len(pairs) * 1000:8.1f} ms/query")
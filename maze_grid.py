@@ -0,0 +1,93 @@
+"""
+maze_grid.py
+Compact maze representation shared by the generators and the solvers.
+
+A Grid is a flat bytearray of rows * cols cells (WALL = 1, PATH = 0) addressed
+by linear index i = r * cols + c. The JSON list-of-lists form only exists at
+the HTTP boundary (from_lists / to_lists).
+
+Terrain mazes also carry costs, a parallel uint8 buffer with the cost of
+stepping into each cell (1 = plain ground). Without it every step costs 1.
+"""
+
+from itertools import chain
+
+WALL, PATH = 1, 0
+
+
+class Grid:
+    __slots__ = ("rows", "cols", "cells", "costs")
+
+    def __init__(self, rows, cols, cells=None, costs=None):
+        if rows < 1 or cols < 1:
+            raise ValueError("maze needs at least one row and one column")
+        if cells is None:
+            cells = bytearray([WALL]) * (rows * cols)
+        elif len(cells) != rows * cols:
+            raise ValueError("cell buffer does not match maze dimensions")
+        if costs is not None and len(costs) != rows * cols:
+            raise ValueError("cost buffer does not match maze dimensions")
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells
+        self.costs = costs
+
+    @classmethod
+    def from_lists(cls, maze):
+        rows, cols = len(maze), len(maze[0]) if maze else 0
+        if any(len(row) != cols for row in maze):
+            raise ValueError("maze rows must all have the same length")
+        cells = bytearray(chain.from_iterable(maze))
+        # solvers disagree on what any other value means (== PATH vs == WALL)
+        if cells.count(PATH) + cells.count(WALL) != len(cells):
+            raise ValueError("maze cells must be 0 (path) or 1 (wall)")
+        return cls(rows, cols, cells)
+
+    def to_lists(self):
+        cells, cols = self.cells, self.cols
+        return [list(cells[r * cols:(r + 1) * cols]) for r in range(self.rows)]
+
+    def __len__(self):
+        return len(self.cells)
+
+    def copy(self):
+        costs = bytearray(self.costs) if self.costs is not None else None
+        return Grid(self.rows, self.cols, bytearray(self.cells), costs)
+
+    def index(self, r, c):
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise IndexError(f"cell ({r}, {c}) is outside the maze")
+        return r * self.cols + c
+
+    def coords(self, i):
+        return divmod(i, self.cols)
+
+    def is_open(self, i):
+        return self.cells[i] == PATH
+
+    def neighbors(self, i):
+        # open neighbours in the solvers' order: down, up, right, left
+        cells, cols = self.cells, self.cols
+        r, c = divmod(i, cols)
+        if r + 1 < self.rows and cells[i + cols] == PATH:
+            yield i + cols
+        if r > 0 and cells[i - cols] == PATH:
+            yield i - cols
+        if c + 1 < cols and cells[i + 1] == PATH:
+            yield i + 1
+        if c > 0 and cells[i - 1] == PATH:
+            yield i - 1
+
+    def path_cost(self, path):
+        # cost of walking path: every cell entered after the first
+        if not path:
+            return 0
+        if self.costs is None:
+            return len(path) - 1
+        costs = self.costs
+        return sum(costs[i] for i in path[1:])
+
+    def to_pairs(self, indices):
+        # linear indices -> [[r, c], ...] for JSON responses
+        cols = self.cols
+        return [[i // cols, i % cols] for i in indices]
@@ -0,0 +1,262 @@
+"""
+maze_incremental.py
+Incremental re-planning with D* Lite (Koenig & Likhachev, optimized version).
+
+A DStarLite planner searches backwards from the end and keeps its search
+state (g, rhs and the priority queue) between calls. After a wall toggle
+or a start move, plan() only repairs the part of the search that the
+change actually affects instead of starting over:
+
+    planner = DStarLite(grid, start, end)
+    explored, path = planner.plan()      # full search the first time
+    planner.set_cell(i, WALL)            # one cell changes
+    explored, path = planner.plan()      # repairs around that cell only
+
+explored holds the cells expanded by that call, path runs start -> end.
+The planner owns its grid (it copies the one it is given). Moving the end
+invalidates everything; make a new planner for that. On terrain grids
+every step pays the cost of the cell it enters, like the weighted solvers,
+and the heuristic is the Manhattan distance times the cheapest cost.
+
+PlannerSessions keeps planners for the server's stateful session API,
+dropping the ones idle for longer than the TTL.
+
+Benchmark: python maze_incremental.py --size 301x301
+"""
+
+import heapq
+import secrets
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from maze_grid import WALL, PATH
+
+INF = 2**30
+
+
+class DStarLite:
+    __slots__ = ("grid", "start", "end", "last", "km", "g", "rhs", "queue", "low")
+
+    def __init__(self, grid, start, end):
+        self.grid = grid.copy()
+        self.start = start
+        self.end = end
+        self.last = start
+        self.km = 0
+        self.low = min(grid.costs) if grid.costs is not None else 1
+        size = len(grid)
+        self.g = array("i", [INF]) * size
+        self.rhs = array("i", [INF]) * size
+        self.rhs[end] = 0
+        self.queue = [(self._h(end), 0, end)]
+
+    def _h(self, cell):
+        cols = self.grid.cols
+        return self.low * (abs(cell // cols - self.start // cols) + abs(cell % cols - self.start % cols))
+
+    def _key(self, cell):
+        m = min(self.g[cell], self.rhs[cell])
+        return m + self._h(cell) + self.km, m
+
+    def _update(self, cell):
+        grid, g, rhs = self.grid, self.g, self.rhs
+        if cell != self.end:
+            cells, cols, costs = grid.cells, grid.cols, grid.costs
+            if cells[cell] == WALL:
+                rhs[cell] = INF
+            else:
+                # rhs = the best (cost of stepping into n) + g[n] among the open neighbours
+                r, c = divmod(cell, cols)
+                best = INF
+                for n, ok in ((cell + cols, r + 1 < grid.rows), (cell - cols, r > 0),
+                              (cell + 1, c + 1 < cols), (cell - 1, c > 0)):
+                    if ok and cells[n] == PATH:
+                        d = g[n] + (costs[n] if costs is not None else 1)
+                        if d < best:
+                            best = d
+                rhs[cell] = best
+        if g[cell] != rhs[cell]:
+            # stale entries stay in the heap and are skipped when popped
+            heapq.heappush(self.queue, (*self._key(cell), cell))
+
+    # ----------- Changes -----------
+    def move_start(self, start):
+        # queued keys were computed against self.last; adding the distance it
+        # moved to km keeps them lower bounds for the new start
+        self.start = start
+        self.km += self._h(self.last)
+        self.last = start
+
+    def set_cell(self, cell, value):
+        cells = self.grid.cells
+        value = WALL if value == WALL else PATH
+        if cells[cell] == value:
+            return
+        cells[cell] = value
+        if value == WALL:
+            self.g[cell] = INF
+        self._update(cell)
+        r, c = divmod(cell, self.grid.cols)
+        rows, cols = self.grid.rows, self.grid.cols
+        for n, ok in ((cell + cols, r + 1 < rows), (cell - cols, r > 0),
+                      (cell + 1, c + 1 < cols), (cell - 1, c > 0)):
+            if ok and cells[n] == PATH:
+                self._update(n)
+
+    # ----------- Planning -----------
+    def plan(self):
+        g, rhs, queue, start = self.g, self.rhs, self.queue, self.start
+        neighbors, update = self.grid.neighbors, self._update
+        explored = array("i")
+        while queue:
+            k1, k2, cell = queue[0]
+            if rhs[start] == g[start] and (k1, k2) >= self._key(start):
+                break
+            heapq.heappop(queue)
+            if g[cell] == rhs[cell]:
+                continue  # already consistent: a stale entry
+            new_key = self._key(cell)
+            if (k1, k2) < new_key:
+                heapq.heappush(queue, (*new_key, cell))
+                continue
+            explored.append(cell)
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = INF
+                update(cell)
+            for n in neighbors(cell):
+                update(n)
+        return explored, self.path()
+
+    def path(self):
+        # follow the steepest descent of step cost + g from start to end
+        g, grid, costs = self.g, self.grid, self.grid.costs
+        node = self.start
+        if g[node] >= INF or grid.cells[node] == WALL:
+            return array("i")
+        path = array("i", [node])
+        if costs is None:
+            step = g.__getitem__
+        else:
+            def step(n):
+                return g[n] + costs[n]
+        while node != self.end:
+            node = min(grid.neighbors(node), key=step)
+            path.append(node)
+            if len(path) > len(g):
+                return array("i")  # only possible with inconsistent state
+        return path
+
+
+# ----------- Sessions -----------
+class PlannerSession:
+    __slots__ = ("planner", "lock", "touched")
+
+    def __init__(self, planner):
+        self.planner = planner
+        self.lock = threading.Lock()  # one request at a time per planner
+        self.touched = time.monotonic()
+
+
+class PlannerSessions:
+    def __init__(self, ttl=600, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def add(self, planner):
+        session_id = secrets.token_urlsafe(9)
+        with self._lock:
+            self._sessions[session_id] = PlannerSession(planner)
+            self._expire()
+        return session_id
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if time.monotonic() - session.touched > self.ttl:
+                del self._sessions[session_id]
+                return None
+            session.touched = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def discard(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.touched > self.ttl or len(self._sessions) > self.max_entries:
+                del self._sessions[session_id]
+            else:
+                break
+
+
+# ----------- Benchmark -----------
+if __name__ == "__main__":
+    import argparse
+    import random
+
+    import maze_generator
+    from maze_solvers import astar_with_exploration
+
+    parser = argparse.ArgumentParser(description="D* Lite re-plan cost against a fresh A*.")
+    parser.add_argument("--size", default="301x301")
+    parser.add_argument("--topology", default="braided", choices=("perfect", "braided", "open"))
+    parser.add_argument("--terrain", action="store_true", help="random per-cell costs")
+    parser.add_argument("--edits", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rows, cols = (int(x) for x in args.size.lower().split("x"))
+    rng = random.Random(args.seed)
+    if args.topology == "open":
+        grid = maze_generator.open_field(rows, cols, 0.2, rng)
+    else:
+        grid = maze_generator.generate(rows, cols, seed=args.seed)
+        if args.topology == "braided":
+            grid = maze_generator.braid(grid, 0.5, rng)
+    if args.terrain:
+        grid.costs = maze_generator.terrain_costs(rows, cols, rng)
+    start, end = 0, len(grid) - 1
+
+    t0 = time.perf_counter()
+    planner = DStarLite(grid, start, end)
+    explored, path = planner.plan()
+    print(f"initial plan    {(time.perf_counter() - t0) * 1000:8.1f} ms  expanded {len(explored):>8,d}")
+
+    replan = fresh = 0.0
+    replan_expanded = fresh_expanded = 0
+    for _ in range(args.edits):
+        # half wall toggles next to the current path, half start moves to any open cell
+        if rng.random() < 0.5 or len(path) < 3:
+            cells = planner.grid.cells
+            planner.move_start(rng.choice([i for i in range(len(cells)) if cells[i] == PATH and i != end]))
+        else:
+            cell = rng.choice(path[1:-1] or [end])
+            if cell != end:
+                planner.set_cell(cell, WALL if planner.grid.cells[cell] == PATH else PATH)
+        t0 = time.perf_counter()
+        explored, path = planner.plan()
+        replan += time.perf_counter() - t0
+        replan_expanded += len(explored)
+        t0 = time.perf_counter()
+        a_explored, a_path = astar_with_exploration(planner.grid, planner.start, end)
+        fresh += time.perf_counter() - t0
+        fresh_expanded += len(a_explored)
+        assert planner.grid.path_cost(a_path) == planner.grid.path_cost(path)
+    n = args.edits
+    print(f"re-plan D* Lite {replan / n * 1000:8.2f} ms  expanded {replan_expanded / n:>10,.0f} per change")
+    print(f"fresh A*        {fresh / n * 1000:8.2f} ms  expanded {fresh_expanded / n:>10,.0f} per change")
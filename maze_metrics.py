@@ -0,0 +1,221 @@
+"""
+maze_metrics.py
+In-process metrics in the Prometheus text format, and a sampling profiler
+for slow requests.
+
+A MetricsRegistry hands out counters and histograms (optionally labelled)
+and renders everything it holds for a /metrics scrape. Values that already
+live elsewhere (cache hit counts, registry sizes) are exported through
+callbacks that are read at scrape time instead of being copied on every
+request. All metrics are safe to update from request threads.
+
+SlowRequestProfiler samples the stacks of the threads serving tracked
+requests every few milliseconds. Requests that end up slower than the
+threshold get their samples written as folded stacks ("a;b;c count" per
+line), ready for flamegraph.pl or speedscope; fast requests are dropped.
+"""
+
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+
+# seconds; covers cache hits (well under a ms) up to large-maze solves
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# node counts, for expanded cells and the like
+COUNT_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{v}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def lines(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples()
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in sorted(values):
+            yield f"{self.name}{_labels(self.labels, key)} {_number(value)}"
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)  # len(buckets) is the +Inf bucket
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][slot] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = [(key, (list(counts), total, n)) for key, (counts, total, n) in self._values.items()]
+        for key, (counts, total, n) in sorted(values):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = (("le", _number(bound)),)
+                yield f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labels, key)} {n}"
+
+
+class CallbackMetric(Metric):
+    # collect() -> {label values tuple: value}, read at scrape time
+    def __init__(self, name, help_text, kind, labels, collect):
+        super().__init__(name, help_text, labels)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self):
+        for key, value in sorted(self.collect().items()):
+            yield f"{self.name}{_labels(self.labels, key)} {_number(value)}"
+
+
+class MetricsRegistry:
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._add(Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def callback(self, name, help_text, kind, labels, collect):
+        return self._add(CallbackMetric(name, help_text, kind, labels, collect))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.lines())
+        return "\n".join(lines) + "\n"
+
+
+# ----------- Slow-request profiler -----------
+class _Profile:
+    __slots__ = ("name", "thread_id", "started", "stacks")
+
+    def __init__(self, name):
+        self.name = name
+        self.thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        self.stacks = StackCounter()
+
+
+def _fold(frame):
+    # root-first "file:function" names joined by ';'
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SlowRequestProfiler:
+    def __init__(self, out_dir, threshold=0.5, interval=0.005):
+        self.out_dir = out_dir
+        self.threshold = threshold
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        os.makedirs(out_dir, exist_ok=True)
+
+    def start(self, name):
+        # call from the thread serving the request
+        profile = _Profile(name)
+        with self._lock:
+            self._active[id(profile)] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name="maze-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return profile
+
+    def stop(self, profile):
+        # -> path of the written .folded file, or None for a fast request
+        with self._lock:
+            self._active.pop(id(profile), None)
+        elapsed = time.perf_counter() - profile.started
+        if elapsed < self.threshold or not profile.stacks:
+            return None
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.out_dir, f"{stamp}-{profile.name}-{elapsed * 1000:.0f}ms-{id(profile):x}.folded")
+        with open(path, "w") as f:
+            for stack, count in profile.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def _sample(self):
+        while True:
+            with self._lock:
+                active = list(self._active.values())
+            if not active:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            frames = sys._current_frames()
+            for profile in active:
+                frame = frames.get(profile.thread_id)
+                if frame is not None:
+                    profile.stacks[_fold(frame)] += 1
+            del frames
+            time.sleep(self.interval)
@@ -0,0 +1,78 @@
+"""
+maze_parallel.py
+Run several solvers on one maze in parallel worker processes.
+
+The maze cells (and terrain costs, if any) are copied once into a
+multiprocessing.shared_memory block;
+each worker attaches to it by name and runs its solver directly on that
+buffer, so the grid is never pickled per algorithm. Comparing N solvers
+then takes about as long as the slowest one instead of the sum.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from maze_grid import Grid
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.environ.get("MAZE_COMPARE_WORKERS", 0)) or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def _run_shared(solver, shm_name, rows, cols, start, end, has_costs=False):
+    # worker side: attach to the shared maze and run one solver on it
+    shm = shared_memory.SharedMemory(name=shm_name)
+    size = rows * cols
+    cells = shm.buf[:size]
+    costs = shm.buf[size:2 * size] if has_costs else None
+    try:
+        start_time = time.perf_counter()
+        explored, path = solver(Grid(rows, cols, cells, costs), start, end)
+        exec_time = time.perf_counter() - start_time
+    finally:
+        cells.release()
+        if costs is not None:
+            costs.release()
+        shm.close()
+    return explored, path, exec_time
+
+
+def solve_many(grid, start, end, solvers):
+    # solvers: {name: function}; returns {name: (explored, path, exec_time)}
+    if not solvers:
+        return {}
+    size = len(grid.cells)
+    has_costs = grid.costs is not None
+    shm = shared_memory.SharedMemory(create=True, size=size * (2 if has_costs else 1))
+    try:
+        shm.buf[:size] = grid.cells
+        if has_costs:
+            shm.buf[size:2 * size] = grid.costs
+        pool = get_pool()
+        futures = {
+            name: pool.submit(_run_shared, solver, shm.name, grid.rows, grid.cols, start, end, has_costs)
+            for name, solver in solvers.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,199 @@
+"""
+maze_registry.py
+Server-side store of generated mazes, addressed by a short maze_id.
+
+Clients send the id (plus small edit deltas) instead of re-uploading the
+whole grid with every request. Mazes idle for longer than the TTL are
+dropped. When more than max_entries are held in memory, the least recently
+used ones are either spilled to spill_dir (and read back on demand) or
+dropped if no spill directory is configured; the same happens when the
+grids plus their derived indexes (goal fields, trees, corridor graphs)
+take more than max_bytes. An optional rebuild(maze_id)
+callback recreates mazes whose id fully describes them (seeded recipes)
+after they have been dropped.
+"""
+
+import json
+import os
+import secrets
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from maze_cache import ENTRY_OVERHEAD, result_size
+from maze_grid import Grid
+
+SPILL_HEADER = struct.Struct("<4sIII")  # magic, rows, cols, meta json length
+SPILL_MAGIC = b"MZG1"
+
+
+class MazeEntry:
+    __slots__ = ("grid", "meta", "derived", "touched", "nbytes")
+
+    def __init__(self, grid, meta=None):
+        self.grid = grid
+        self.meta = meta or {}  # JSON-able facts about the maze (algorithm, ...); survives spilling
+        self.derived = {}  # per-maze indexes computed on demand; rebuilt after a spill
+        self.touched = time.monotonic()
+        self.nbytes = ENTRY_OVERHEAD + len(grid.cells) + (len(grid.costs) if grid.costs is not None else 0)
+
+
+class MazeRegistry:
+    def __init__(self, ttl=1800, max_entries=1024, max_bytes=1024 * 2**20, spill_dir=None, rebuild=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0  # nbytes of the entries held in memory
+        self.spill_dir = spill_dir
+        self.rebuild = rebuild
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, maze_id):
+        return self.get(maze_id) is not None
+
+    def add(self, grid, maze_id=None, **meta):
+        maze_id = maze_id or secrets.token_urlsafe(9)
+        with self._lock:
+            self._put(maze_id, MazeEntry(grid, meta))
+            self._expire()
+        return maze_id
+
+    def get(self, maze_id):
+        # Returns the MazeEntry or None if the id is unknown or expired
+        if not isinstance(maze_id, str) or not maze_id.replace("-", "").replace("_", "").isalnum():
+            return None
+        with self._lock:
+            entry = self._entries.get(maze_id)
+            if entry is not None and time.monotonic() - entry.touched > self.ttl:
+                self._pop(maze_id)
+                return None
+            if entry is None:
+                entry = self._load(maze_id)
+            if entry is not None:
+                return self._touch(maze_id, entry)
+        # regenerating can take a while, so it runs without holding up every
+        # other request on the lock
+        entry = self._rebuild(maze_id)
+        if entry is None:
+            return None
+        with self._lock:
+            # another thread may have rebuilt the same id meanwhile; keep one entry
+            entry = self._entries.get(maze_id) or entry
+            return self._touch(maze_id, entry)
+
+    def _touch(self, maze_id, entry):
+        # caller holds the lock
+        if self._entries.get(maze_id) is not entry:
+            self._put(maze_id, entry)
+        entry.touched = time.monotonic()
+        self._entries.move_to_end(maze_id)
+        self._expire()
+        return entry
+
+    def get_grid(self, maze_id):
+        entry = self.get(maze_id)
+        return entry.grid if entry is not None else None
+
+    def derive(self, maze_id, grid, name, build):
+        # build(grid) once per maze and keep it on the entry, counted against
+        # max_bytes; None when grid is not the entry's own (an edited copy, or
+        # the entry was dropped and rebuilt since grid was fetched)
+        entry = self.get(maze_id)
+        if entry is None or entry.grid is not grid:
+            return None
+        index = entry.derived.get(name)
+        if index is None:
+            index = build(grid)  # outside the lock, like rebuilds
+            size = result_size(index)
+            with self._lock:
+                if name in entry.derived:
+                    return entry.derived[name]  # built twice concurrently; keep the first
+                entry.derived[name] = index
+                entry.nbytes += size
+                if self._entries.get(maze_id) is entry:
+                    self.bytes += size
+                    self._expire()
+        return index
+
+    def discard(self, maze_id):
+        with self._lock:
+            self._pop(maze_id)
+            if self.spill_dir:
+                try:
+                    os.remove(self._spill_path(maze_id))
+                except FileNotFoundError:
+                    pass
+
+    # ----------- Eviction / spilling -----------
+    def _put(self, maze_id, entry):
+        self._pop(maze_id)
+        self._entries[maze_id] = entry
+        self.bytes += entry.nbytes
+
+    def _pop(self, maze_id):
+        entry = self._entries.pop(maze_id, None)
+        if entry is not None:
+            self.bytes -= entry.nbytes
+        return entry
+
+    def _expire(self):
+        # the most recently used entry stays even if it alone is over max_bytes
+        now = time.monotonic()
+        while self._entries:
+            maze_id, entry = next(iter(self._entries.items()))
+            if now - entry.touched > self.ttl:
+                self._pop(maze_id)
+            elif len(self._entries) > self.max_entries or (self.bytes > self.max_bytes and len(self._entries) > 1):
+                self._pop(maze_id)
+                if self.spill_dir:
+                    self._spill(maze_id, entry)
+            else:
+                break
+
+    def _spill_path(self, maze_id):
+        return os.path.join(self.spill_dir, maze_id + ".maze")
+
+    def _spill(self, maze_id, entry):
+        grid = entry.grid
+        meta = json.dumps(entry.meta).encode()
+        with open(self._spill_path(maze_id), "wb") as f:
+            f.write(SPILL_HEADER.pack(SPILL_MAGIC, grid.rows, grid.cols, len(meta)))
+            f.write(meta)
+            f.write(grid.cells)
+            if grid.costs is not None:
+                f.write(grid.costs)  # a terrain maze's file is twice as long
+
+    def _rebuild(self, maze_id):
+        built = self.rebuild(maze_id) if self.rebuild else None
+        if built is None:
+            return None
+        grid, meta = built
+        return MazeEntry(grid, meta)
+
+    def _load(self, maze_id):
+        if not self.spill_dir:
+            return None
+        path = self._spill_path(maze_id)
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if age > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                magic, rows, cols, meta_len = SPILL_HEADER.unpack(f.read(SPILL_HEADER.size))
+                meta = json.loads(f.read(meta_len))
+                cells = bytearray(f.read(rows * cols))
+                costs = bytearray(f.read()) or None
+        except (FileNotFoundError, struct.error, ValueError):
+            return None
+        if magic != SPILL_MAGIC:
+            return None
+        os.remove(path)
+        return MazeEntry(Grid(rows, cols, cells, costs), meta)
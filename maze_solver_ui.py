@@ -4,34 +4,46 @@ Interactive Maze Solver with Tkinter
 - Generate random maze (recursive backtracker)
 - Click to toggle walls
 - Right-click to set Start/End (first right-click = Start, second = End, then toggles)
-- Solve with BFS or A* (animated)
-- Speed control slider
+- Solve with BFS or A* (animated from root.after(), with pause/cancel)
+- Solve with D* Lite: afterwards wall toggles and start moves re-plan
+  incrementally, repairing only the part of the search they affect
+- Cells-per-frame slider, and a max-speed mode for large mazes
+- Drawn as one image (dirty rows only), not a canvas item per cell
 
-Run: python maze_solver_ui.py
+Run: python maze_solver_ui.py [--rows 501 --cols 501] [--cell-size N]
 """
 
+import argparse
 import tkinter as tk
-from tkinter import ttk
-import random
+from tkinter import ttk, messagebox
 import time
-import heapq
-from collections import deque
+import maze_generator
+from maze_grid import Grid
+from maze_incremental import DStarLite
+from maze_solvers import BATCH_SIZE, iter_bfs, iter_astar
 
 # ---------- Config ----------
-ROWS = 25
-COLS = 35
-CELL_SIZE = 22
+parser = argparse.ArgumentParser(description="Interactive maze solver.")
+parser.add_argument("--rows", type=int, default=25)
+parser.add_argument("--cols", type=int, default=35)
+parser.add_argument("--cell-size", type=int, default=None,
+                    help="pixels per cell (default: fit the maze in about 800 px, at most 22)")
+args = parser.parse_args()
+
+ROWS = args.rows
+COLS = args.cols
+CELL_SIZE = args.cell_size or max(1, min(22, 800 // max(ROWS, COLS)))
+FRAME_MS = 16  # animation frame interval (about 60 fps)
 WALL = 1
 PATH = 0
 
 # Colors
-COLOR_PATH = "white"
-COLOR_WALL = "black"
-COLOR_START = "green"
-COLOR_END = "red"
-COLOR_VISITED = "lightblue"
-COLOR_FRONTIER = "cyan"
-COLOR_FINAL_PATH = "yellow"
+COLOR_PATH = "#ffffff"
+COLOR_WALL = "#000000"
+COLOR_START = "#008000"
+COLOR_END = "#ff0000"
+COLOR_VISITED = "#add8e6"
+COLOR_FINAL_PATH = "#ffff00"
 
 # ---------- Maze and UI state ----------
 maze = [[WALL for _ in range(COLS)] for _ in range(ROWS)]
@@ -39,6 +51,13 @@ start = (0, 0)
 end = (ROWS - 1, COLS - 1)
 placing_start = True  # toggles when user right-clicks first/second
 animating = False
+paused = False
+steps = None  # the running animation pipeline
+job = None  # pending root.after() id of the next frame
+solve_name = ""
+explored_count = 0
+fast_mode = False  # max speed, fixed for the length of one animation
+planner = None  # live D* Lite planner after "Solve (D* Lite)"; edits re-plan through it
 
 # ---------- Tkinter setup ----------
 root = tk.Tk()
@@ -50,40 +69,62 @@ canvas_height = ROWS * CELL_SIZE
 canvas = tk.Canvas(root, width=canvas_width, height=canvas_height, bg="white")
 canvas.grid(row=0, column=0, columnspan=6, padx=10, pady=10)
 
-# Speed slider label
-speed_var = tk.DoubleVar(value=0.01)
+# Animation budget: cells painted per frame, or a time budget in max-speed mode
+budget_var = tk.IntVar(value=4)
+max_speed_var = tk.BooleanVar(value=False)
 
 # ---------- Utility functions ----------
 def in_bounds(r, c):
     return 0 <= r < ROWS and 0 <= c < COLS
 
-def neighbors(r, c):
-    for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-        nr, nc = r + dr, c + dc
-        if in_bounds(nr, nc):
-            yield nr, nc
-
 # ---------- Drawing ----------
-rect_ids = [[None]*COLS for _ in range(ROWS)]
+# Cell colors live in a flat array (one palette index per cell). Changes mark
+# their row dirty; once per idle turn the dirty rows are written into a
+# one-pixel-per-cell PhotoImage and copied, zoomed by CELL_SIZE, into the
+# image shown on the canvas. No canvas item per cell, so large mazes draw
+# in one pass.
+PALETTE = [COLOR_PATH, COLOR_WALL, COLOR_START, COLOR_END, COLOR_VISITED, COLOR_FINAL_PATH]
+COLOR_INDEX = {color: i for i, color in enumerate(PALETTE)}
+shade = bytearray(ROWS * COLS)
+dirty_rows = set()
+flush_job = None
+
+cells_image = tk.PhotoImage(width=COLS, height=ROWS)
+shown_image = tk.PhotoImage(width=canvas_width, height=canvas_height)
+canvas.create_image(0, 0, image=shown_image, anchor="nw")
 
 def draw_cell(r, c, color):
-    x1 = c * CELL_SIZE
-    y1 = r * CELL_SIZE
-    x2 = x1 + CELL_SIZE
-    y2 = y1 + CELL_SIZE
-    if rect_ids[r][c] is None:
-        rect_ids[r][c] = canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="gray")
-    else:
-        canvas.itemconfig(rect_ids[r][c], fill=color)
-    return rect_ids[r][c]
+    global flush_job
+    shade[r * COLS + c] = COLOR_INDEX[color]
+    dirty_rows.add(r)
+    if flush_job is None:
+        flush_job = root.after_idle(flush)
+
+def put_rows(first, last):
+    # rows first..last-1 into the cell image, then scaled onto the canvas image
+    data = " ".join("{" + " ".join(map(PALETTE.__getitem__, shade[r * COLS:(r + 1) * COLS])) + "}"
+                    for r in range(first, last))
+    cells_image.put(data, to=(0, first))
+    shown_image.tk.call(shown_image, "copy", cells_image, "-from", 0, first, COLS, last,
+                        "-to", 0, first * CELL_SIZE, "-zoom", CELL_SIZE)
+
+def flush():
+    # one put per run of consecutive dirty rows
+    global flush_job
+    flush_job = None
+    rows = sorted(dirty_rows)
+    dirty_rows.clear()
+    first = 0
+    for k in range(1, len(rows) + 1):
+        if k == len(rows) or rows[k] != rows[k - 1] + 1:
+            put_rows(rows[first], rows[k - 1] + 1)
+            first = k
 
 def draw_maze():
+    wall, path = COLOR_INDEX[COLOR_WALL], COLOR_INDEX[COLOR_PATH]
     for r in range(ROWS):
-        for c in range(COLS):
-            if maze[r][c] == WALL:
-                draw_cell(r, c, COLOR_WALL)
-            else:
-                draw_cell(r, c, COLOR_PATH)
+        shade[r * COLS:(r + 1) * COLS] = bytes(wall if v == WALL else path for v in maze[r])
+    dirty_rows.update(range(ROWS))
     sr, sc = start
     er, ec = end
     draw_cell(sr, sc, COLOR_START)
@@ -91,24 +132,10 @@ def draw_maze():
 
 # ---------- Maze generation: Recursive Backtracker ----------
 def carve_maze():
-    # Start with grid of walls, carve cells (odd indices) to make paths
-    global maze
-    maze = [[WALL for _ in range(COLS)] for _ in range(ROWS)]
-    # ensure odd rows/cols for cells when possible — but we just use backtracker that moves 2 steps
-    def carve_from(r, c):
-        maze[r][c] = PATH
-        dirs = [(0,2),(0,-2),(2,0),(-2,0)]
-        random.shuffle(dirs)
-        for dr, dc in dirs:
-            nr, nc = r+dr, c+dc
-            if in_bounds(nr, nc) and maze[nr][nc] == WALL:
-                # remove wall between
-                maze[r + dr//2][c + dc//2] = PATH
-                carve_from(nr, nc)
-    # choose a random starting cell with odd coordinates (if possible)
-    sr = random.randrange(0, ROWS, 2)
-    sc = random.randrange(0, COLS, 2)
-    carve_from(sr, sc)
+    # Start with grid of walls, carve cells (even indices) to make paths
+    global maze, planner
+    planner = None
+    maze = maze_generator.generate(ROWS, COLS, "backtracker").to_lists()
     # Ensure start and end are path
     maze[start[0]][start[1]] = PATH
     maze[end[0]][end[1]] = PATH
@@ -127,16 +154,20 @@ def toggle_wall(event):
         return
     maze[r][c] = PATH if maze[r][c] == WALL else WALL
     draw_maze()
+    if planner is not None:
+        planner.set_cell(r * COLS + c, maze[r][c])
+        dstar_replan()
 
 def set_start_end(event):
     # right click: first sets start, second sets end, then alternates
-    global placing_start, start, end
+    global placing_start, start, end, planner
     if animating:
         return
     c = event.x // CELL_SIZE
     r = event.y // CELL_SIZE
     if not in_bounds(r, c):
         return
+    was_wall = maze[r][c] == WALL
     if placing_start:
         # make sure not placing on wall
         maze[r][c] = PATH
@@ -144,140 +175,137 @@ def set_start_end(event):
     else:
         maze[r][c] = PATH
         end = (r, c)
+        planner = None  # a new end invalidates the whole search
     placing_start = not placing_start
     draw_maze()
+    if planner is not None:
+        if was_wall:
+            planner.set_cell(r * COLS + c, PATH)
+        planner.move_start(r * COLS + c)
+        dstar_replan()
 
 canvas.bind("<Button-1>", toggle_wall)  # left click
 canvas.bind("<Button-3>", set_start_end)  # right click (set start/end)
 
 # ---------- Search algorithms (animated) ----------
-def animate_delay():
-    # small delay controlled by slider
-    d = speed_var.get()
-    root.update()
-    time.sleep(d)
-
-def reconstruct_and_draw(parent, finish):
-    # Reconstruct path from finish to start using parent dict {node: parent}
-    node = finish
-    path = []
-    while node and node in parent:
-        path.append(node)
-        node = parent[node]
-    # Draw final path (excluding start & end if you like)
-    for r, c in reversed(path):
-        if (r, c) == start or (r, c) == end:
-            continue
-        draw_cell(r, c, COLOR_FINAL_PATH)
-        animate_delay()
-    draw_cell(start[0], start[1], COLOR_START)
-    draw_cell(end[0], end[1], COLOR_END)
-
-def bfs_solve():
-    global animating
+# The searches are the step generators from maze_solvers.py. An animation is
+# a pipeline of (color, cells) batches, pulled by a root.after() loop a
+# frame's budget at a time, so the window stays responsive and can pause
+# or cancel between frames.
+def animation_steps(search, step):
+    # explored batches from the search, then the path in slices of `step`
+    path = None
+    while path is None:
+        try:
+            yield COLOR_VISITED, next(search)
+        except StopIteration as done:
+            path = done.value
+    for i in range(0, len(path), step):
+        yield COLOR_FINAL_PATH, path[i:i + step]
+    return path
+
+def paint(color, cells):
+    for i in cells:
+        r, c = divmod(i, COLS)
+        if (r, c) != start and (r, c) != end:
+            draw_cell(r, c, color)
+
+def start_animation(name, iter_search):
+    global animating, paused, steps, job, solve_name, explored_count, fast_mode
     if animating:
         return
-    animating = True
-    sr, sc = start
-    er, ec = end
-    visited = set()
-    parent = {}
-    q = deque()
-    q.append((sr, sc))
-    visited.add((sr, sc))
-    found = False
-
-    while q:
-        r, c = q.popleft()
-        # draw as visited
-        if (r, c) != start and (r, c) != end:
-            draw_cell(r, c, COLOR_VISITED)
-        animate_delay()
-        if (r, c) == (er, ec):
-            found = True
-            break
-        for nr, nc in neighbors(r, c):
-            if maze[nr][nc] == WALL:
-                continue
-            if (nr, nc) in visited:
-                continue
-            visited.add((nr, nc))
-            parent[(nr, nc)] = (r, c)
-            q.append((nr, nc))
-            # optionally draw frontier
-            if (nr, nc) != end:
-                draw_cell(nr, nc, COLOR_FRONTIER)
-        animate_delay()
-
-    if found:
-        reconstruct_and_draw(parent, (er, ec))
+    fast_mode = max_speed_var.get()
+    step = BATCH_SIZE if fast_mode else 1
+    search = iter_search(Grid.from_lists(maze), start[0] * COLS + start[1], end[0] * COLS + end[1],
+                         batch_size=step)
+    steps = animation_steps(search, step)
+    animating, paused = True, False
+    solve_name, explored_count = name, 0
+    btn_pause.config(text="Pause")
+    job = root.after(0, run_frame)
+
+def run_frame():
+    global job, explored_count
+    job = None
+    try:
+        if fast_mode:
+            # as many batches as fit in most of a frame
+            deadline = time.perf_counter() + FRAME_MS / 1000 * 0.75
+            while time.perf_counter() < deadline:
+                color, cells = next(steps)
+                explored_count += len(cells) if color == COLOR_VISITED else 0
+                paint(color, cells)
+        else:
+            painted = 0
+            while painted < budget_var.get():
+                color, cells = next(steps)
+                explored_count += len(cells) if color == COLOR_VISITED else 0
+                paint(color, cells)
+                painted += len(cells)
+    except StopIteration as done:
+        finish_animation(done.value)
+        return
+    job = root.after(FRAME_MS, run_frame)
+
+def finish_animation(path):
+    global animating, steps
+    animating, steps = False, None
+    if path:
+        root.title(f"Intelligent Maze Solver — {solve_name}: {explored_count} cells explored, "
+                   f"path of {len(path)}")
     else:
-        tk.messagebox.showinfo("Result", "No path found.")
-    animating = False
+        root.title(f"Intelligent Maze Solver — {solve_name}: no path")
+        messagebox.showinfo("Result", "No path found.")
 
-def manhattan(a, b):
-    return abs(a[0]-b[0]) + abs(a[1]-b[1])
+def toggle_pause():
+    global paused, job
+    if not animating:
+        return
+    paused = not paused
+    btn_pause.config(text="Resume" if paused else "Pause")
+    if paused:
+        if job is not None:
+            root.after_cancel(job)
+            job = None
+    else:
+        job = root.after(0, run_frame)
+
+def cancel_animation():
+    global animating, paused, steps, job
+    if not animating:
+        return
+    if job is not None:
+        root.after_cancel(job)
+        job = None
+    steps.close()
+    animating, paused, steps = False, False, None
+    btn_pause.config(text="Pause")
+    clear_paths()
 
-def astar_solve():
-    global animating
+def dstar_solve():
+    # first run is a full search; later edits go through dstar_replan
+    global planner
     if animating:
         return
-    animating = True
-    sr, sc = start
-    er, ec = end
-    start_node = (sr, sc)
-    goal = (er, ec)
-
-    gscore = {start_node: 0}
-    fscore = {start_node: manhattan(start_node, goal)}
-    parent = {}
-
-    open_heap = []
-    heapq.heappush(open_heap, (fscore[start_node], start_node))
-    open_set = {start_node}
-    closed = set()
-    found = False
-
-    while open_heap:
-        _, current = heapq.heappop(open_heap)
-        open_set.discard(current)
-        if current in closed:
-            continue
-        r, c = current
-
-        if current == goal:
-            found = True
-            break
-
-        closed.add(current)
-        # mark visited
-        if current != start and current != end:
-            draw_cell(r, c, COLOR_VISITED)
-        animate_delay()
-
-        for nr, nc in neighbors(r, c):
-            if maze[nr][nc] == WALL:
-                continue
-            tentative_g = gscore[current] + 1
-            neighbor = (nr, nc)
-            if neighbor in closed and tentative_g >= gscore.get(neighbor, float('inf')):
-                continue
-            if tentative_g < gscore.get(neighbor, float('inf')):
-                parent[neighbor] = current
-                gscore[neighbor] = tentative_g
-                fscore[neighbor] = tentative_g + manhattan(neighbor, goal)
-                if neighbor not in open_set:
-                    heapq.heappush(open_heap, (fscore[neighbor], neighbor))
-                    open_set.add(neighbor)
-                    if neighbor != end:
-                        draw_cell(nr, nc, COLOR_FRONTIER)
-        animate_delay()
-
-    if found:
-        reconstruct_and_draw(parent, goal)
+    planner = DStarLite(Grid.from_lists(maze), start[0] * COLS + start[1], end[0] * COLS + end[1])
+    dstar_replan()
+
+def dstar_replan():
+    # draw only the cells this (re)plan expanded, then the repaired path
+    explored, path = planner.plan()
+    clear_paths()
+    for i in explored:
+        cell = divmod(i, COLS)
+        if cell != start and cell != end:
+            draw_cell(cell[0], cell[1], COLOR_VISITED)
+    for i in path:
+        cell = divmod(i, COLS)
+        if cell != start and cell != end:
+            draw_cell(cell[0], cell[1], COLOR_FINAL_PATH)
+    if not path:
+        root.title(f"Intelligent Maze Solver — D* Lite: no path ({len(explored)} cells re-planned)")
     else:
-        tk.messagebox.showinfo("Result", "No path found.")
-    animating = False
+        root.title(f"Intelligent Maze Solver — D* Lite: {len(explored)} cells re-planned")
 
 # ---------- Controls ----------
 def on_generate():
@@ -289,18 +317,13 @@ def clear_paths():
     if animating:
         return
     # redraw maze cells leaving walls in place, reset any visited/path colors
-    for r in range(ROWS):
-        for c in range(COLS):
-            if maze[r][c] == WALL:
-                draw_cell(r, c, COLOR_WALL)
-            else:
-                draw_cell(r, c, COLOR_PATH)
-    draw_cell(start[0], start[1], COLOR_START)
-    draw_cell(end[0], end[1], COLOR_END)
+    draw_maze()
 
 def reset_maze_empty():
+    global planner
     if animating:
         return
+    planner = None
     for r in range(ROWS):
         for c in range(COLS):
             maze[r][c] = PATH
@@ -308,20 +331,26 @@ def reset_maze_empty():
     draw_maze()
 
 def on_bfs():
-    # run BFS in a non-blocking way? we run it directly (with small sleeps), UI remains responsive enough
+    global planner
+    if animating:
+        return
+    planner = None
     clear_paths()
-    root.update()
-    bfs_solve()
+    start_animation("BFS", iter_bfs)
 
 def on_astar():
+    global planner
+    if animating:
+        return
+    planner = None
     clear_paths()
-    root.update()
-    astar_solve()
+    start_animation("A*", iter_astar)
 
 def on_reset_start_end():
-    global start, end
+    global start, end, planner
     start = (0, 0)
     end = (ROWS - 1, COLS - 1)
+    planner = None
     draw_maze()
 
 # ---------- Buttons / UI ----------
@@ -343,16 +372,29 @@ btn_reset.grid(row=1, column=4, padx=4)
 btn_empty = ttk.Button(root, text="Empty Maze", command=reset_maze_empty)
 btn_empty.grid(row=1, column=5, padx=4)
 
+btn_dstar = ttk.Button(root, text="Solve (D* Lite)", command=dstar_solve)
+btn_dstar.grid(row=3, column=0, padx=4, pady=(0,10))
+
+btn_pause = ttk.Button(root, text="Pause", command=toggle_pause)
+btn_pause.grid(row=3, column=1, padx=4, pady=(0,10))
+
+btn_cancel = ttk.Button(root, text="Cancel", command=cancel_animation)
+btn_cancel.grid(row=3, column=2, padx=4, pady=(0,10))
+
+max_speed_check = ttk.Checkbutton(root, text="Max speed", variable=max_speed_var)
+max_speed_check.grid(row=3, column=3, padx=4, pady=(0,10), sticky="w")
+
 # Speed slider
-tk.Label(root, text="Animation speed (s)").grid(row=2, column=0, pady=(0,10))
-speed_slider = tk.Scale(root, variable=speed_var, from_=0.0, to=0.15, orient="horizontal", resolution=0.005, length=200)
+tk.Label(root, text="Cells per frame").grid(row=2, column=0, pady=(0,10))
+speed_slider = tk.Scale(root, variable=budget_var, from_=1, to=500, orient="horizontal", length=200)
 speed_slider.grid(row=2, column=1, columnspan=2, pady=(0,10), sticky="w")
 
 # Instructions text
 instr_text = (
     "Left-click to toggle wall/path.\n"
     "Right-click to set Start (first) and End (second).\n"
-    "Generate -> Solve (BFS/A*)."
+    "Generate -> Solve (BFS/A*).\n"
+    "After Solve (D* Lite), edits re-plan live."
 )
 instr_label = tk.Label(root, text=instr_text, justify="left")
 instr_label.grid(row=2, column=3, columnspan=3, sticky="w")
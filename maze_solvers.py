@@ -0,0 +1,700 @@
+"""
+maze_solvers.py
+Search algorithms over a maze_grid.Grid.
+
+Every solver takes (grid, start, end) with start/end as linear cell indices
+and returns (explored, path) as int32 arrays of linear indices. Each one is
+a thin wrapper around a step generator (iter_bfs, iter_astar, ...) that
+yields the explored cells in batches of up to batch_size and returns the
+path, so callers can stream a search while it runs. Parents and
+distances live in flat int32 arrays instead of tuple-keyed dicts; heap
+entries are single ints (priority * cell_count + cell), which orders them
+exactly like the old (priority, (r, c)) tuples.
+
+Dijkstra and A* use a bucket queue (Dial's algorithm) instead of a heap:
+costs are small integers and the smallest queued priority never decreases,
+so a ring of per-priority lists indexed by priority % ring replaces heap
+sifting with list appends and pops. Within a bucket entries come out LIFO,
+which for A* means the most recently reached cell among equal f - the
+deepest one - is expanded first. Superseded entries stay queued and are
+skipped when popped, so every cell is expanded at most once.
+
+On terrain grids (grid.costs set) Dijkstra and A* pay the cost of every
+cell they step into; A*'s heuristic is the Manhattan distance times the
+cheapest cost on the grid, which never overestimates. The other solvers
+ignore costs and find paths with the fewest steps.
+
+The priority-queue solvers (HEAP_SOLVERS) also take an optional stats dict
+and fill in heap_pushes / heap_pops (queue pushes and pops) when the
+search ends.
+
+Benchmark: python maze_solvers.py --size 1000x1000
+"""
+
+import heapq
+from array import array
+
+from maze_grid import WALL, PATH
+
+BATCH_SIZE = 256
+
+
+def _trace(parent, start, end):
+    # walk parent links back from end; parent[start] == start
+    path = array("i")
+    if parent[end] == -1:
+        return path
+    node = end
+    while node != start:
+        path.append(node)
+        node = parent[node]
+    path.append(start)
+    path.reverse()
+    return path
+
+
+def collect(steps):
+    # run a step generator to completion -> (explored, path)
+    explored = array("i")
+    while True:
+        try:
+            explored.extend(next(steps))
+        except StopIteration as stop:
+            return explored, stop.value
+
+
+def _heap_stats(stats, pops, queued):
+    # every entry ever pushed has been popped or is still queued
+    if stats is not None:
+        stats["heap_pops"] = pops
+        stats["heap_pushes"] = pops + queued
+
+
+def manhattan(grid, a, b):
+    cols = grid.cols
+    return abs(a // cols - b // cols) + abs(a % cols - b % cols)
+
+
+# ----------- BFS -----------
+def iter_bfs(grid, start, end, batch_size=BATCH_SIZE):
+    rows, cols, cells = grid.rows, grid.cols, grid.cells
+    parent = array("i", [-1]) * len(cells)
+    parent[start] = start
+    q = array("i", [start])
+    head = 0
+    explored = array("i")
+
+    while head < len(q):
+        node = q[head]
+        head += 1
+        explored.append(node)
+        if len(explored) == batch_size:
+            yield explored
+            explored = array("i")
+        if node == end:
+            break
+        r, c = divmod(node, cols)
+        for n, ok in ((node + cols, r + 1 < rows), (node - cols, r > 0),
+                      (node + 1, c + 1 < cols), (node - 1, c > 0)):
+            if ok and cells[n] == PATH and parent[n] == -1:
+                parent[n] = node
+                q.append(n)
+
+    if explored:
+        yield explored
+    return _trace(parent, start, end)
+
+
+def bfs_with_exploration(grid, start, end):
+    return collect(iter_bfs(grid, start, end, batch_size=0))
+
+
+# ----------- A* -----------
+def iter_astar(grid, start, end, batch_size=BATCH_SIZE, stats=None):
+    if grid.costs is not None:
+        return (yield from iter_astar_weighted(grid, start, end, batch_size, stats))
+    rows, cols, cells = grid.rows, grid.cols, grid.cells
+    size = len(cells)
+    er, ec = divmod(end, cols)
+    gscore = array("i", [-1]) * size
+    parent = array("i", [-1]) * size
+    closed = bytearray(size)
+    gscore[start] = 0
+    parent[start] = start
+    sr, sc = divmod(start, cols)
+    # Manhattan distance is consistent, so a step changes f by 0 or +2 and
+    # everything queued lies in [f_min, f_min + 2]: a ring of 3 buckets
+    ring = 3
+    buckets = [[] for _ in range(ring)]
+    f_min = abs(sr - er) + abs(sc - ec)
+    buckets[f_min % ring].append(start)
+    queued = 1
+    explored = array("i")
+    pops = 0
+
+    while queued:
+        bucket = buckets[f_min % ring]
+        while not bucket:
+            f_min += 1
+            bucket = buckets[f_min % ring]
+        current = bucket.pop()
+        queued -= 1
+        pops += 1
+        if closed[current]:
+            continue
+        closed[current] = 1
+        explored.append(current)
+        if len(explored) == batch_size:
+            yield explored
+            explored = array("i")
+
+        if current == end:
+            break
+
+        r, c = divmod(current, cols)
+        tentative_g = gscore[current] + 1
+        for n, ok, nr, nc in ((current + cols, r + 1 < rows, r + 1, c), (current - cols, r > 0, r - 1, c),
+                              (current + 1, c + 1 < cols, r, c + 1), (current - 1, c > 0, r, c - 1)):
+            if not ok or cells[n] == WALL or closed[n]:
+                continue
+            g = gscore[n]
+            if g == -1 or tentative_g < g:
+                # a better g needs a fresh entry; the stale one is skipped via closed
+                parent[n] = current
+                gscore[n] = tentative_g
+                buckets[(tentative_g + abs(nr - er) + abs(nc - ec)) % ring].append(n)
+                queued += 1
+
+    if explored:
+        yield explored
+    _heap_stats(stats, pops, queued)
+    return _trace(parent, start, end)
+
+
+def iter_astar_weighted(grid, start, end, batch_size=BATCH_SIZE, stats=None):
+    rows, cols, cells, costs = grid.rows, grid.cols, grid.cells, grid.costs
+    size = len(cells)
+    er, ec = divmod(end, cols)
+    low = min(costs)  # h = low * Manhattan is admissible and consistent
+    gscore = array("i", [-1]) * size
+    parent = array("i", [-1]) * size
+    closed = bytearray(size)
+    gscore[start] = 0
+    parent[start] = start
+    sr, sc = divmod(start, cols)
+    # a step into a cell of cost w changes f by w - low .. w + low
+    ring = max(costs) + low + 1
+    buckets = [[] for _ in range(ring)]
+    f_min = low * (abs(sr - er) + abs(sc - ec))
+    buckets[f_min % ring].append(start)
+    queued = 1
+    explored = array("i")
+    pops = 0
+
+    while queued:
+        bucket = buckets[f_min % ring]
+        while not bucket:
+            f_min += 1
+            bucket = buckets[f_min % ring]
+        current = bucket.pop()
+        queued -= 1
+        pops += 1
+        if closed[current]:
+            continue
+        closed[current] = 1
+        explored.append(current)
+        if len(explored) == batch_size:
+            yield explored
+            explored = array("i")
+
+        if current == end:
+            break
+
+        r, c = divmod(current, cols)
+        g_here = gscore[current]
+        for n, ok, nr, nc in ((current + cols, r + 1 < rows, r + 1, c), (current - cols, r > 0, r - 1, c),
+                              (current + 1, c + 1 < cols, r, c + 1), (current - 1, c > 0, r, c - 1)):
+            if not ok or cells[n] == WALL or closed[n]:
+                continue
+            tentative_g = g_here + costs[n]
+            g = gscore[n]
+            if g == -1 or tentative_g < g:
+                parent[n] = current
+                gscore[n] = tentative_g
+                buckets[(tentative_g + low * (abs(nr - er) + abs(nc - ec))) % ring].append(n)
+                queued += 1
+
+    if explored:
+        yield explored
+    _heap_stats(stats, pops, queued)
+    return _trace(parent, start, end)
+
+
+def astar_with_exploration(grid, start, end, stats=None):
+    return collect(iter_astar(grid, start, end, batch_size=0, stats=stats))
+
+
+# ----------- DFS -----------
+def iter_dfs(grid, start, end, batch_size=BATCH_SIZE):
+    rows, cols, cells = grid.rows, grid.cols, grid.cells
+    parent = array("i", [-1]) * len(cells)
+    parent[start] = start
+    stack = array("i", [start])
+    explored = array("i")
+
+    while stack:
+        node = stack.pop()
+        explored.append(node)
+        if len(explored) == batch_size:
+            yield explored
+            explored = array("i")
+        if node == end:
+            break
+        r, c = divmod(node, cols)
+        for n, ok in ((node + cols, r + 1 < rows), (node - cols, r > 0),
+                      (node + 1, c + 1 < cols), (node - 1, c > 0)):
+            if ok and cells[n] == PATH and parent[n] == -1:
+                parent[n] = node
+                stack.append(n)
+
+    if explored:
+        yield explored
+    return _trace(parent, start, end)
+
+
+def dfs_with_exploration(grid, start, end):
+    return collect(iter_dfs(grid, start, end, batch_size=0))
+
+
+# ----------- Dijkstra -----------
+def iter_dijkstra(grid, start, end, batch_size=BATCH_SIZE, stats=None):
+    if grid.costs is not None:
+        return (yield from iter_dijkstra_weighted(grid, start, end, batch_size, stats))
+    rows, cols, cells = grid.rows, grid.cols, grid.cells
+    size = len(cells)
+    dist = array("i", [-1]) * size
+    parent = array("i", [-1]) * size
+    dist[start] = 0
+    parent[start] = start
+    # unit steps: everything queued costs `cost` or `cost + 1`
+    ring = 2
+    buckets = [[start], []]
+    cost = 0
+    queued = 1
+    explored = array("i")
+    pops = 0
+
+    while queued:
+        bucket = buckets[cost % ring]
+        while not bucket:
+            cost += 1
+            bucket = buckets[cost % ring]
+        node = bucket.pop()
+        queued -= 1
+        pops += 1
+        if dist[node] != cost:
+            continue  # stale: reached more cheaply after this entry was queued
+        explored.append(node)
+        if len(explored) == batch_size:
+            yield explored
+            explored = array("i")
+        if node == end:
+            break
+
+        r, c = divmod(node, cols)
+        new_cost = cost + 1
+        for n, ok in ((node + cols, r + 1 < rows), (node - cols, r > 0),
+                      (node + 1, c + 1 < cols), (node - 1, c > 0)):
+            if not ok or cells[n] == WALL:
+                continue
+            d = dist[n]
+            if d == -1 or new_cost < d:
+                dist[n] = new_cost
+                parent[n] = node
+                buckets[new_cost % ring].append(n)
+                queued += 1
+
+    if explored:
+        yield explored
+    _heap_stats(stats, pops, queued)
+    return _trace(parent, start, end)
+
+
+def iter_dijkstra_weighted(grid, start, end, batch_size=BATCH_SIZE, stats=None):
+    rows, cols, cells, costs = grid.rows, grid.cols, grid.cells, grid.costs
+    size = len(cells)
+    dist = array("i", [-1]) * size
+    parent = array("i", [-1]) * size
+    dist[start] = 0
+    parent[start] = start
+    # everything queued costs between `cost` and `cost + max(costs)`
+    ring = max(costs) + 1
+    buckets = [[] for _ in range(ring)]
+    buckets[0].append(start)
+    cost = 0
+    queued = 1
+    explored = array("i")
+    pops = 0
+
+    while queued:
+        bucket = buckets[cost % ring]
+        while not bucket:
+            cost += 1
+            bucket = buckets[cost % ring]
+        node = bucket.pop()
+        queued -= 1
+        pops += 1
+        if dist[node] != cost:
+            continue  # stale: reached more cheaply after this entry was queued
+        explored.append(node)
+        if len(explored) == batch_size:
+            yield explored
+            explored = array("i")
+        if node == end:
+            break
+
+        r, c = divmod(node, cols)
+        for n, ok in ((node + cols, r + 1 < rows), (node - cols, r > 0),
+                      (node + 1, c + 1 < cols), (node - 1, c > 0)):
+            if not ok or cells[n] == WALL:
+                continue
+            new_cost = cost + costs[n]
+            d = dist[n]
+            if d == -1 or new_cost < d:
+                dist[n] = new_cost
+                parent[n] = node
+                buckets[new_cost % ring].append(n)
+                queued += 1
+
+    if explored:
+        yield explored
+    _heap_stats(stats, pops, queued)
+    return _trace(parent, start, end)
+
+
+def dijkstra_with_exploration(grid, start, end, stats=None):
+    return collect(iter_dijkstra(grid, start, end, batch_size=0, stats=stats))
+
+
+def cost_field(grid, targets):
+    # Dijkstra backwards from targets on a terrain grid -> (cost, steps), int32
+    # arrays with -1 for cells that can't reach one: the cost of the cheapest
+    # walk from each cell to its nearest target, and that walk's length in
+    # steps. The next cell on it is a neighbour n with cost[n] + costs[n] ==
+    # cost[node] and steps[n] == steps[node] - 1.
+    rows, cols, cells, costs = grid.rows, grid.cols, grid.cells, grid.costs
+    size = len(cells)
+    dist = array("i", [-1]) * size
+    steps = array("i", [-1]) * size
+    ring = max(costs) + 1
+    buckets = [[] for _ in range(ring)]
+    queued = 0
+    for t in targets:
+        if cells[t] == PATH and dist[t] == -1:
+            dist[t] = steps[t] = 0
+            buckets[0].append(t)
+            queued += 1
+    cost = 0
+
+    while queued:
+        bucket = buckets[cost % ring]
+        while not bucket:
+            cost += 1
+            bucket = buckets[cost % ring]
+        node = bucket.pop()
+        queued -= 1
+        if dist[node] != cost:
+            continue
+        # walking from a neighbour into node pays node's cost
+        new_cost = cost + costs[node]
+        r, c = divmod(node, cols)
+        for n, ok in ((node + cols, r + 1 < rows), (node - cols, r > 0),
+                      (node + 1, c + 1 < cols), (node - 1, c > 0)):
+            if not ok or cells[n] == WALL:
+                continue
+            d = dist[n]
+            if d == -1 or new_cost < d:
+                dist[n] = new_cost
+                steps[n] = steps[node] + 1
+                buckets[new_cost % ring].append(n)
+                queued += 1
+
+    return dist, steps
+
+
+# ----------- Greedy Best-First Search -----------
+def iter_greedy(grid, start, end, batch_size=BATCH_SIZE, stats=None):
+    rows, cols, cells = grid.rows, grid.cols, grid.cells
+    size = len(cells)
+    er, ec = divmod(end, cols)
+    parent = array("i", [-1]) * size
+    visited = bytearray(size)
+    parent[start] = start
+    open_heap = [manhattan(grid, start, end) * size + start]
+    explored = array("i")
+    pops = 0
+
+    while open_heap:
+        node = heapq.heappop(open_heap) % size
+        pops += 1
+        if visited[node]:
+            continue
+        visited[node] = 1
+        explored.append(node)
+        if len(explored) == batch_size:
+            yield explored
+            explored = array("i")
+        if node == end:
+            break
+
+        r, c = divmod(node, cols)
+        for n, ok, nr, nc in ((node + cols, r + 1 < rows, r + 1, c), (node - cols, r > 0, r - 1, c),
+                              (node + 1, c + 1 < cols, r, c + 1), (node - 1, c > 0, r, c - 1)):
+            if not ok or cells[n] == WALL or visited[n]:
+                continue
+            parent[n] = node
+            heapq.heappush(open_heap, (abs(nr - er) + abs(nc - ec)) * size + n)
+
+    if explored:
+        yield explored
+    _heap_stats(stats, pops, len(open_heap))
+    return _trace(parent, start, end)
+
+
+def greedy_best_first(grid, start, end, stats=None):
+    return collect(iter_greedy(grid, start, end, batch_size=0, stats=stats))
+
+
+# ----------- Bidirectional BFS -----------
+def iter_bidirectional(grid, start, end, batch_size=BATCH_SIZE):
+    rows, cols, cells = grid.rows, grid.cols, grid.cells
+    size = len(cells)
+    q1, q2 = array("i", [start]), array("i", [end])
+    head1 = head2 = 0
+    visited1 = array("i", [-1]) * size
+    visited2 = array("i", [-1]) * size
+    visited1[start] = start
+    visited2[end] = end
+    explored = array("i")
+
+    meet_point = None
+
+    while head1 < len(q1) and head2 < len(q2):
+        # Expand forward search, one whole layer
+        for _ in range(len(q1) - head1):
+            node = q1[head1]
+            head1 += 1
+            explored.append(node)
+            if len(explored) == batch_size:
+                yield explored
+                explored = array("i")
+            if visited2[node] != -1:
+                meet_point = node
+                break
+            r, c = divmod(node, cols)
+            for n, ok in ((node + cols, r + 1 < rows), (node - cols, r > 0),
+                          (node + 1, c + 1 < cols), (node - 1, c > 0)):
+                if ok and cells[n] == PATH and visited1[n] == -1:
+                    visited1[n] = node
+                    q1.append(n)
+
+        if meet_point is not None: break
+
+        # Expand backward search, one whole layer
+        for _ in range(len(q2) - head2):
+            node = q2[head2]
+            head2 += 1
+            explored.append(node)
+            if len(explored) == batch_size:
+                yield explored
+                explored = array("i")
+            if visited1[node] != -1:
+                meet_point = node
+                break
+            r, c = divmod(node, cols)
+            for n, ok in ((node + cols, r + 1 < rows), (node - cols, r > 0),
+                          (node + 1, c + 1 < cols), (node - 1, c > 0)):
+                if ok and cells[n] == PATH and visited2[n] == -1:
+                    visited2[n] = node
+                    q2.append(n)
+
+        if meet_point is not None: break
+
+    if explored:
+        yield explored
+
+    path = array("i")
+    if meet_point is not None:
+        # reconstruct from both sides
+        path = _trace(visited1, start, meet_point)
+        node = meet_point
+        while node != end:
+            node = visited2[node]
+            path.append(node)
+    return path
+
+
+def bidirectional_bfs(grid, start, end):
+    return collect(iter_bidirectional(grid, start, end, batch_size=0))
+
+
+# ----------- Jump Point Search (4-connected) -----------
+# A* over jump points only: from each expanded node the search runs in a
+# straight line until it reaches the end, a forced neighbour (a side cell
+# that opens up where the cell behind it was blocked), or - when moving
+# vertically - a cell from which a horizontal jump finds one of those.
+# Straight runs through open space are scanned, not pushed onto the heap.
+# Pruning rules follow PathFinding.js's "never move diagonally" variant.
+def iter_jps(grid, start, end, batch_size=BATCH_SIZE, stats=None):
+    rows, cols, cells = grid.rows, grid.cols, grid.cells
+    size = len(cells)
+    er, ec = divmod(end, cols)
+
+    # The cell behind the current one is always on the grid (it is the cell
+    # the scan came from), so only the side cells need bounds checks.
+    def jump_horizontal(r, c, dc):
+        # first jump point along row r from (r, c) moving dc, or -1
+        i = r * cols + c
+        up, down = r > 0, r + 1 < rows
+        while 0 <= c < cols and cells[i] == PATH:
+            if (i == end
+                    or up and cells[i - cols] == PATH and cells[i - cols - dc] == WALL
+                    or down and cells[i + cols] == PATH and cells[i + cols - dc] == WALL):
+                return i
+            c += dc
+            i += dc
+        return -1
+
+    def jump_vertical(r, c, dr):
+        i = r * cols + c
+        step = dr * cols
+        left, right = c > 0, c + 1 < cols
+        while 0 <= r < rows and cells[i] == PATH:
+            if (i == end
+                    or left and cells[i - 1] == PATH and cells[i - 1 - step] == WALL
+                    or right and cells[i + 1] == PATH and cells[i + 1 - step] == WALL
+                    or right and jump_horizontal(r, c + 1, 1) != -1
+                    or left and jump_horizontal(r, c - 1, -1) != -1):
+                return i
+            r += dr
+            i += step
+        return -1
+
+    gscore = array("i", [-1]) * size
+    parent = array("i", [-1]) * size
+    closed = bytearray(size)
+    gscore[start] = 0
+    parent[start] = start
+    sr, sc = divmod(start, cols)
+    open_heap = [(abs(sr - er) + abs(sc - ec)) * size + start]
+    explored = array("i")
+    pops = 0
+
+    while open_heap:
+        node = heapq.heappop(open_heap) % size
+        pops += 1
+        if closed[node]:
+            continue
+        closed[node] = 1
+        explored.append(node)
+        if len(explored) == batch_size:
+            yield explored
+            explored = array("i")
+        if node == end:
+            break
+
+        r, c = divmod(node, cols)
+        pr, pc = divmod(parent[node], cols)
+        # pruned directions: forward plus both perpendiculars; all four at the start
+        if node == start:
+            directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+        elif pc != c:
+            dc = 1 if c > pc else -1
+            directions = ((1, 0), (-1, 0), (0, dc))
+        else:
+            dr = 1 if r > pr else -1
+            directions = ((0, 1), (0, -1), (dr, 0))
+
+        for dr, dc in directions:
+            if dc:
+                jump = jump_horizontal(r, c + dc, dc)
+            else:
+                jump = jump_vertical(r + dr, c, dr)
+            if jump == -1 or closed[jump]:
+                continue
+            jr, jc = divmod(jump, cols)
+            g = gscore[node] + abs(jr - r) + abs(jc - c)
+            if gscore[jump] == -1 or g < gscore[jump]:
+                gscore[jump] = g
+                parent[jump] = node
+                heapq.heappush(open_heap, (g + abs(jr - er) + abs(jc - ec)) * size + jump)
+
+    if explored:
+        yield explored
+    _heap_stats(stats, pops, len(open_heap))
+
+    # consecutive jump points share a row or column; fill in the cells between
+    path = array("i")
+    jumps = _trace(parent, start, end)
+    for a, b in zip(jumps, jumps[1:]):
+        step = (1 if b > a else -1) * (1 if a // cols == b // cols else cols)
+        path.extend(range(a, b, step))
+    if jumps:
+        path.append(end)
+    return path
+
+
+def jump_point_search(grid, start, end, stats=None):
+    return collect(iter_jps(grid, start, end, batch_size=0, stats=stats))
+
+
+SOLVERS = {
+    "bfs": bfs_with_exploration,
+    "dfs": dfs_with_exploration,
+    "dijkstra": dijkstra_with_exploration,
+    "greedy": greedy_best_first,
+    "bidirectional": bidirectional_bfs,
+    "astar": astar_with_exploration,
+    "jps": jump_point_search,
+}
+
+# step generators behind each solver, for streaming
+STEP_SOLVERS = {
+    "bfs": iter_bfs,
+    "dfs": iter_dfs,
+    "dijkstra": iter_dijkstra,
+    "greedy": iter_greedy,
+    "bidirectional": iter_bidirectional,
+    "astar": iter_astar,
+    "jps": iter_jps,
+}
+
+# solvers that take stats= and report priority-queue pushes and pops
+HEAP_SOLVERS = ("dijkstra", "greedy", "astar", "jps")
+
+
+# ----------- Benchmark -----------
+if __name__ == "__main__":
+    import argparse
+    import time
+    import tracemalloc
+
+    import maze_generator
+
+    parser = argparse.ArgumentParser(description="Time the solvers and measure their peak memory.")
+    parser.add_argument("--size", default="1000x1000")
+    parser.add_argument("--algos", default=",".join(SOLVERS))
+    parser.add_argument("--terrain", action="store_true", help="braided maze with per-cell costs")
+    args = parser.parse_args()
+
+    rows, cols = (int(x) for x in args.size.lower().split("x"))
+    grid = maze_generator.generate(rows, cols, terrain=args.terrain)
+    for algo in args.algos.split(","):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        explored, path = SOLVERS[algo](grid, 0, len(grid) - 1)
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{algo:14s} {elapsed:8.3f} s  peak {peak / 2**20:8.1f} MiB  "
+              f"explored {len(explored):>9,d}  path {len(path):>7,d}  cost {grid.path_cost(path):>8,d}")
@@ -0,0 +1,462 @@
+"""
+maze_store.py
+Memory-mapped on-disk mazes, for grids far too large for JSON or lists.
+
+File layout (little-endian):
+
+    header   magic "MZS1" | u16 version | u16 flags | u32 rows | u32 cols
+             | u32 meta length | u64 walls offset | u64 distance offset
+    meta     UTF-8 JSON object (algo, seed, distance sources, ...)
+    walls    bitset, one row of ceil(cols / 8) bytes per maze row,
+             LSB first, 1 = wall; starts on a 4096-byte boundary
+    distance optional int32 per cell, row-major, -1 = unreachable;
+             also page aligned (flags bit 0 says it is there)
+
+StoreWriter takes the maze a row at a time, so generate_store() streams
+Eller's rows straight to disk and the whole maze is never in memory.
+MazeStore maps a file read-only. store.grid() is a maze_grid.Grid whose
+cells read the bitmap in place, so every solver in maze_solvers runs on it
+unchanged (with its own per-cell arrays). StoreDirectory hands out shared
+read-only stores to the server, which cuts viewport tiles out of them.
+
+For the really large ones, build_distance_field() runs a layer-at-a-time
+BFS that keeps only a visited bitset (1 bit per cell) in memory and writes
+the distances into the mapped file in sorted stretches, handing each
+stretch back to the page cache; store_path() then walks a shortest path
+down that layer. On a 10001x10001 maze (100M cells, a 400 MB distance
+layer) peak RSS is about 120 MB for the BFS and 70 MB for the path.
+
+Run: python maze_store.py generate big.maze --size 10001x10001 --distance
+     python maze_store.py solve big.maze
+"""
+
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+from array import array
+
+import maze_generator
+from maze_codec import pack_bits, unpack_bits
+from maze_grid import Grid, PATH
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+MAGIC = b"MZS1"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIQQ")
+FLAG_DISTANCE = 1
+PAGE = 4096
+
+# same trade-off as maze_wavefront: small frontiers are cheaper in plain Python
+NUMPY_MIN_FRONTIER = 64
+# BFS layers are buffered and written out in file order once this many cells
+# are pending, FLUSH_SPAN cells (4 MiB of the distance layer) at a time
+FLUSH_CELLS = 1 << 21
+FLUSH_SPAN = 1 << 20
+# store_path() hands its pages back every this many steps
+TRACE_RELEASE = 1 << 12
+
+
+def _align(offset):
+    return -(-offset // PAGE) * PAGE
+
+
+def _stride(cols):
+    return (cols + 7) // 8
+
+
+# ----------- Writing -----------
+class StoreWriter:
+    # with StoreWriter(path, rows, cols, meta) as out: out.write_row(row) x rows
+    def __init__(self, path, rows, cols, meta=None):
+        if rows < 1 or cols < 1:
+            raise ValueError("maze needs at least one row and one column")
+        self.path = path
+        self.rows = rows
+        self.cols = cols
+        self.written = 0
+        meta = json.dumps(meta or {}).encode()
+        self.walls_offset = _align(HEADER.size + len(meta))
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, rows, cols, len(meta), self.walls_offset, 0))
+        self._file.write(meta)
+        self._file.seek(self.walls_offset)
+
+    def write_row(self, row):
+        # row: cols cells, WALL = 1, PATH = 0
+        if len(row) != self.cols:
+            raise ValueError("row does not match maze width")
+        if self.written == self.rows:
+            raise ValueError("maze already has all its rows")
+        self._file.write(pack_bits(row))
+        self.written += 1
+
+    def close(self):
+        self._file.close()
+        if self.written != self.rows:
+            raise ValueError(f"expected {self.rows} rows, got {self.written}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+def generate_store(path, rows, cols, seed=None):
+    # same maze as maze_generator.generate(rows, cols, "eller", seed), with
+    # O(cols) memory: Eller's algorithm only ever holds the current row
+    with StoreWriter(path, rows, cols, {"algo": "eller", "seed": seed}) as out:
+        for row in maze_generator.iter_eller_rows(rows, cols, random.Random(seed)):
+            out.write_row(row)
+
+
+# ----------- Reading -----------
+class BitCells:
+    # cells[i] over the mapped bitmap, so a Grid can wrap it like a bytearray
+    __slots__ = ("bits", "cols", "stride", "size")
+
+    def __init__(self, bits, rows, cols):
+        self.bits = bits
+        self.cols = cols
+        self.stride = _stride(cols)
+        self.size = rows * cols
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.size:
+            raise IndexError("cell index out of range")
+        r, c = divmod(i, self.cols)
+        return (self.bits[r * self.stride + (c >> 3)] >> (c & 7)) & 1
+
+
+class MazeStore:
+    def __init__(self, path, writable=False):
+        if sys.byteorder != "little":
+            raise ValueError("maze stores are little-endian; this host is not")
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError("not a maze store")
+            magic, version, flags, rows, cols, meta_len, walls_offset, dist_offset = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("not a maze store")
+            self.meta = json.loads(f.read(meta_len))
+        self.rows = rows
+        self.cols = cols
+        self.walls_offset = walls_offset
+        self.dist_offset = dist_offset if flags & FLAG_DISTANCE else 0
+
+        self._file = open(path, "r+b" if writable else "rb")
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=access)
+        view = memoryview(self._mmap)
+        self.walls = view[walls_offset:walls_offset + rows * _stride(cols)]
+        self.distances = None
+        if self.dist_offset:
+            self.distances = view[self.dist_offset:self.dist_offset + 4 * rows * cols].cast("i")
+        view.release()
+        self._grid = None
+
+    @property
+    def has_distance(self):
+        return self.distances is not None
+
+    def grid(self):
+        # a Grid reading the mapped bitmap; solvers take it like any other
+        if self._grid is None:
+            self._grid = Grid(self.rows, self.cols, BitCells(self.walls, self.rows, self.cols))
+        return self._grid
+
+    def tile(self, r, c, rows, cols):
+        # window [r, r + rows) x [c, c + cols), clipped to the maze ->
+        # (Grid of the window, distance rows or None)
+        rows = max(0, min(rows, self.rows - r))
+        cols = max(0, min(cols, self.cols - c))
+        if r < 0 or c < 0 or not rows or not cols:
+            raise IndexError("tile is outside the maze")
+        stride, skip = _stride(self.cols), c & 7
+        first, last = c >> 3, (c + cols - 1) >> 3
+        cells = bytearray()
+        for row in range(r, r + rows):
+            base = row * stride
+            cells += unpack_bits(self.walls[base + first:base + last + 1], skip + cols)[skip:]
+        distances = None
+        if self.distances is not None:
+            dist = self.distances
+            distances = [dist[row * self.cols + c:row * self.cols + c + cols].tolist()
+                         for row in range(r, r + rows)]
+        return Grid(rows, cols, cells), distances
+
+    def close(self):
+        self._grid = None
+        self.walls.release()
+        if self.distances is not None:
+            self.distances.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class StoreDirectory:
+    # the <name>.maze files in one directory, each mapped once and shared by
+    # every request thread; files must not be rewritten while served
+    def __init__(self, path):
+        self.path = path
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        # -> MazeStore, or None for unknown or unsafe names
+        if not name or name.startswith(".") or "/" in name or "\\" in name:
+            return None
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                try:
+                    store = self._stores[name] = MazeStore(os.path.join(self.path, name + ".maze"))
+                except (OSError, ValueError):
+                    return None
+            return store
+
+    def __len__(self):
+        return len(self._stores)
+
+
+# ----------- Distance layer -----------
+def _release(store, start=0, length=0):
+    # give mapped pages back to the page cache; dirty ones stay there
+    if not (hasattr(store._mmap, "madvise") and hasattr(mmap, "MADV_DONTNEED")):
+        return
+    if length:
+        store._mmap.madvise(mmap.MADV_DONTNEED, start, min(length, len(store._mmap) - start))
+    else:
+        store._mmap.madvise(mmap.MADV_DONTNEED)
+
+
+def _add_distance_layer(path, sources):
+    # (re)allocate the int32 layer filled with -1 and point the header at it
+    with open(path, "r+b") as f:
+        magic, version, flags, rows, cols, meta_len, walls_offset, _ = HEADER.unpack(f.read(HEADER.size))
+        meta = json.loads(f.read(meta_len))
+        dist_offset = _align(walls_offset + rows * _stride(cols))
+        f.truncate(dist_offset)
+        f.seek(dist_offset)
+        chunk = b"\xff" * (1 << 20)
+        remaining = 4 * rows * cols
+        while remaining:
+            f.write(chunk[:remaining])
+            remaining -= min(remaining, len(chunk))
+        # the meta block cannot grow in place, so the sources go in only if they fit
+        meta["distance_sources"] = sources
+        encoded = json.dumps(meta).encode()
+        if HEADER.size + len(encoded) <= walls_offset:
+            meta_len = len(encoded)
+            f.seek(HEADER.size)
+            f.write(encoded)
+        f.seek(0)
+        f.write(HEADER.pack(magic, version, flags | FLAG_DISTANCE, rows, cols, meta_len, walls_offset, dist_offset))
+
+
+def _flush(store, pending):
+    # write buffered BFS layers [(depth, cells), ...] into the distance layer.
+    # A frontier is scattered over the whole maze, so the cells are sorted
+    # and written one FLUSH_SPAN stretch at a time, each released once done.
+    dist = store.distances
+    if np is None:
+        for depth, layer in pending:
+            for n in layer:
+                dist[n] = depth
+        _release(store)
+        return
+    cells = np.concatenate([np.frombuffer(layer, dtype=np.int32) for _, layer in pending])
+    depths = np.repeat(np.array([depth for depth, _ in pending], dtype=np.int32),
+                       [len(layer) for _, layer in pending])
+    order = np.argsort(cells)
+    cells, depths = cells[order], depths[order]
+    dist_np = np.frombuffer(dist, dtype=np.int32)
+    bounds = np.searchsorted(cells, np.arange(0, len(dist) + FLUSH_SPAN, FLUSH_SPAN))
+    for k in range(len(bounds) - 1):
+        lo, hi = bounds[k], bounds[k + 1]
+        if lo < hi:
+            dist_np[cells[lo:hi]] = depths[lo:hi]
+            _release(store, store.dist_offset + 4 * k * FLUSH_SPAN, 4 * FLUSH_SPAN)
+    del dist_np
+
+
+def build_distance_field(path, sources):
+    # BFS distances from the source cells into the file's distance layer ->
+    # (reachable cells, max distance). Visited cells are a bitset in memory
+    # (rows * cols / 8 bytes); the int32 layer itself is only written.
+    _add_distance_layer(path, sources)
+    with MazeStore(path, writable=True) as store:
+        rows, cols, bits = store.rows, store.cols, store.walls
+        stride = _stride(cols)
+        size = rows * cols
+        last_row = size - cols
+        visited = bytearray((size + 7) // 8)
+
+        frontier = array("i")
+        for s in sources:
+            r, c = divmod(s, cols)
+            if not (bits[r * stride + (c >> 3)] >> (c & 7)) & 1 and not (visited[s >> 3] >> (s & 7)) & 1:
+                visited[s >> 3] |= 1 << (s & 7)
+                frontier.append(s)
+        if np is not None:
+            bits_np = np.frombuffer(bits, dtype=np.uint8)
+            visited_np = np.frombuffer(visited, dtype=np.uint8)
+        pending, pending_cells = [(0, frontier)], len(frontier)
+        reachable, depth = len(frontier), 0
+
+        while frontier:
+            depth += 1
+            if np is None or len(frontier) < NUMPY_MIN_FRONTIER:
+                nxt = array("i")
+                for node in frontier:
+                    r, c = divmod(node, cols)
+                    base = r * stride
+                    for n, ok, byte, bit in (
+                        (node + cols, node < last_row, base + stride + (c >> 3), c & 7),
+                        (node - cols, node >= cols, base - stride + (c >> 3), c & 7),
+                        (node + 1, c + 1 < cols, base + ((c + 1) >> 3), (c + 1) & 7),
+                        (node - 1, c > 0, base + ((c - 1) >> 3), (c - 1) & 7),
+                    ):
+                        if ok and not (bits[byte] >> bit) & 1 and not (visited[n >> 3] >> (n & 7)) & 1:
+                            visited[n >> 3] |= 1 << (n & 7)
+                            nxt.append(n)
+            else:
+                f = np.frombuffer(frontier, dtype=np.int32)
+                c = f % cols
+                candidates = np.concatenate((
+                    f[f < last_row] + cols,
+                    f[f >= cols] - cols,
+                    f[c + 1 < cols] + 1,
+                    f[c > 0] - 1,
+                ))
+                r, c = np.divmod(candidates, cols)
+                walls = (bits_np[r * stride + (c >> 3)] >> (c & 7)) & 1
+                candidates = np.unique(candidates[walls == PATH])
+                candidates = candidates[(visited_np[candidates >> 3] >> (candidates & 7)) & 1 == 0]
+                np.bitwise_or.at(visited_np, candidates >> 3, (1 << (candidates & 7)).astype(np.uint8))
+                nxt = array("i", candidates.astype(np.int32).tobytes())
+            if nxt:
+                reachable += len(nxt)
+                pending.append((depth, nxt))
+                pending_cells += len(nxt)
+                if pending_cells >= FLUSH_CELLS:
+                    _flush(store, pending)
+                    pending, pending_cells = [], 0
+            frontier = nxt
+        if pending:
+            _flush(store, pending)
+        if np is not None:
+            del bits_np, visited_np
+        return reachable, depth - 1
+
+
+def store_path(store, start):
+    # shortest path from start down the stored distances to the nearest
+    # source; no search, and pages are handed back every TRACE_RELEASE steps
+    dist = store.distances
+    if dist is None:
+        raise ValueError("maze store has no distance layer")
+    rows, cols = store.rows, store.cols
+    path = array("i")
+    if dist[start] == -1:
+        return path
+    node = start
+    path.append(node)
+    while dist[node]:
+        d = dist[node] - 1
+        r, c = divmod(node, cols)
+        for n, ok in ((node + cols, r + 1 < rows), (node - cols, r > 0),
+                      (node + 1, c + 1 < cols), (node - 1, c > 0)):
+            if ok and dist[n] == d:
+                node = n
+                break
+        path.append(node)
+        if len(path) % TRACE_RELEASE == 0:
+            _release(store)
+    return path
+
+
+# ----------- CLI -----------
+if __name__ == "__main__":
+    import argparse
+    import resource
+    import time
+
+    from maze_solvers import SOLVERS
+
+    def peak_rss():
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 2**20 if sys.platform == "darwin" else rss / 2**10
+
+    parser = argparse.ArgumentParser(description="Build and solve memory-mapped maze stores.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    gen = commands.add_parser("generate", help="write an Eller maze row by row")
+    gen.add_argument("path")
+    gen.add_argument("--size", default="10001x10001")
+    gen.add_argument("--seed", type=int, default=None)
+    gen.add_argument("--distance", action="store_true", help="also build the goal distance layer")
+    field = commands.add_parser("distance", help="(re)build the distance layer")
+    field.add_argument("path")
+    field.add_argument("--source", default=None, help="r,c (default: bottom-right goal)")
+    solve = commands.add_parser("solve", help="shortest path from the top-left cell")
+    solve.add_argument("path")
+    solve.add_argument("--algo", default="field", help="'field' reads the distance layer; or any solver")
+    info = commands.add_parser("info")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.command == "generate":
+        rows, cols = (int(x) for x in args.size.lower().split("x"))
+        # record a seed either way, so the maze can be rebuilt in memory
+        seed = args.seed if args.seed is not None else maze_generator.new_seed()
+        generate_store(args.path, rows, cols, seed)
+        print(f"wrote {rows}x{cols} maze, {os.path.getsize(args.path) / 2**20:.1f} MiB "
+              f"in {time.perf_counter() - t0:.2f} s")
+    if args.command in ("generate", "distance"):
+        t1 = time.perf_counter()
+        with MazeStore(args.path) as store:
+            rows, cols = store.rows, store.cols
+        source = rows * cols - 1
+        if getattr(args, "source", None):
+            r, c = (int(x) for x in args.source.split(","))
+            source = r * cols + c
+        if args.command == "distance" or args.distance:
+            reachable, farthest = build_distance_field(args.path, [source])
+            print(f"distance layer: {reachable:,d} reachable cells, max distance {farthest:,d} "
+                  f"in {time.perf_counter() - t1:.2f} s")
+    if args.command == "solve":
+        with MazeStore(args.path) as store:
+            if args.algo == "field":
+                path = store_path(store, 0)
+            else:
+                path = SOLVERS[args.algo](store.grid(), 0, store.rows * store.cols - 1)[1]
+            print(f"{args.algo}: path {len(path):,d} cells in {time.perf_counter() - t0:.2f} s")
+    if args.command == "info":
+        with MazeStore(args.path) as store:
+            print(json.dumps({"rows": store.rows, "cols": store.cols, "distance": store.has_distance,
+                              "bytes": os.path.getsize(args.path), **store.meta}))
+    print(f"peak RSS {peak_rss():.1f} MiB")
@@ -0,0 +1,169 @@
+"""
+maze_tree.py
+Path and distance queries on perfect mazes without searching.
+
+A perfect maze (every generator in maze_generator.py makes one) is a
+spanning tree of its open cells, so the path between two cells is unique:
+it climbs from each cell to their lowest common ancestor (LCA). MazeTree
+roots the tree at the first open cell and stores depth, parent and
+binary-lifting tables (up[k][v] = the 2**k-th ancestor of v), so
+
+    distance(a, b)  O(log n)
+    path(a, b)      O(log n + path length)
+
+Tables are indexed by a compact id per open cell, so walls cost nothing
+beyond the cell -> id map. If the open cells do not form one tree (the maze
+was braided or edited into loops, or is disconnected) MazeTree.perfect is
+False, no tables are built and callers should fall back to a search.
+
+Benchmark: python maze_tree.py --size 1001x1001
+"""
+
+from array import array
+
+from maze_grid import PATH
+
+
+class MazeTree:
+    __slots__ = ("cols", "id_of", "cells", "depth", "up", "perfect")
+
+    def __init__(self, grid):
+        rows, cols, cells = grid.rows, grid.cols, grid.cells
+        self.cols = cols
+        self.id_of = array("i", [-1]) * len(cells)  # cell -> compact id
+        self.cells = array("i")  # compact id -> cell, in BFS order from the root
+        self.depth = array("i")
+        self.up = []
+        self.perfect = False
+
+        root = cells.find(PATH)
+        if root == -1:
+            return
+        parent = array("i", [0])
+        self.id_of[root] = 0
+        self.cells.append(root)
+        self.depth.append(0)
+        edges = 0
+        head = 0
+        while head < len(self.cells):
+            node = self.cells[head]
+            r, c = divmod(node, cols)
+            for n, ok in ((node + cols, r + 1 < rows), (node - cols, r > 0),
+                          (node + 1, c + 1 < cols), (node - 1, c > 0)):
+                if ok and cells[n] == PATH:
+                    edges += 1
+                    if self.id_of[n] == -1:
+                        self.id_of[n] = len(self.cells)
+                        self.cells.append(n)
+                        parent.append(head)
+                        self.depth.append(self.depth[head] + 1)
+            head += 1
+
+        # a tree: every open cell reached and exactly n - 1 edges (each seen twice)
+        open_cells = cells.count(PATH)
+        if len(self.cells) != open_cells or edges != 2 * (open_cells - 1):
+            self.id_of, self.cells, self.depth = array("i"), array("i"), array("i")
+            return
+        self.perfect = True
+
+        self.up = [parent]
+        for _ in range(1, max(1, max(self.depth).bit_length())):
+            prev = self.up[-1]
+            self.up.append(array("i", [prev[p] for p in prev]))
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def nbytes(self):
+        return 4 * (len(self.id_of) + len(self.cells) * (2 + len(self.up)))
+
+    def _lift(self, v, steps):
+        k = 0
+        while steps:
+            if steps & 1:
+                v = self.up[k][v]
+            steps >>= 1
+            k += 1
+        return v
+
+    def _lca(self, a, b):
+        depth, up = self.depth, self.up
+        if depth[a] < depth[b]:
+            a, b = b, a
+        a = self._lift(a, depth[a] - depth[b])
+        if a == b:
+            return a
+        for k in range(len(up) - 1, -1, -1):
+            if up[k][a] != up[k][b]:
+                a, b = up[k][a], up[k][b]
+        return up[0][a]
+
+    def _ids(self, start, end):
+        a, b = self.id_of[start], self.id_of[end]
+        if a == -1 or b == -1:
+            raise ValueError("start and end must be open cells")
+        return a, b
+
+    def lca(self, start, end):
+        return self.cells[self._lca(*self._ids(start, end))]
+
+    def distance(self, start, end):
+        a, b = self._ids(start, end)
+        return self.depth[a] + self.depth[b] - 2 * self.depth[self._lca(a, b)]
+
+    def path(self, start, end):
+        # start -> lca, then lca -> end (the end side is collected upwards and reversed)
+        a, b = self._ids(start, end)
+        top = self._lca(a, b)
+        parent, cells = self.up[0], self.cells
+        path = array("i")
+        while a != top:
+            path.append(cells[a])
+            a = parent[a]
+        path.append(cells[top])
+        tail = array("i")
+        while b != top:
+            tail.append(cells[b])
+            b = parent[b]
+        tail.reverse()
+        path.extend(tail)
+        return path
+
+
+# ----------- Benchmark -----------
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    import maze_generator
+    from maze_solvers import astar_with_exploration
+
+    parser = argparse.ArgumentParser(description="Tree index build and query times.")
+    parser.add_argument("--size", default="1001x1001")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rows, cols = (int(x) for x in args.size.lower().split("x"))
+    grid = maze_generator.generate(rows, cols, seed=args.seed)
+    t0 = time.perf_counter()
+    tree = MazeTree(grid)
+    print(f"index over {len(tree):,d} cells, {len(tree.up)} lifting levels, "
+          f"{tree.nbytes / 2**20:.1f} MiB, built in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    rng = random.Random(args.seed)
+    pairs = [(rng.choice(tree.cells), rng.choice(tree.cells)) for _ in range(args.queries)]
+    t0 = time.perf_counter()
+    lengths = [len(astar_with_exploration(grid, s, e)[1]) for s, e in pairs]
+    search = (time.perf_counter() - t0) / len(pairs)
+    t0 = time.perf_counter()
+    assert [len(tree.path(s, e)) for s, e in pairs] == lengths
+    path_time = (time.perf_counter() - t0) / len(pairs)
+    t0 = time.perf_counter()
+    for s, e in pairs:
+        tree.distance(s, e)
+    dist_time = (time.perf_counter() - t0) / len(pairs)
+    print(f"A* {search * 1000:8.2f} ms/query   tree path {path_time * 1000:8.3f} ms/query   "
+          f"tree distance {dist_time * 1e6:8.1f} us/query")
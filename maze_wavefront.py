@@ -0,0 +1,178 @@
+"""
+maze_wavefront.py
+Layer-at-a-time BFS over a maze_grid.Grid.
+
+Instead of popping one cell per loop iteration, each step grows the whole
+wavefront: the frontier's cell indices are shifted by +cols, -cols, +1, -1,
+masked against the open cells and the unvisited cells, and the survivors
+become the next layer. Distances live in an int32 buffer that NumPy and
+plain Python share, so tiny frontiers (long corridors) are expanded in
+Python and large ones in NumPy. NumPy is optional; without it every layer
+takes the Python route.
+
+Benchmark: python maze_wavefront.py --sizes 500x500,1000x1000
+"""
+
+from array import array
+
+from maze_grid import PATH
+from maze_solvers import BATCH_SIZE, collect
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+# frontiers smaller than this are cheaper to expand without NumPy call overhead
+NUMPY_MIN_FRONTIER = 64
+
+
+def iter_wavefront(grid, sources, end=None):
+    # Yields each layer (the cells at distance k) and returns dist, an int32
+    # array with -1 for unreachable cells. With an end cell the expansion
+    # stops after the layer that reaches it.
+    cols, cells = grid.cols, grid.cells
+    size = len(cells)
+    dist = array("i", [-1]) * size
+    frontier = array("i")
+    for s in sources:
+        if cells[s] == PATH and dist[s] == -1:
+            dist[s] = 0
+            frontier.append(s)
+    if frontier:
+        yield frontier
+    if np is not None:
+        cells_np = np.frombuffer(cells, dtype=np.uint8)
+        dist_np = np.frombuffer(dist, dtype=np.int32)
+    last_row = size - cols
+    depth = 0
+
+    while frontier and (end is None or dist[end] == -1):
+        depth += 1
+        if np is None or len(frontier) < NUMPY_MIN_FRONTIER:
+            nxt = array("i")
+            for node in frontier:
+                c = node % cols
+                for n, ok in ((node + cols, node < last_row), (node - cols, node >= cols),
+                              (node + 1, c + 1 < cols), (node - 1, c > 0)):
+                    if ok and cells[n] == PATH and dist[n] == -1:
+                        dist[n] = depth
+                        nxt.append(n)
+        else:
+            f = np.frombuffer(frontier, dtype=np.int32)
+            c = f % cols
+            candidates = np.concatenate((
+                f[f < last_row] + cols,
+                f[f >= cols] - cols,
+                f[c + 1 < cols] + 1,
+                f[c > 0] - 1,
+            ))
+            candidates = candidates[(cells_np[candidates] == PATH) & (dist_np[candidates] == -1)]
+            candidates = np.unique(candidates)
+            dist_np[candidates] = depth
+            nxt = array("i", candidates.astype(np.int32).tobytes())
+        if nxt:
+            yield nxt
+        frontier = nxt
+
+    return dist
+
+
+def wavefront(grid, sources, end=None):
+    # -> (dist, layers) with layers[k] holding the cells at distance k
+    layers = []
+    steps = iter_wavefront(grid, sources, end)
+    while True:
+        try:
+            layers.append(next(steps))
+        except StopIteration as stop:
+            return stop.value, layers
+
+
+def trace_path(grid, dist, end):
+    # walk downhill in the distance field from end back to a source
+    path = array("i")
+    if dist[end] == -1:
+        return path
+    rows, cols = grid.rows, grid.cols
+    node = end
+    path.append(node)
+    while dist[node]:
+        d = dist[node] - 1
+        r, c = divmod(node, cols)
+        for n, ok in ((node + cols, r + 1 < rows), (node - cols, r > 0),
+                      (node + 1, c + 1 < cols), (node - 1, c > 0)):
+            if ok and dist[n] == d:
+                node = n
+                break
+        path.append(node)
+    path.reverse()
+    return path
+
+
+def distance_field(grid, sources):
+    steps = iter_wavefront(grid, sources)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+# ----------- Solver interface -----------
+def iter_wavefront_bfs(grid, start, end, batch_size=BATCH_SIZE):
+    # same contract as the maze_solvers step generators; thin layers are
+    # merged so corridors don't turn into one batch per cell
+    batch = array("i")
+    steps = iter_wavefront(grid, [start], end)
+    while True:
+        try:
+            batch.extend(next(steps))
+        except StopIteration as stop:
+            dist = stop.value
+            break
+        if batch_size and len(batch) >= batch_size:
+            yield batch
+            batch = array("i")
+    if batch:
+        yield batch
+    return trace_path(grid, dist, end)
+
+
+def wavefront_bfs(grid, start, end):
+    return collect(iter_wavefront_bfs(grid, start, end, batch_size=0))
+
+
+# ----------- Benchmark -----------
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    import maze_generator
+    from maze_solvers import bfs_with_exploration
+
+    parser = argparse.ArgumentParser(description="Compare the wavefront BFS with the queue BFS.")
+    parser.add_argument("--sizes", default="500x500,1000x1000,2000x2000")
+    parser.add_argument("--open", action="store_true", help="use an empty grid instead of a maze")
+    args = parser.parse_args()
+
+    for size in args.sizes.split(","):
+        rows, cols = (int(x) for x in size.lower().split("x"))
+        grid = maze_generator.generate(rows, cols)
+        if args.open:
+            grid.cells[:] = bytes(len(grid))
+        end = len(grid) - 1
+
+        t0 = time.perf_counter()
+        _, queue_path = bfs_with_exploration(grid, 0, end)
+        queue_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _, wave_path = wavefront_bfs(grid, 0, end)
+        wave_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        distance_field(grid, [0])
+        field_time = time.perf_counter() - t0
+
+        assert len(queue_path) == len(wave_path)
+        print(f"{rows}x{cols:<6d} queue bfs {queue_time:7.3f} s  wavefront {wave_time:7.3f} s  "
+              f"(x{queue_time / wave_time:.1f})  full field {field_time:7.3f} s  path {len(wave_path):,d}")
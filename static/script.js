@@ -7,12 +7,14 @@ const resetBtn = document.getElementById("resetBtn");
 const easyBtn = document.getElementById("easyBtn"); //accepts the difficulty levels 
 const mediumBtn = document.getElementById("mediumBtn");
 const hardBtn = document.getElementById("hardBtn");
+const terrainToggle = document.getElementById("terrainToggle");
 
 const compareBtn = document.getElementById("compareBtn");
 compareBtn.onclick = compareAlgorithms;
 
 
 let maze = [];
+let mazeId = null;
 let cellSize = 20;
 let explored = [];
 let path = [];
@@ -23,13 +25,15 @@ let gameActive = false;
 let timer = 0;
 let timerInterval = null;
 let bestPathLength = 0;
+let optimalLength = 0; // from the server's goal distance field, per maze
+let costs = null; // terrain mazes: r * cols + c -> cost of stepping there (1 = ground)
+const HINT_STEPS = 15;
 let comparisonResults = [];
 
 
 // ----------------- Maze Size ---------
 async function generateMaze(rows = 25, cols = 35) {
-  const res = await fetch(`/generate?rows=${rows}&cols=${cols}`);
-  maze = await res.json();
+  await fetchMaze(`rows=${rows}&cols=${cols}`);
   adjustCanvas();
   resetPlayer();
   drawMaze();
@@ -43,8 +47,7 @@ hardBtn.onclick = () => generateMaze(40, 50);
 
 // ------------- GENERATE MAZE -------------
 async function generateMaze() {
-  const res = await fetch("/generate");
-  maze = await res.json();
+  await fetchMaze("");
   adjustCanvas();
   resetPlayer();
   drawMaze();
@@ -56,58 +59,122 @@ function adjustCanvas() {
   const maxWidth = Math.min(window.innerWidth - 60, 1000);
   const cols = maze[0].length;
   const rows = maze.length;
-  cellSize = Math.floor(maxWidth / cols);
+  cellSize = Math.max(1, Math.floor(maxWidth / cols));
   canvas.width = cols * cellSize;
   canvas.height = rows * cellSize;
   endPos = { r: rows - 1, c: cols - 1 };
 }
 
-function drawMaze() {
-  for (let r = 0; r < maze.length; r++) {
-    for (let c = 0; c < maze[0].length; c++) {
-      ctx.fillStyle = maze[r][c] === 1 ? "#000" : "#fff";
-      ctx.fillRect(c * cellSize, r * cellSize, cellSize, cellSize);
-    }
-  }
-
-  // Draw user path
-  for (const step of userPath) {
-    ctx.fillStyle = "#90EE90"; // light green
-    ctx.fillRect(step.c * cellSize, step.r * cellSize, cellSize, cellSize);
-  }
-
-  // Start and End
-  ctx.fillStyle = "green";
-  ctx.fillRect(0, 0, cellSize, cellSize);
-  ctx.fillStyle = "red";
-  ctx.fillRect((maze[0].length - 1) * cellSize, (maze.length - 1) * cellSize, cellSize, cellSize);
+// ------------- RENDERING -------------
+// The maze lives in an offscreen canvas at one pixel per cell (walls, the
+// user's trail, start and end) that is scaled up onto the visible canvas:
+// a full redraw is a single drawImage and a move repaints only its cells.
+const layer = document.createElement("canvas");
+const layerCtx = layer.getContext("2d");
+let layerImage = null;
+let visited = new Uint8Array(0); // r * cols + c -> 1 once the user has stepped there
+
+const COLORS = {
+  wall: [0, 0, 0],
+  open: [255, 255, 255],
+  trail: [144, 238, 144], // light green
+  start: [0, 128, 0],
+  end: [255, 0, 0],
+  heavy: [120, 85, 45], // open cells shade towards this as their cost rises
+};
+const MAX_COST = 9;
+
+function terrainColor(cost) {
+  const t = Math.min(cost - 1, MAX_COST - 1) / (MAX_COST - 1);
+  return COLORS.open.map((v, k) => Math.round(v + (COLORS.heavy[k] - v) * t));
+}
 
-  // Player position
-  // below has the box shape 
+function cellColor(r, c) {
+  const i = r * maze[0].length + c;
+  if (r === 0 && c === 0) return COLORS.start;
+  if (r === maze.length - 1 && c === maze[0].length - 1) return COLORS.end;
+  if (visited[i]) return COLORS.trail;
+  if (maze[r][c] === 1) return COLORS.wall;
+  return costs ? terrainColor(costs[i]) : COLORS.open;
+}
 
-  // ctx.fillStyle = "#38bdf8"; // cyan player
-  // ctx.fillRect(player.c * cellSize, player.r * cellSize, cellSize, cellSize);
+function setPixel(r, c) {
+  const [red, green, blue] = cellColor(r, c);
+  const o = (r * maze[0].length + c) * 4;
+  const data = layerImage.data;
+  data[o] = red;
+  data[o + 1] = green;
+  data[o + 2] = blue;
+  data[o + 3] = 255;
+}
 
+function buildLayer() {
+  const rows = maze.length, cols = maze[0].length;
+  layer.width = cols;
+  layer.height = rows;
+  layerImage = layerCtx.createImageData(cols, rows);
+  for (let r = 0; r < rows; r++) {
+    for (let c = 0; c < cols; c++) setPixel(r, c);
+  }
+  layerCtx.putImageData(layerImage, 0, 0);
+}
 
-// below is for the player to appear as circle
-const playerX = player.c * cellSize + cellSize / 2;
-const playerY = player.r * cellSize + cellSize / 2;
-const radius = cellSize * 0.35;
+function updateLayerCell(r, c) {
+  setPixel(r, c);
+  layerCtx.putImageData(layerImage, 0, 0, c, r, 1, 1);
+}
 
-ctx.beginPath();
-ctx.arc(playerX, playerY, radius, 0, 2 * Math.PI);
-ctx.fillStyle = "rgba(0, 0, 0, 0.8)"; // dark shadow
-ctx.fill();
-ctx.closePath();
+// Copy one cell from the layer back onto the canvas (erases overlays on it)
+function blitCell(r, c) {
+  ctx.drawImage(layer, c, r, 1, 1, c * cellSize, r * cellSize, cellSize, cellSize);
+}
 
-// add a small highlight (head light or reflection)
-ctx.beginPath();
-ctx.arc(playerX - radius / 3, playerY - radius / 3, radius * 0.2, 0, 2 * Math.PI);
-ctx.fillStyle = "rgba(255, 255, 255, 0.3)";
-ctx.fill();
-ctx.closePath();
+function drawMaze() {
+  if (!layerImage) return;
+  ctx.imageSmoothingEnabled = false; // resizing the canvas resets this
+  ctx.drawImage(layer, 0, 0, canvas.width, canvas.height);
+  drawPlayer();
+}
 
+function drawPlayer() {
+  // the player is a circle with a dark shadow and a small highlight
+  const playerX = player.c * cellSize + cellSize / 2;
+  const playerY = player.r * cellSize + cellSize / 2;
+  const radius = cellSize * 0.35;
+
+  ctx.beginPath();
+  ctx.arc(playerX, playerY, radius, 0, 2 * Math.PI);
+  ctx.fillStyle = "rgba(0, 0, 0, 0.8)";
+  ctx.fill();
+  ctx.closePath();
+
+  ctx.beginPath();
+  ctx.arc(playerX - radius / 3, playerY - radius / 3, radius * 0.2, 0, 2 * Math.PI);
+  ctx.fillStyle = "rgba(255, 255, 255, 0.3)";
+  ctx.fill();
+  ctx.closePath();
+}
 
+// Paint cells over the maze one batch per animation frame. The batch grows
+// with the number of cells so even a search over a 1000x1000 maze finishes
+// in about maxFrames frames.
+function paintCells(cells, color, minPerFrame, maxFrames) {
+  const perFrame = Math.max(minPerFrame, Math.ceil(cells.length / maxFrames));
+  return new Promise(resolve => {
+    let i = 0;
+    function frame() {
+      ctx.fillStyle = color;
+      const stop = Math.min(i + perFrame, cells.length);
+      for (; i < stop; i++) {
+        const [r, c] = cells[i];
+        if ((r === player.r && c === player.c) || (r === endPos.r && c === endPos.c)) continue;
+        ctx.fillRect(c * cellSize, r * cellSize, cellSize, cellSize);
+      }
+      if (i < cells.length) requestAnimationFrame(frame);
+      else resolve();
+    }
+    requestAnimationFrame(frame);
+  });
 }
 
 // ------------- PLAYER MOVEMENT -------------
@@ -135,15 +202,23 @@ function handleMove(e) {
   if (nr < 0 || nc < 0 || nr >= maze.length || nc >= maze[0].length) return;
   if (maze[nr][nc] === 1) return; // wall
 
+  const prev = player;
   player = { r: nr, c: nc };
+  showProgress(prev);
 
   // Add to path if new cell
-  if (!userPath.some(p => p.r === nr && p.c === nc)) {
+  const i = nr * maze[0].length + nc;
+  if (!visited[i]) {
+    visited[i] = 1;
     userPath.push({ r: nr, c: nc });
+    updateLayerCell(nr, nc);
     updateStats();
   }
 
-  drawMaze();
+  // only the cell left behind and the new one change
+  blitCell(prev.r, prev.c);
+  blitCell(nr, nc);
+  drawPlayer();
   checkWin();
 }
 
@@ -156,7 +231,126 @@ function checkWin() {
   }
 }
 
+// ------------- SERVER CALLS -------------
+// Send the maze_id instead of the whole grid; re-upload only if the server forgot it
+async function postMaze(url, payload) {
+  const post = body => fetch(url, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  });
+  let res = mazeId ? await post({ maze_id: mazeId, ...payload }) : null;
+  if (!res || res.status === 404) {
+    // expired id: send the whole maze, terrain costs included
+    const body = costs ? { maze, costs: bytesToBase64(costs), ...payload } : { maze, ...payload };
+    res = await post(body);
+  }
+  return res;
+}
+
+function bytesToBase64(bytes) {
+  let text = "";
+  // chunked: spreading a large array into fromCharCode overflows the stack
+  for (let i = 0; i < bytes.length; i += 0x8000) {
+    text += String.fromCharCode(...bytes.subarray(i, i + 0x8000));
+  }
+  return btoa(text);
+}
+
+// ------------- BINARY PAYLOADS (layout in maze_codec.py) -------------
+function decodeIndices(bytes, encoding) {
+  if (encoding === 0) return new Uint32Array(bytes.buffer, bytes.byteOffset, bytes.byteLength / 4);
+  // zigzag varint deltas; a value takes at least one byte
+  const out = new Uint32Array(bytes.length);
+  let n = 0, prev = 0, shift = 0, v = 0;
+  for (let i = 0; i < bytes.length; i++) {
+    const b = bytes[i];
+    v += (b & 0x7f) * 2 ** shift;
+    if (b & 0x80) { shift += 7; continue; }
+    prev += v % 2 ? -(v + 1) / 2 : v / 2;
+    out[n++] = prev;
+    shift = 0;
+    v = 0;
+  }
+  return out.subarray(0, n);
+}
+
+function decodeMazeBinary(buffer) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== "MZB1") throw new Error("not a maze binary payload");
+  const encoding = view.getUint8(5);
+  const result = { rows: view.getUint32(8, true), cols: view.getUint32(12, true) };
+  let offset = 16;
+  while (offset < buffer.byteLength) {
+    const tag = view.getUint8(offset);
+    const length = view.getUint32(offset + 4, true);
+    const bytes = new Uint8Array(buffer, offset + 8, length);
+    offset += 8 + length + ((4 - (length % 4)) % 4);
+    if (tag === 1) result.walls = bytes;
+    else if (tag === 2) result.explored = decodeIndices(bytes, encoding);
+    else if (tag === 3) result.path = decodeIndices(bytes, encoding);
+    else if (tag === 4) result.meta = JSON.parse(new TextDecoder().decode(bytes));
+    else if (tag === 5) result.costs = bytes;
+  }
+  return result;
+}
+
+function bitsToMaze(walls, rows, cols) {
+  const grid = [];
+  for (let r = 0; r < rows; r++) {
+    const row = new Array(cols);
+    for (let c = 0; c < cols; c++) {
+      const i = r * cols + c;
+      row[c] = (walls[i >> 3] >> (i & 7)) & 1;
+    }
+    grid.push(row);
+  }
+  return grid;
+}
+
+function indicesToPairs(indices, cols) {
+  const pairs = new Array(indices.length);
+  for (let i = 0; i < indices.length; i++) pairs[i] = [Math.floor(indices[i] / cols), indices[i] % cols];
+  return pairs;
+}
+
+// Fetch a new maze as a wall bitset (plus terrain costs) and keep its server-side id
+async function fetchMaze(query) {
+  const terrain = terrainToggle && terrainToggle.checked ? "&terrain=1" : "";
+  const res = await fetch(`/generate?${query}${terrain}&format=binary`);
+  const data = decodeMazeBinary(await res.arrayBuffer());
+  maze = bitsToMaze(data.walls, data.rows, data.cols);
+  costs = data.costs ? data.costs.slice() : null;
+  mazeId = data.meta.maze_id;
+  optimalLength = data.meta.best_path_length || 0;
+}
+
 // ------------- SOLVE WITH AI -------------
+// Stream the search over SSE; explored cells are painted as the server produces them
+function streamSolve(start, end, algo) {
+  return new Promise((resolve, reject) => {
+    const params = new URLSearchParams({ maze_id: mazeId, start: start.join(","), end: end.join(","), algo });
+    const source = new EventSource(`/solve/stream?${params}`);
+    drawMaze();
+    source.addEventListener("explored", e => {
+      ctx.fillStyle = "#a0d2ff";
+      for (const [r, c] of JSON.parse(e.data)) {
+        if ((r === player.r && c === player.c) || (r === endPos.r && c === endPos.c)) continue;
+        ctx.fillRect(c * cellSize, r * cellSize, cellSize, cellSize);
+      }
+    });
+    source.addEventListener("path", e => {
+      source.close();
+      resolve(JSON.parse(e.data));
+    });
+    source.onerror = () => {
+      source.close();
+      reject(new Error("stream failed"));
+    };
+  });
+}
+
 async function solveMaze() {
   if (!maze.length) return alert("Generate a maze first!");
 
@@ -165,15 +359,22 @@ async function solveMaze() {
   const algo = algoSelect.value;
 
   const startTime = performance.now();
-  const res = await fetch("/solve", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ maze, start, end, algo }),
-  });
-
-  const data = await res.json();
-  explored = data.explored || [];
-  path = data.path || [];
+  let streamed = null;
+  let pathCost = 0;
+  if (mazeId && window.EventSource) {
+    streamed = await streamSolve(start, end, algo).catch(() => null);
+  }
+  if (streamed) {
+    explored = [];
+    path = streamed.path;
+    pathCost = streamed.path_cost;
+  } else {
+    const res = await postMaze("/solve", { start, end, algo, format: "binary" });
+    const data = decodeMazeBinary(await res.arrayBuffer());
+    explored = indicesToPairs(data.explored, data.cols);
+    path = indicesToPairs(data.path, data.cols);
+    pathCost = data.meta.path_cost;
+  }
   const endTime = performance.now();
 
   if (!path.length) {
@@ -181,8 +382,10 @@ async function solveMaze() {
   } else {
     bestPathLength = path.length;
     updateStats();
-    await animateExplorationThenPath();
-    alert(`🤖 AI found the optimal path in ${(endTime - startTime).toFixed(1)} ms`);
+    if (streamed) await animatePath();
+    else await animateExplorationThenPath();
+    const cost = costs ? ` (terrain cost ${pathCost})` : "";
+    alert(`🤖 AI found the optimal path in ${(endTime - startTime).toFixed(1)} ms${cost}`);
   }
 }
 
@@ -194,24 +397,16 @@ async function animateExplorationThenPath() {
   drawMaze();
 
   // Draw exploration
-  for (let i = 0; i < explored.length; i++) {
-    const [r, c] = explored[i];
-    if ((r === player.r && c === player.c) || (r === endPos.r && c === endPos.c)) continue;
-    ctx.fillStyle = "#a0d2ff";
-    ctx.fillRect(c * cellSize, r * cellSize, cellSize, cellSize);
-    if (i % 5 === 0) await sleep(10);
-  }
+  await paintCells(explored, "#a0d2ff", 8, 180);
+
+  await animatePath();
+}
 
+async function animatePath() {
   await sleep(100);
 
   // Draw final path
-  for (let i = 0; i < path.length; i++) {
-    const [r, c] = path[i];
-    if ((r === player.r && c === player.c) || (r === endPos.r && c === endPos.c)) continue;
-    ctx.fillStyle = "#ffd166";
-    ctx.fillRect(c * cellSize, r * cellSize, cellSize, cellSize);
-    await sleep(10);
-  }
+  await paintCells(path, "#ffd166", 2, 90);
 
   drawMaze();
 }
@@ -220,72 +415,72 @@ async function animateExplorationThenPath() {
 async function showHint() {
   if (!maze.length) return;
 
-  const start = [player.r, player.c];
-  const end = [endPos.r, endPos.c];
-  const algo = algoSelect.value;
-
-  const res = await fetch("/solve", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ maze, start, end, algo }),
-  });
-
-  const data = await res.json();
-  const fullPath = data.path || [];
-  if (!fullPath.length) {
+  // the next few steps are read off the server's goal distance field
+  let steps = [];
+  if (mazeId) {
+    const res = await fetch(`/hint?${hintQuery(player, HINT_STEPS)}`);
+    if (res.ok) steps = (await res.json()).next;
+  }
+  if (!steps.length) {
+    const start = [player.r, player.c];
+    const end = [endPos.r, endPos.c];
+    const res = await postMaze("/path", { start, end });
+    const fullPath = (await res.json()).path || [];
+    steps = fullPath.slice(1, HINT_STEPS + 1);
+  }
+  if (!steps.length) {
     alert("No hint available — no path found!");
     return;
   }
 
-  const hintLength = Math.floor(fullPath.length / 2);
-  for (let i = 0; i < hintLength; i++) {
-    const [r, c] = fullPath[i];
-    ctx.fillStyle = "#ffb347"; // orange hint
-    ctx.fillRect(c * cellSize, r * cellSize, cellSize, cellSize);
-    await sleep(15);
-  }
+  await paintCells(steps, "#ffb347", 1, steps.length); // orange hint
 
   alert("💡 Hint shown! Continue from the orange path.");
   drawMaze();
 }
 
+function hintQuery(cell, k) {
+  return new URLSearchParams({ maze_id: mazeId, r: cell.r, c: cell.c, k }).toString();
+}
+
+// Green outline when a move got closer to the goal, red when it moved away
+async function showProgress(prev) {
+  if (!mazeId) return;
+  const res = await fetch(`/hint?${hintQuery(player, 0)}&prev=${prev.r},${prev.c}`);
+  if (!res.ok) return;
+  const data = await res.json();
+  if (data.closer === null) canvas.style.outline = "";
+  else canvas.style.outline = `3px solid ${data.closer ? "#4caf50" : "#e53935"}`;
+}
+
 // --------------------for compariosn 
 async function compareAlgorithms() {
   if (!maze.length) return alert("Generate a maze first!");
 
-  const algos = ["bfs", "dfs", "dijkstra", "greedy", "bidirectional", "astar"];
+  const algos = ["bfs", "dfs", "dijkstra", "greedy", "bidirectional", "astar", "jps"];
   comparisonResults = [];
 
-  for (const algo of algos) {
-    const startTime = performance.now();
-
-    const res = await fetch("/solve", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({
-        maze,
-        start: [0, 0],
-        end: [maze.length - 1, maze[0].length - 1],
-        algo,
-      }),
-    });
+  // one request for all algorithms; the server runs them in parallel
+  const startTime = performance.now();
+  const res = await postMaze("/compare", {
+    start: [0, 0],
+    end: [maze.length - 1, maze[0].length - 1],
+    algos,
+  });
 
-    const data = await res.json();
-    const endTime = performance.now();
+  const data = await res.json();
+  const endTime = performance.now();
 
-    // 🧠 Convert to milliseconds for visibility
-    let measuredTime = Number(data.time);
-    if (isNaN(measuredTime) || measuredTime <= 0) {
-      measuredTime = (endTime - startTime); // in ms
-    } else {
-      measuredTime *= 100000; // convert sec → ms
-    }
+  for (const result of data.results || []) {
+    // server-side solve time; fall back to the round trip if it is missing
+    let measuredTime = Number(result.time_ms);
+    if (isNaN(measuredTime)) measuredTime = endTime - startTime;
 
     comparisonResults.push({
-      name: algo.toUpperCase(),
-      time: measuredTime, // in ms now
-      steps: Number(data.steps) || 0,
-      pathLength: Number(data.path_length) || 0,
+      name: result.algo.toUpperCase(),
+      time: measuredTime, // ms
+      steps: Number(result.steps) || 0,
+      pathLength: Number(result.path_length) || 0,
     });
   }
 
@@ -315,9 +510,10 @@ function resetStats() {
   stopTimer();
   document.getElementById("timeTaken").innerText = "0.00";
   document.getElementById("userSteps").innerText = "0";
-  document.getElementById("bestPath").innerText = "?";
+  document.getElementById("bestPath").innerText = optimalLength || "?";
   document.getElementById("scoreValue").innerText = "0";
-  bestPathLength = 0;
+  canvas.style.outline = "";
+  bestPathLength = optimalLength;
 }
 
 function updateStats() {
@@ -335,6 +531,8 @@ function calculateScore() {
 function resetPlayer() {
   player = { r: 0, c: 0 };
   userPath = [];
+  visited = new Uint8Array(maze.length ? maze.length * maze[0].length : 0);
+  if (maze.length) buildLayer();
   explored = [];
   path = [];
   drawMaze();
@@ -385,7 +583,7 @@ function showComparisonChart() {
       labels,
       datasets: [
         {
-          label: "Execution Time (s)",
+          label: "Execution Time (ms)",
           data: times,
           backgroundColor: "rgba(56, 189, 248, 0.7)",
           borderColor: "#38bdf8",
@@ -0,0 +1,91 @@
+"""
+stress_generate.py
+Concurrency stress check for /generate.
+
+Fires many /generate requests with mixed sizes, algorithms and seeds from a
+thread pool against the Flask app (through app.test_client, one client per
+thread) and checks every response:
+- the maze has exactly the requested rows x cols
+- every open cell is reachable from (0, 0), and (rows-1, cols-1) is open
+- generating the same recipe again returns the identical maze
+
+Run: python stress_generate.py --requests 500 --threads 32
+(python -m pytest tests runs a small version of it with the other tests)
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app
+import maze_generator
+
+SIZES = [(5, 5), (11, 21), (25, 35), (40, 41), (64, 17), (101, 101)]
+
+_clients = threading.local()
+
+
+def client():
+    if not hasattr(_clients, "client"):
+        _clients.client = app.test_client()
+    return _clients.client
+
+
+def connected(maze):
+    rows, cols = len(maze), len(maze[0])
+    open_cells = sum(row.count(0) for row in maze)
+    seen = {(0, 0)}
+    queue = deque([(0, 0)])
+    while queue:
+        r, c = queue.popleft()
+        for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+            if 0 <= nr < rows and 0 <= nc < cols and maze[nr][nc] == 0 and (nr, nc) not in seen:
+                seen.add((nr, nc))
+                queue.append((nr, nc))
+    return len(seen) == open_cells and (rows - 1, cols - 1) in seen
+
+
+def check(job):
+    rows, cols, algo, seed = job
+    res = client().get(f"/generate?rows={rows}&cols={cols}&algo={algo}&seed={seed}")
+    if res.status_code != 200:
+        return f"{job}: HTTP {res.status_code}"
+    data = res.get_json()
+    maze = data["maze"]
+    if (data["rows"], data["cols"]) != (rows, cols) or len(maze) != rows or any(len(row) != cols for row in maze):
+        return f"{job}: got {len(maze)}x{len(maze[0]) if maze else 0}"
+    if not connected(maze):
+        return f"{job}: maze is not connected"
+    if maze != maze_generator.generate(rows, cols, algo, seed).to_lists():
+        return f"{job}: same seed gave a different maze"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hammer /generate from many threads.")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    algos = list(maze_generator.GENERATORS)
+    jobs = [(*rng.choice(SIZES), rng.choice(algos), rng.randrange(2**32)) for _ in range(args.requests)]
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        failures = [msg for msg in pool.map(check, jobs) if msg]
+    elapsed = time.perf_counter() - t0
+
+    for msg in failures[:20]:
+        print("FAIL", msg)
+    print(f"{len(jobs)} requests on {args.threads} threads in {elapsed:.2f} s, {len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+import random
+from array import array
+
+import pytest
+
+import maze_codec
+
+
+@pytest.fixture(params=["numpy", "python"])
+def codec(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(maze_codec, "np", None)
+    return maze_codec
+
+
+@pytest.mark.parametrize("encoding", ["u32", "varint"])
+def test_round_trip(codec, encoding):
+    rng = random.Random(1)
+    for _ in range(50):
+        indices = array("i", [rng.choice([rng.randrange(2**31 - 1), rng.randrange(1000)])
+                              for _ in range(rng.randint(0, 300))])
+        cols = rng.randint(1, 40)
+        cells = bytearray(rng.randint(0, 1) for _ in range(3 * cols))
+        costs = bytearray(rng.randint(1, 9) for _ in range(3 * cols))
+        data = codec.decode(codec.encode(3, cols, cells=cells, explored=indices, path=list(indices),
+                                         meta={"a": 1}, encoding=encoding, costs=costs))
+        assert (data["rows"], data["cols"]) == (3, cols)
+        assert data["cells"] == cells
+        assert bytes(data["costs"]) == bytes(costs)
+        assert list(data["explored"]) == list(indices)
+        assert list(data["path"]) == list(indices)
+        assert data["meta"] == {"a": 1}
@@ -0,0 +1,6 @@
+import stress_generate
+
+
+def test_concurrent_generate():
+    # a small run of stress_generate.py: sizes, connectivity and seed replay
+    assert stress_generate.main(["--requests", "60", "--threads", "8"]) == 0
@@ -0,0 +1,33 @@
+import pytest
+
+from app import app, maze_registry
+from maze_solvers import dijkstra_with_exploration
+
+
+@pytest.mark.parametrize("terrain", [0, 1])
+def test_hint_follows_cheapest_path(terrain):
+    client = app.test_client()
+    for seed in range(5):
+        data = client.get(f"/generate?rows=21&cols=31&seed={seed}&terrain={terrain}").get_json()
+        grid = maze_registry.get_grid(data["maze_id"])
+        best = dijkstra_with_exploration(grid, 0, len(grid) - 1)[1]
+        assert data["best_path_cost"] == grid.path_cost(best)
+
+        hint = client.get(f"/hint?maze_id={data['maze_id']}&r=0&c=0&k={len(grid)}").get_json()
+        walk = [0] + [r * grid.cols + c for r, c in hint["next"]]
+        assert walk[-1] == len(grid) - 1
+        assert len(walk) == data["best_path_length"] == hint["remaining_length"]
+        assert grid.path_cost(walk) == data["best_path_cost"] == hint["remaining_cost"]
+
+
+def test_bad_input_is_400():
+    client = app.test_client()
+    maze_id = client.get("/generate?rows=9&cols=9&seed=1").get_json()["maze_id"]
+    for body in ({"maze_id": maze_id, "start": [99, 0]}, {"maze": [[0, 0], [0]]},
+                 {"maze": [[0, 2], [0, 0]]}, {"maze_id": maze_id, "edits": [[1, 1]]}):
+        assert client.post("/solve", json=body).status_code == 400
+    assert client.get(f"/hint?maze_id={maze_id}&r=50&c=0").status_code == 400
+    assert client.get("/generate?seed=-5").status_code == 400
+    for algos in (5, "bfs", ["bfs", "nope"], [["bfs"]]):
+        assert client.post("/compare", json={"maze_id": maze_id, "algos": algos}).status_code == 400
+    assert client.post("/compare", json={"maze_id": maze_id, "algos": ["bfs"]}).status_code == 200
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+import maze_generator
+from maze_grid import PATH, WALL
+from maze_incremental import DStarLite
+from maze_solvers import dijkstra_with_exploration
+from maze_wavefront import distance_field
+
+
+@pytest.mark.parametrize("terrain", [False, True])
+def test_replan_matches_fresh_search(terrain):
+    # wall toggles and start moves, then compare with a search from scratch
+    rng = random.Random(7)
+    for trial in range(60):
+        grid = maze_generator.open_field(20, 20, 0.25, rng)
+        if terrain:
+            grid.costs = maze_generator.terrain_costs(20, 20, rng, patch=rng.choice((1, 3)))
+        opens = [i for i in range(len(grid)) if grid.cells[i] == PATH]
+        end = rng.choice(opens)
+        planner = DStarLite(grid, rng.choice(opens), end)
+        for step in range(8):
+            if step:
+                cell = rng.randrange(len(grid))
+                if rng.random() < 0.5 and cell not in (end, planner.start):
+                    planner.set_cell(cell, WALL if planner.grid.cells[cell] == PATH else PATH)
+                else:
+                    cells = planner.grid.cells
+                    planner.move_start(rng.choice([i for i in range(len(cells)) if cells[i] == PATH]))
+            _, path = planner.plan()
+            grid = planner.grid
+            if terrain:
+                best = dijkstra_with_exploration(grid, planner.start, end)[1]
+                assert bool(path) == bool(best)
+                assert grid.path_cost(path) == grid.path_cost(best)
+            else:
+                assert len(path) - 1 == distance_field(grid, [end])[planner.start]
+            if path:
+                assert path[0] == planner.start and path[-1] == end
+                assert all(grid.cells[i] == PATH for i in path)
@@ -0,0 +1,60 @@
+from array import array
+
+import maze_generator
+from maze_registry import MazeRegistry
+
+
+def rebuild(maze_id):
+    recipe = maze_generator.parse_recipe_id(maze_id)
+    if recipe is None:
+        return None
+    rows, cols, algo, seed, terrain = recipe
+    return maze_generator.generate(rows, cols, algo, seed, terrain), {"seed": seed}
+
+
+def add_recipe(registry, rows, cols, seed, terrain=False):
+    grid = maze_generator.generate(rows, cols, "backtracker", seed, terrain)
+    return grid, registry.add(grid, maze_generator.recipe_id(rows, cols, "backtracker", seed, terrain))
+
+
+def test_rebuild_after_eviction():
+    registry = MazeRegistry(max_entries=2, rebuild=rebuild)
+    grid, maze_id = add_recipe(registry, 21, 31, 5, terrain=True)
+    for seed in range(3):
+        add_recipe(registry, 11, 11, seed)
+    assert maze_id not in registry._entries
+    entry = registry.get(maze_id)
+    assert entry is not None and entry.meta == {"seed": 5}
+    assert entry.grid.cells == grid.cells and entry.grid.costs == grid.costs
+
+
+def test_unknown_ids():
+    registry = MazeRegistry(rebuild=rebuild)
+    assert registry.get("nope") is None
+    assert registry.get("backtracker-11x11--5") is None
+    assert registry.get("../etc/passwd") is None
+
+
+def test_spill_and_load(tmp_path):
+    registry = MazeRegistry(max_entries=1, spill_dir=str(tmp_path))
+    grid = maze_generator.generate(15, 15, seed=1, terrain=True)
+    maze_id = registry.add(grid, algo="backtracker")
+    registry.add(maze_generator.generate(15, 15, seed=2))
+    entry = registry.get(maze_id)
+    assert entry.meta == {"algo": "backtracker"}
+    assert entry.grid.cells == grid.cells and entry.grid.costs == grid.costs
+
+
+def test_bytes_bound_counts_derived():
+    registry = MazeRegistry(max_bytes=40_000)
+    field = lambda grid: array("i", [0]) * len(grid)  # noqa: E731
+    ids = []
+    for seed in range(10):
+        grid = maze_generator.generate(41, 41, seed=seed)
+        ids.append(registry.add(grid))
+        assert registry.derive(ids[-1], grid, "field", field) is not None
+        assert registry.bytes == sum(entry.nbytes for entry in registry._entries.values())
+        assert registry.bytes <= registry.max_bytes
+    assert len(registry) < 10 and ids[-1] in registry
+    # a copy is not the registry's grid
+    assert registry.derive(ids[-1], registry.get_grid(ids[-1]).copy(), "field", field) is None